@@ -1,8 +1,13 @@
 """API for bootcamp applications app"""
 
+from collections import Counter
 import logging
+
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+from mitol.common.utils import now_in_utc
 
 from applications.constants import (
     AppStates,
@@ -13,17 +18,22 @@ from applications.constants import (
 from applications.models import (
     ApplicationStepSubmission,
     BootcampApplication,
+    BootcampApplicationLedger,
     BootcampRunApplicationStep,
     VideoInterviewSubmission,
 )
+from applications.facets import invalidate_review_submission_facets
 from applications.utils import check_eligibility_to_skip_steps
 from applications import tasks
+from ecommerce.checkout import invalidate_checkout_data
 from jobma.api import create_interview_in_jobma
 from jobma.models import Interview, Job
 from profiles.api import is_user_info_complete
 
 log = logging.getLogger()
 
+LEDGER_FIELDS = ["amount_paid", "amount_refunded", "price", "balance_due"]
+
 
 def get_or_create_bootcamp_application(user, bootcamp_run_id):
     """
@@ -62,41 +72,174 @@ def get_or_create_bootcamp_application(user, bootcamp_run_id):
     return bootcamp_app, created
 
 
-def derive_application_state(
-    bootcamp_application,
-):  # pylint: disable=too-many-return-statements
+def _derive_state(  # pylint: disable=too-many-arguments,too-many-return-statements
+    *,
+    user_info_complete,
+    step_count,
+    has_resume,
+    submission_review_statuses,
+    is_paid_in_full,
+):
     """
-    Returns the correct state that an application should be in based on the application object itself and related data
+    Returns the state an application should be in based on its related data
 
     Args:
-        bootcamp_application (BootcampApplication): A bootcamp application
+        user_info_complete (bool): True if the user has provided all of the required registration info
+        step_count (int): The number of application steps for the bootcamp run
+        has_resume (bool): True if the application has a resume or a LinkedIn URL
+        submission_review_statuses (list of str): The review statuses of the application's submissions
+        is_paid_in_full (callable): Returns True if the application has been paid in full
 
     Returns:
-        str: The derived state of the bootcamp application based on related data
+        str: The derived state of the bootcamp application
     """
-    if not is_user_info_complete(bootcamp_application.user):
+    if not user_info_complete:
         return AppStates.AWAITING_PROFILE_COMPLETION.value
-    if bootcamp_application.bootcamp_run.application_steps.count() == 0:
+    if step_count == 0:
         return AppStates.AWAITING_PAYMENT.value
-    if not bootcamp_application.resume_file and not bootcamp_application.linkedin_url:
+    if not has_resume:
         return AppStates.AWAITING_RESUME.value
-    submissions = list(bootcamp_application.submissions.all())
-    submission_review_statuses = [
-        submission.review_status for submission in submissions
-    ]
-    if any([status == REVIEW_STATUS_REJECTED for status in submission_review_statuses]):
+    if any(status == REVIEW_STATUS_REJECTED for status in submission_review_statuses):
         return AppStates.REJECTED.value
-    elif any(
-        [status == REVIEW_STATUS_PENDING for status in submission_review_statuses]
-    ):
+    elif any(status == REVIEW_STATUS_PENDING for status in submission_review_statuses):
         return AppStates.AWAITING_SUBMISSION_REVIEW.value
-    elif len(submissions) < bootcamp_application.bootcamp_run.application_steps.count():
+    elif len(submission_review_statuses) < step_count:
         return AppStates.AWAITING_USER_SUBMISSIONS.value
-    elif not bootcamp_application.is_paid_in_full:
+    elif not is_paid_in_full():
         return AppStates.AWAITING_PAYMENT.value
     return AppStates.COMPLETE.value
 
 
+def derive_application_state(bootcamp_application):
+    """
+    Returns the correct state that an application should be in based on the application object itself and related data
+
+    Args:
+        bootcamp_application (BootcampApplication): A bootcamp application
+
+    Returns:
+        str: The derived state of the bootcamp application based on related data
+    """
+    if not is_user_info_complete(bootcamp_application.user):
+        return AppStates.AWAITING_PROFILE_COMPLETION.value
+    return _derive_state(
+        user_info_complete=True,
+        step_count=bootcamp_application.bootcamp_run.application_steps.count(),
+        has_resume=bool(
+            bootcamp_application.resume_file or bootcamp_application.linkedin_url
+        ),
+        submission_review_statuses=[
+            submission.review_status
+            for submission in bootcamp_application.submissions.all()
+        ],
+        is_paid_in_full=lambda: bootcamp_application.is_paid_in_full,
+    )
+
+
+def _derive_annotated_application_state(application):
+    """
+    Returns the derived state of an application loaded by reconcile_application_states, without any queries
+
+    Args:
+        application (BootcampApplication): An application with the annotations and related data of the reconciliation
+
+    Returns:
+        str: The derived state of the bootcamp application
+    """
+    return _derive_state(
+        user_info_complete=is_user_info_complete(application.user),
+        step_count=application.application_step_count,
+        has_resume=bool(application.resume_file or application.linkedin_url),
+        submission_review_statuses=[
+            submission.review_status for submission in application.submissions.all()
+        ],
+        is_paid_in_full=lambda: (
+            application.ledger_amount_paid - application.ledger_amount_refunded
+            >= application.ledger_price
+        ),
+    )
+
+
+def _write_application_states(applications):
+    """
+    Save the new states of a batch of applications, and do what saving each application would have triggered
+
+    Args:
+        applications (list of BootcampApplication): Applications with a changed state
+    """
+    from hubspot_sync.task_helpers import sync_hubspot_application
+
+    now = now_in_utc()
+    for application in applications:
+        application.updated_on = now
+    with transaction.atomic():
+        BootcampApplication.objects.bulk_update(applications, ["state", "updated_on"])
+        invalidate_review_submission_facets()
+        invalidate_checkout_data([application.id for application in applications])
+    for application in applications:
+        sync_hubspot_application(application)
+
+
+def reconcile_application_states(applications=None, batch_size=1000, dry_run=False):
+    """
+    Derives the states of many bootcamp applications at once, loading their related data in batches
+
+    Args:
+        applications (QuerySet of BootcampApplication): The applications to reconcile (default: all applications)
+        batch_size (int): The number of applications to load and write at a time
+        dry_run (bool): If True, only count the changes without saving them
+
+    Returns:
+        Tuple[int, Counter]: The number of applications which were checked, and the number of changed applications
+            for each pair of previous and derived state
+    """
+    if applications is None:
+        applications = BootcampApplication.objects.all()
+    step_counts = (
+        BootcampRunApplicationStep.objects.filter(bootcamp_run=OuterRef("bootcamp_run"))
+        .order_by()
+        .values("bootcamp_run")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    applications = (
+        applications.annotate_ledger_totals()
+        .annotate(application_step_count=Coalesce(Subquery(step_counts), Value(0)))
+        .select_related("user__profile", "user__legal_address")
+        .prefetch_related(
+            Prefetch(
+                "submissions",
+                queryset=ApplicationStepSubmission.objects.only(
+                    "id", "bootcamp_application_id", "review_status"
+                ),
+            )
+        )
+        .order_by("id")
+    )
+
+    total = 0
+    changes = Counter()
+    last_id = 0
+    # Each page is a separate query which continues after the last application of the previous page
+    while True:
+        page = list(applications.filter(id__gt=last_id)[:batch_size])
+        if not page:
+            break
+        last_id = page[-1].id
+        total += len(page)
+        batch = []
+        for application in page:
+            derived_state = _derive_annotated_application_state(application)
+            if derived_state == application.state:
+                continue
+            changes[(application.state, derived_state)] += 1
+            application.state = derived_state
+            batch.append(application)
+        if batch and not dry_run:
+            _write_application_states(batch)
+    return total, changes
+
+
 def get_required_submission_type(application):
     """
     Get the submission type of the first unsubmitted step for an application
@@ -171,3 +314,104 @@ def populate_interviews_in_jobma(application):
                 ),
             },
         )
+
+
+def _ledger_values(amount_paid, amount_refunded, price):
+    """
+    Returns the field values for a BootcampApplicationLedger
+
+    Args:
+        amount_paid (Decimal): The sum of all fulfilled payments
+        amount_refunded (Decimal): The sum of all fulfilled refunds, as a positive amount
+        price (Decimal): The personal price or else the full price of the bootcamp run
+
+    Returns:
+        dict: BootcampApplicationLedger field values
+    """
+    return {
+        "amount_paid": amount_paid,
+        "amount_refunded": amount_refunded,
+        "price": price,
+        "balance_due": price - (amount_paid - amount_refunded),
+    }
+
+
+def update_application_ledger(application):
+    """
+    Recalculates and saves the payment ledger for a bootcamp application
+
+    Args:
+        application (BootcampApplication): A bootcamp application
+
+    Returns:
+        BootcampApplicationLedger: The updated ledger
+    """
+    totals = BootcampApplication.objects.annotate_ledger_totals().get(id=application.id)
+    ledger, _ = BootcampApplicationLedger.objects.update_or_create(
+        application=application,
+        defaults=_ledger_values(
+            totals.ledger_amount_paid,
+            totals.ledger_amount_refunded,
+            totals.ledger_price,
+        ),
+    )
+    # Replace any ledger that was already loaded for this application object
+    application.ledger = ledger
+    return ledger
+
+
+def reconcile_application_ledgers(applications=None, batch_size=1000):
+    """
+    Rebuilds the payment ledgers for bootcamp applications from their orders and prices
+
+    Args:
+        applications (QuerySet of BootcampApplication): The applications to reconcile (default: all applications)
+        batch_size (int): The number of ledgers to write at a time
+
+    Returns:
+        Tuple[int, int]: The number of ledgers written, and how many of them were missing or out of sync
+    """
+    if applications is None:
+        applications = BootcampApplication.objects.all()
+    rows = (
+        applications.annotate_ledger_totals()
+        .order_by("id")
+        .values_list(
+            "id",
+            "ledger_amount_paid",
+            "ledger_amount_refunded",
+            "ledger_price",
+            *[f"ledger__{field}" for field in LEDGER_FIELDS],
+        )
+    )
+    total = 0
+    out_of_sync = 0
+    last_id = 0
+    # Each page is a separate query which continues after the last application of the previous page
+    while True:
+        page = list(rows.filter(id__gt=last_id)[:batch_size])
+        if not page:
+            break
+        last_id = page[-1][0]
+        batch = []
+        for row in page:
+            application_id, existing_values = row[0], row[4:]
+            values = _ledger_values(*row[1:4])
+            if tuple(values[field] for field in LEDGER_FIELDS) != existing_values:
+                out_of_sync += 1
+            batch.append(
+                BootcampApplicationLedger(application_id=application_id, **values)
+            )
+        total += _write_ledgers(batch)
+    return total, out_of_sync
+
+
+def _write_ledgers(ledgers):
+    """Insert or update a batch of BootcampApplicationLedger objects"""
+    BootcampApplicationLedger.objects.bulk_create(
+        ledgers,
+        update_conflicts=True,
+        unique_fields=["application"],
+        update_fields=[*LEDGER_FIELDS, "updated_on"],
+    )
+    return len(ledgers)
@@ -11,6 +11,9 @@ from applications.api import (
     derive_application_state,
     get_required_submission_type,
     populate_interviews_in_jobma,
+    reconcile_application_ledgers,
+    reconcile_application_states,
+    update_application_ledger,
 )
 from applications.constants import (
     AppStates,
@@ -25,10 +28,19 @@ from applications.factories import (
     BootcampRunApplicationStepFactory,
     ApplicationStepSubmissionFactory,
 )
-from applications.models import ApplicationStepSubmission, VideoInterviewSubmission
-from ecommerce.factories import LineFactory
+from applications.models import (
+    ApplicationStepSubmission,
+    BootcampApplication,
+    BootcampApplicationLedger,
+    VideoInterviewSubmission,
+)
+from ecommerce.factories import LineFactory, OrderFactory
 from ecommerce.models import Order
-from klasses.factories import BootcampRunFactory, InstallmentFactory
+from klasses.factories import (
+    BootcampRunFactory,
+    InstallmentFactory,
+    PersonalPriceFactory,
+)
 from jobma.factories import InterviewFactory, JobFactory
 from jobma.models import Interview
 from profiles.factories import ProfileFactory, UserFactory, LegalAddressFactory
@@ -270,3 +282,206 @@ def test_populate_interviews_in_jobma(
         assert step_submission.content_object == video_submission
     else:
         create_interview.assert_not_called()
+
+
+def test_update_application_ledger(django_capture_on_commit_callbacks):
+    """update_application_ledger should total fulfilled payments and refunds and save them with the price"""
+    application = BootcampApplicationFactory.create()
+    InstallmentFactory.create(bootcamp_run=application.bootcamp_run, amount=1000)
+    for status, amount in [
+        (Order.FULFILLED, 300),
+        (Order.FULFILLED, 200),
+        (Order.FULFILLED, -50),
+        (Order.CREATED, 400),
+        (Order.FAILED, 100),
+    ]:
+        OrderFactory.create(
+            application=application,
+            user=application.user,
+            status=status,
+            total_price_paid=amount,
+        )
+    BootcampApplicationLedger.objects.all().delete()
+
+    ledger = update_application_ledger(application)
+    assert ledger.amount_paid == 500
+    assert ledger.amount_refunded == 50
+    assert ledger.price == 1000
+    assert ledger.balance_due == 550
+    assert application.ledger == ledger
+    assert application.total_paid == 450
+    assert application.price == 1000
+    assert application.is_paid_in_full is False
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PersonalPriceFactory.create(
+            bootcamp_run=application.bootcamp_run, user=application.user, price=450
+        )
+    ledger.refresh_from_db()
+    assert ledger.price == 450
+    assert ledger.balance_due == 0
+
+
+def test_ledger_updated_by_orders():
+    """Saving an order should update the ledger for its application"""
+    application = BootcampApplicationFactory.create()
+    InstallmentFactory.create(bootcamp_run=application.bootcamp_run, amount=200)
+    order = OrderFactory.create(
+        application=application,
+        user=application.user,
+        status=Order.CREATED,
+        total_price_paid=200,
+    )
+    assert application.ledger.amount_paid == 0
+    assert application.ledger.balance_due == 200
+
+    order.status = Order.FULFILLED
+    order.save()
+    assert application.ledger.amount_paid == 200
+    assert application.ledger.balance_due == 0
+    assert application.is_paid_in_full is True
+
+
+def test_ledger_updated_by_deleted_orders():
+    """Deleting orders should update the ledger for their application, unless the application is deleted too"""
+    application = BootcampApplicationFactory.create()
+    InstallmentFactory.create(bootcamp_run=application.bootcamp_run, amount=200)
+    orders = OrderFactory.create_batch(
+        2,
+        application=application,
+        user=application.user,
+        status=Order.FULFILLED,
+        total_price_paid=100,
+    )
+    assert application.is_paid_in_full is True
+
+    orders[0].delete()
+    assert application.ledger.amount_paid == 100
+    Order.objects.filter(application=application).delete()
+    application.ledger.refresh_from_db()
+    assert application.ledger.amount_paid == 0
+    assert application.is_paid_in_full is False
+
+    OrderFactory.create(application=application, user=application.user)
+    application.delete()
+    assert not BootcampApplicationLedger.objects.filter(
+        application_id=application.id
+    ).exists()
+
+
+def test_reconcile_application_ledgers():
+    """reconcile_application_ledgers should create missing ledgers and fix ones that are out of sync"""
+    applications = BootcampApplicationFactory.create_batch(3)
+    for application in applications:
+        InstallmentFactory.create(bootcamp_run=application.bootcamp_run, amount=100)
+        OrderFactory.create(
+            application=application,
+            user=application.user,
+            status=Order.FULFILLED,
+            total_price_paid=60,
+        )
+    BootcampApplicationLedger.objects.filter(application=applications[0]).delete()
+    BootcampApplicationLedger.objects.filter(application=applications[1]).update(
+        amount_paid=0
+    )
+
+    assert reconcile_application_ledgers(batch_size=2) == (3, 2)
+    assert reconcile_application_ledgers(
+        BootcampApplication.objects.filter(id=applications[0].id)
+    ) == (1, 0)
+    for application in applications:
+        ledger = BootcampApplicationLedger.objects.get(application=application)
+        assert ledger.amount_paid == 60
+        assert ledger.price == 100
+        assert ledger.balance_due == 40
+
+
+@pytest.fixture
+def unreconciled_applications():
+    """Applications with states that don't match their related data"""
+    bootcamp_run = BootcampRunFactory.create()
+    InstallmentFactory.create(bootcamp_run=bootcamp_run, amount=Decimal("100"))
+    run_steps = BootcampRunApplicationStepFactory.create_batch(
+        2, bootcamp_run=bootcamp_run
+    )
+    applications = BootcampApplicationFactory.create_batch(
+        5,
+        bootcamp_run=bootcamp_run,
+        linkedin_url="http://example.com/linkedin",
+        state=AppStates.AWAITING_PROFILE_COMPLETION.value,
+    )
+    applications[0].user.profile.delete()
+    applications[1].linkedin_url = None
+    applications[1].save()
+    ApplicationStepSubmissionFactory.create(
+        bootcamp_application=applications[2],
+        run_application_step=run_steps[0],
+        is_pending=True,
+    )
+    for application in applications[3:]:
+        for run_step in run_steps:
+            ApplicationStepSubmissionFactory.create(
+                bootcamp_application=application,
+                run_application_step=run_step,
+                review_status=REVIEW_STATUS_APPROVED,
+                review_status_date=now_in_utc(),
+            )
+    OrderFactory.create(
+        application=applications[4],
+        user=applications[4].user,
+        status=Order.FULFILLED,
+        total_price_paid=100,
+    )
+    return applications
+
+
+def test_reconcile_application_states(mocker, unreconciled_applications):
+    """reconcile_application_states should save the same states as derive_application_state"""
+    sync_mock = mocker.patch("hubspot_sync.task_helpers.sync_hubspot_application")
+    expected_states = [
+        AppStates.AWAITING_PROFILE_COMPLETION.value,
+        AppStates.AWAITING_RESUME.value,
+        AppStates.AWAITING_SUBMISSION_REVIEW.value,
+        AppStates.AWAITING_PAYMENT.value,
+        AppStates.COMPLETE.value,
+    ]
+    assert [
+        derive_application_state(BootcampApplication.objects.get(id=application.id))
+        for application in unreconciled_applications
+    ] == expected_states
+
+    total, changes = reconcile_application_states(batch_size=2)
+    assert total == 5
+    assert changes == {
+        (AppStates.AWAITING_PROFILE_COMPLETION.value, state): 1
+        for state in expected_states[1:]
+    }
+    assert [
+        BootcampApplication.objects.get(id=application.id).state
+        for application in unreconciled_applications
+    ] == expected_states
+    assert sorted(call.args[0].id for call in sync_mock.call_args_list) == [
+        application.id for application in unreconciled_applications[1:]
+    ]
+
+    assert reconcile_application_states() == (5, {})
+
+
+def test_reconcile_application_states_dry_run(
+    mocker, django_assert_max_num_queries, unreconciled_applications
+):
+    """reconcile_application_states should only count the changes in a dry run, with a constant number of queries"""
+    sync_mock = mocker.patch("hubspot_sync.task_helpers.sync_hubspot_application")
+    with django_assert_max_num_queries(4):
+        total, changes = reconcile_application_states(
+            BootcampApplication.objects.filter(
+                id__in=[application.id for application in unreconciled_applications]
+            ),
+            dry_run=True,
+        )
+    assert total == 5
+    assert sum(changes.values()) == 4
+    assert set(BootcampApplication.objects.values_list("state", flat=True)) == {
+        AppStates.AWAITING_PROFILE_COMPLETION.value
+    }
+    sync_mock.assert_not_called()
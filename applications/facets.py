@@ -0,0 +1,113 @@
+"""Facet counts for the submission review queue, cached in redis"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+FACETS_CACHE_KEY_PREFIX = "applications:review_submission_facets"
+FACETS_VERSION_KEY = f"{FACETS_CACHE_KEY_PREFIX}:version"
+
+
+def _new_facets_version():
+    """
+    Start a version from the current time, so that a version key which was evicted from the cache
+    never makes old facet entries valid again
+
+    Returns:
+        int: The version
+    """
+    cache.add(FACETS_VERSION_KEY, time.time_ns(), timeout=None)
+    return cache.get(FACETS_VERSION_KEY)
+
+
+def _bump_facets_version():
+    """Increment the version which is part of every facets cache key"""
+    try:
+        cache.incr(FACETS_VERSION_KEY)
+    except ValueError:
+        _new_facets_version()
+
+
+def invalidate_review_submission_facets():
+    """
+    Make all cached facets stale. The version is bumped again once the transaction commits, so facets
+    computed from the uncommitted state by other requests are not kept either.
+    """
+    _bump_facets_version()
+    transaction.on_commit(_bump_facets_version)
+
+
+def compute_review_submission_facets(queryset):
+    """
+    Count submissions by review status and by bootcamp run with a single grouped query
+
+    Args:
+        queryset (QuerySet of ApplicationStepSubmission): The filtered submissions
+
+    Returns:
+        dict: Counts by review status, ordered by count, and by bootcamp run, ordered by id
+    """
+    rows = (
+        queryset.order_by()
+        .values(
+            "review_status",
+            "bootcamp_application__bootcamp_run__id",
+            "bootcamp_application__bootcamp_run__title",
+            "bootcamp_application__bootcamp_run__start_date",
+            "bootcamp_application__bootcamp_run__end_date",
+        )
+        .annotate(count=Count("id"))
+    )
+    review_statuses = {}
+    bootcamp_runs = {}
+    for row in rows:
+        review_statuses[row["review_status"]] = (
+            review_statuses.get(row["review_status"], 0) + row["count"]
+        )
+        run_id = row["bootcamp_application__bootcamp_run__id"]
+        if run_id not in bootcamp_runs:
+            bootcamp_runs[run_id] = {
+                "id": run_id,
+                "title": row["bootcamp_application__bootcamp_run__title"],
+                "start_date": row["bootcamp_application__bootcamp_run__start_date"],
+                "end_date": row["bootcamp_application__bootcamp_run__end_date"],
+                "count": 0,
+            }
+        bootcamp_runs[run_id]["count"] += row["count"]
+    return {
+        "review_statuses": [
+            {"review_status": review_status, "count": count}
+            for review_status, count in sorted(
+                review_statuses.items(), key=lambda item: (item[1], item[0])
+            )
+        ],
+        "bootcamp_runs": [bootcamp_runs[run_id] for run_id in sorted(bootcamp_runs)],
+    }
+
+
+def get_review_submission_facets(queryset, filters):
+    """
+    Get the facets for a filter set from the cache, computing them if they are missing or stale
+
+    Args:
+        queryset (QuerySet of ApplicationStepSubmission): The submissions, filtered by filters
+        filters (dict): The filter query parameters, mapping names to lists of values
+
+    Returns:
+        dict: Counts by review status and by bootcamp run
+    """
+    version = cache.get(FACETS_VERSION_KEY) or _new_facets_version()
+    filters_hash = hashlib.sha256(
+        json.dumps(filters, sort_keys=True).encode()
+    ).hexdigest()
+    key = f"{FACETS_CACHE_KEY_PREFIX}:{version}:{filters_hash}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_review_submission_facets(queryset)
+        cache.set(key, facets, timeout=settings.REVIEW_SUBMISSION_FACETS_CACHE_TTL)
+    return facets
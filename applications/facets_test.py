@@ -0,0 +1,132 @@
+"""Tests for review submission facets"""
+
+# pylint: disable=redefined-outer-name
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from mitol.common.utils import now_in_utc
+
+from applications.constants import REVIEW_STATUS_APPROVED, REVIEW_STATUS_PENDING
+from applications.facets import (
+    FACETS_VERSION_KEY,
+    compute_review_submission_facets,
+    get_review_submission_facets,
+    invalidate_review_submission_facets,
+)
+from applications.factories import ApplicationStepSubmissionFactory
+from applications.models import ApplicationStepSubmission
+from klasses.factories import BootcampRunFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def facets_version():
+    """Start every test without a facets version"""
+    cache.delete(FACETS_VERSION_KEY)
+    yield
+    cache.delete(FACETS_VERSION_KEY)
+
+
+@pytest.fixture
+def submissions():
+    """Submissions for two bootcamp runs"""
+    runs = BootcampRunFactory.create_batch(
+        2, start_date=now_in_utc() + timedelta(days=1)
+    )
+    return [
+        ApplicationStepSubmissionFactory.create(
+            bootcamp_application__bootcamp_run=runs[0], is_pending=True
+        ),
+        ApplicationStepSubmissionFactory.create(
+            bootcamp_application__bootcamp_run=runs[0], is_approved=True
+        ),
+        ApplicationStepSubmissionFactory.create(
+            bootcamp_application__bootcamp_run=runs[1], is_approved=True
+        ),
+    ]
+
+
+def test_compute_review_submission_facets(django_assert_num_queries, submissions):
+    """compute_review_submission_facets should count by review status and bootcamp run in one query"""
+    runs = [
+        submissions[0].bootcamp_application.bootcamp_run,
+        submissions[2].bootcamp_application.bootcamp_run,
+    ]
+    with django_assert_num_queries(1):
+        facets = compute_review_submission_facets(
+            ApplicationStepSubmission.objects.all()
+        )
+    assert facets == {
+        "review_statuses": [
+            {"review_status": REVIEW_STATUS_PENDING, "count": 1},
+            {"review_status": REVIEW_STATUS_APPROVED, "count": 2},
+        ],
+        "bootcamp_runs": [
+            {
+                "id": run.id,
+                "title": run.title,
+                "start_date": run.start_date,
+                "end_date": run.end_date,
+                "count": count,
+            }
+            for run, count in zip(runs, [2, 1])
+        ],
+    }
+
+
+def test_compute_review_submission_facets_empty():
+    """compute_review_submission_facets should return empty facets if there are no submissions"""
+    assert compute_review_submission_facets(
+        ApplicationStepSubmission.objects.none()
+    ) == {"review_statuses": [], "bootcamp_runs": []}
+
+
+def test_get_review_submission_facets_cached(django_assert_num_queries, submissions):
+    """get_review_submission_facets should compute the facets once per filter set"""
+    queryset = ApplicationStepSubmission.objects.all()
+    filtered = queryset.filter(review_status=REVIEW_STATUS_APPROVED)
+    filters = {"review_status": [REVIEW_STATUS_APPROVED]}
+
+    facets = get_review_submission_facets(queryset, {})
+    filtered_facets = get_review_submission_facets(filtered, filters)
+    with django_assert_num_queries(0):
+        assert get_review_submission_facets(queryset, {}) == facets
+        assert get_review_submission_facets(filtered, filters) == filtered_facets
+    assert facets != filtered_facets
+    assert len(submissions) == sum(
+        status["count"] for status in facets["review_statuses"]
+    )
+
+
+@pytest.mark.parametrize("version_evicted", [True, False])
+def test_invalidate_review_submission_facets(mocker, version_evicted):
+    """invalidate_review_submission_facets should make the cached facets stale"""
+    compute_mock = mocker.patch(
+        "applications.facets.compute_review_submission_facets",
+        side_effect=[{"count": 1}, {"count": 2}],
+    )
+    queryset = ApplicationStepSubmission.objects.all()
+    assert get_review_submission_facets(queryset, {}) == {"count": 1}
+    if version_evicted:
+        cache.delete(FACETS_VERSION_KEY)
+    invalidate_review_submission_facets()
+    assert get_review_submission_facets(queryset, {}) == {"count": 2}
+    assert compute_mock.call_count == 2
+
+
+def test_submission_review_invalidates_facets(submissions):
+    """Changing the review status of a submission should update the cached facets"""
+    queryset = ApplicationStepSubmission.objects.all()
+    facets = get_review_submission_facets(queryset, {})
+    assert facets["review_statuses"][0] == {
+        "review_status": REVIEW_STATUS_PENDING,
+        "count": 1,
+    }
+
+    submissions[0].review_status = REVIEW_STATUS_APPROVED
+    submissions[0].save()
+    assert get_review_submission_facets(queryset, {})["review_statuses"] == [
+        {"review_status": REVIEW_STATUS_APPROVED, "count": 3}
+    ]
@@ -0,0 +1,42 @@
+"""Management command to rebuild the payment ledgers of bootcamp applications from their orders"""
+
+from django.core.management.base import BaseCommand
+
+from applications.api import reconcile_application_ledgers
+from applications.management.utils import fetch_bootcamp_run
+from applications.models import BootcampApplication
+
+
+class Command(BaseCommand):
+    """Rebuild the payment ledgers of bootcamp applications from their orders"""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--run",
+            type=str,
+            help="The id, title, or display title of the bootcamp run (default: all runs)",
+            required=False,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of ledgers to write at a time",
+        )
+
+    def handle(self, *args, **options):
+        applications = BootcampApplication.objects.all()
+        if options["run"]:
+            applications = applications.filter(
+                bootcamp_run=fetch_bootcamp_run(options["run"])
+            )
+        total, out_of_sync = reconcile_application_ledgers(
+            applications, batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {total} application ledger(s), {out_of_sync} were missing or out of sync"
+            )
+        )
@@ -0,0 +1,68 @@
+"""Management command to correctly set the states of many bootcamp applications at once"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.api import reconcile_application_states
+from applications.management.utils import fetch_bootcamp, fetch_bootcamp_run
+from applications.models import BootcampApplication
+
+
+class Command(BaseCommand):
+    """Correctly set the states of the bootcamp applications for a run, a bootcamp or all runs"""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--run",
+            type=str,
+            help="The id, title, or display title of the bootcamp run",
+            required=False,
+        )
+        parser.add_argument(
+            "--bootcamp",
+            type=str,
+            help="The id or title of the bootcamp",
+            required=False,
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Reconcile the applications for all bootcamp runs",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the state changes without saving them",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of applications to load and write at a time",
+        )
+
+    def handle(self, *args, **options):
+        if sum(bool(options[name]) for name in ["run", "bootcamp", "all"]) != 1:
+            raise CommandError("Exactly one of --run, --bootcamp or --all is required")
+        applications = BootcampApplication.objects.all()
+        if options["run"]:
+            applications = applications.filter(
+                bootcamp_run=fetch_bootcamp_run(options["run"])
+            )
+        elif options["bootcamp"]:
+            applications = applications.filter(
+                bootcamp_run__bootcamp=fetch_bootcamp(options["bootcamp"])
+            )
+
+        total, changes = reconcile_application_states(
+            applications, batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        for (previous_state, state), count in sorted(changes.items()):
+            self.stdout.write(f"{previous_state} -> {state}: {count}")
+        verb = "would change" if options["dry_run"] else "changed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {total} application state(s), {sum(changes.values())} {verb}"
+            )
+        )
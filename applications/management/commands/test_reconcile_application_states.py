@@ -0,0 +1,54 @@
+"""Tests for the application state reconciliation management command"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from applications.constants import AppStates
+from applications.factories import BootcampApplicationFactory
+from applications.models import BootcampApplication
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+def test_reconcile_application_states(mocker, dry_run):
+    """The command should reconcile the applications of a bootcamp and print the state changes"""
+    mocker.patch("hubspot_sync.task_helpers.sync_hubspot_application")
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PROFILE_COMPLETION.value
+    )
+    other_application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PROFILE_COMPLETION.value
+    )
+    stdout = StringIO()
+    call_command(
+        "reconcile_application_states",
+        bootcamp=str(application.bootcamp_run.bootcamp.id),
+        dry_run=dry_run,
+        stdout=stdout,
+    )
+
+    assert stdout.getvalue().splitlines() == [
+        f"{AppStates.AWAITING_PROFILE_COMPLETION.value} -> {AppStates.AWAITING_PAYMENT.value}: 1",
+        f"Reconciled 1 application state(s), 1 {'would change' if dry_run else 'changed'}",
+    ]
+    application.refresh_from_db()
+    assert application.state == (
+        AppStates.AWAITING_PROFILE_COMPLETION.value
+        if dry_run
+        else AppStates.AWAITING_PAYMENT.value
+    )
+    assert (
+        BootcampApplication.objects.get(id=other_application.id).state
+        == AppStates.AWAITING_PROFILE_COMPLETION.value
+    )
+
+
+@pytest.mark.parametrize("options", [{}, {"run": "1", "all": True}])
+def test_reconcile_application_states_scope(options):
+    """The command should require exactly one scope"""
+    with pytest.raises(CommandError):
+        call_command("reconcile_application_states", **options)
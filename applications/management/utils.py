@@ -12,7 +12,7 @@ from applications.models import (
     ApplicationStepSubmission,
     ApplicationStep,
 )
-from klasses.models import BootcampRun
+from klasses.models import Bootcamp, BootcampRun
 from main.utils import is_empty_file
 
 
@@ -33,6 +33,21 @@ def fetch_bootcamp_run(run_property):
     return bootcamp_run
 
 
+def fetch_bootcamp(bootcamp_property):
+    """
+    Fetches a bootcamp based on a given property, which could be its id or title
+
+    Args:
+        bootcamp_property (str): A string indicating an id or title
+
+    Returns:
+         Bootcamp: The bootcamp that matches the given property
+    """
+    if bootcamp_property.isdigit():
+        return Bootcamp.objects.get(id=bootcamp_property)
+    return Bootcamp.objects.get(title=bootcamp_property)
+
+
 def has_same_application_steps(bootcamp_id1, bootcamp_id2, ignore_order=True):
     """
     Returns True if the application steps are the same for the bootcamps indicated by the given ids
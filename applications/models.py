@@ -7,6 +7,7 @@ from operator import or_
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
@@ -35,6 +36,7 @@ from ecommerce.models import Order
 from jobma.models import Interview
 from klasses.api import deactivate_run_enrollment, create_run_enrollment
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
+from klasses.models import Installment, PersonalPrice
 from main.models import ValidateOnSaveMixin
 
 
@@ -107,7 +109,9 @@ class BootcampApplicationQuerySet(models.QuerySet):
         Prefetches models that inform the state of bootcamp applications,
         and filters to only include fulfilled orders.
         """
-        return self.select_related("user__profile", "bootcamp_run").prefetch_related(
+        return self.select_related(
+            "user__profile", "bootcamp_run", "ledger"
+        ).prefetch_related(
             "submissions",
             models.Prefetch(
                 "orders",
@@ -119,6 +123,53 @@ class BootcampApplicationQuerySet(models.QuerySet):
             "bootcamp_run__installment_set",
         )
 
+    def annotate_ledger_totals(self):
+        """
+        Annotates the values that make up each application's payment ledger (the amount paid and refunded
+        via fulfilled orders, and the personal price or else the full price of the bootcamp run)
+        """
+        fulfilled_orders = Order.objects.filter(
+            application=models.OuterRef("pk"), status=Order.FULFILLED
+        ).order_by()
+        personal_prices = PersonalPrice.objects.filter(
+            bootcamp_run=models.OuterRef("bootcamp_run"), user=models.OuterRef("user")
+        )
+        run_prices = (
+            Installment.objects.filter(bootcamp_run=models.OuterRef("bootcamp_run"))
+            .order_by()
+            .values("bootcamp_run")
+            .annotate(total=models.Sum("amount"))
+        )
+        return self.annotate(
+            ledger_amount_paid=_decimal_subquery(
+                fulfilled_orders.filter(total_price_paid__gt=0)
+                .values("application")
+                .annotate(total=models.Sum("total_price_paid"))
+                .values("total")
+            ),
+            ledger_amount_refunded=-_decimal_subquery(
+                fulfilled_orders.filter(total_price_paid__lt=0)
+                .values("application")
+                .annotate(total=models.Sum("total_price_paid"))
+                .values("total")
+            ),
+            ledger_price=Coalesce(
+                models.Subquery(personal_prices.values("price")[:1]),
+                models.Subquery(run_prices.values("total")),
+                models.Value(Decimal(0)),
+                output_field=models.DecimalField(max_digits=20, decimal_places=2),
+            ),
+        )
+
+
+def _decimal_subquery(queryset):
+    """Wraps a single-value decimal subquery so that an empty result is treated as zero"""
+    return Coalesce(
+        models.Subquery(queryset),
+        models.Value(Decimal(0)),
+        output_field=models.DecimalField(max_digits=20, decimal_places=2),
+    )
+
 
 class BootcampApplicationManager(models.Manager):
     """Custom manager for BootcampApplication model"""
@@ -130,6 +181,10 @@ class BootcampApplicationManager(models.Manager):
         """Prefetches models that inform the state of bootcamp applications"""
         return self.get_queryset().prefetch_state_data()
 
+    def annotate_ledger_totals(self):
+        """Annotates the values that make up each application's payment ledger"""
+        return self.get_queryset().annotate_ledger_totals()
+
 
 class BootcampApplication(TimestampedModel):
     """A user's application to a run of a bootcamp"""
@@ -154,6 +209,9 @@ class BootcampApplication(TimestampedModel):
     @property
     def total_paid(self):
         """Calculate the total paid of all fulfilled orders for this application"""
+        ledger = getattr(self, "ledger", None)
+        if ledger is not None:
+            return ledger.total_paid
         return sum(
             order.total_price_paid
             for order in self.orders.all()
@@ -163,6 +221,9 @@ class BootcampApplication(TimestampedModel):
     @property
     def price(self):
         """Calculate the price for the user, possibly their personal price or else the full price"""
+        ledger = getattr(self, "ledger", None)
+        if ledger is not None:
+            return ledger.price
         bootcamp_run = self.bootcamp_run
         return bootcamp_run.personal_price(self.user) or Decimal(0)
 
@@ -341,6 +402,32 @@ class BootcampApplication(TimestampedModel):
         return f"user='{self.user.email}', run='{self.bootcamp_run.title}', state={self.state}"
 
 
+class BootcampApplicationLedger(TimestampedModel):
+    """
+    Denormalized payment totals for a bootcamp application. This is kept up to date as orders and prices change,
+    so that payment status can be read without summing orders or looking up prices.
+    """
+
+    application = models.OneToOneField(
+        BootcampApplication, on_delete=models.CASCADE, related_name="ledger"
+    )
+    amount_paid = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    amount_refunded = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    price = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    balance_due = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    @property
+    def total_paid(self):
+        """The amount paid for the application, net of refunds"""
+        return self.amount_paid - self.amount_refunded
+
+    def __str__(self):
+        return (
+            f"Ledger for application {self.application_id}: paid={self.amount_paid}, "
+            f"refunded={self.amount_refunded}, price={self.price}, balance_due={self.balance_due}"
+        )
+
+
 class BootcampApplicationLine(TimestampedModel):
     """Dummy class for maintaining hubspot ids for deal (aka BootcampApplication) line_items"""
 
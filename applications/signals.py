@@ -1,7 +1,7 @@
 """Signals for application models"""
 
 from django.db.transaction import on_commit
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from applications.models import (
@@ -9,7 +9,9 @@ from applications.models import (
     ApplicationStepSubmission,
     BootcampApplicationLine,
 )
+from applications.facets import invalidate_review_submission_facets
 from hubspot_sync.task_helpers import sync_hubspot_application
+from klasses.models import BootcampRun
 
 # pylint:disable=unused-argument
 
@@ -34,3 +36,21 @@ def sync_deal_on_submission(sender, instance, created, **kwargs):
     """Sync application to hubspot when a submission is created"""
     if created:
         on_commit(lambda: sync_hubspot_application(instance.bootcamp_application))
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=ApplicationStepSubmission,
+    dispatch_uid="application_step_submission_facets",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=BootcampApplication,
+    dispatch_uid="bootcamp_application_facets",
+)
+@receiver(
+    [post_save, post_delete], sender=BootcampRun, dispatch_uid="bootcamp_run_facets"
+)
+def invalidate_facets(sender, instance, **kwargs):
+    """Invalidate the cached review submission facets when something they count changes"""
+    invalidate_review_submission_facets()
@@ -66,3 +66,20 @@ def refresh_pending_interview_links():
             api.populate_interviews_in_jobma(application)
         except:  # noqa: E722
             log.exception("Exception processing application %d", application.id)
+
+
+@app.task(acks_late=True)
+def update_application_ledgers(bootcamp_run_id, user_id=None):
+    """
+    Recalculate the existing payment ledgers of a bootcamp run's applications after its prices changed
+
+    Args:
+        bootcamp_run_id (int): The BootcampRun id
+        user_id (int): If set, only the ledger of this user's application is recalculated
+    """
+    filters = {"bootcamp_run_id": bootcamp_run_id}
+    if user_id is not None:
+        filters["user_id"] = user_id
+    api.reconcile_application_ledgers(
+        BootcampApplication.objects.filter(ledger__isnull=False, **filters)
+    )
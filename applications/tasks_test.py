@@ -5,6 +5,7 @@ from datetime import timedelta
 import pytest
 from mitol.common.utils import now_in_utc
 
+from applications.api import update_application_ledger
 from applications.constants import (
     AppStates,
     SUBMISSION_STATUS_PENDING,
@@ -21,6 +22,7 @@ from applications.factories import (
 from applications.tasks import (
     create_and_send_applicant_letter,
     refresh_pending_interview_links,
+    update_application_ledgers,
 )
 from ecommerce.test_utils import create_test_application
 from jobma.factories import InterviewFactory, JobFactory
@@ -196,3 +198,34 @@ def test_refresh_pending_interview_links_bad_interviews(  # pylint:disable=too-m
         app_no_interview_url.submissions.first().content_object.interview.interview_url
         is not None
     )
+
+
+@pytest.mark.parametrize("for_user", [True, False])
+def test_update_application_ledgers(mocker, for_user):
+    """update_application_ledgers should reconcile the existing ledgers of the run, or of one user in the run"""
+    mock_reconcile = mocker.patch(
+        "applications.tasks.api.reconcile_application_ledgers"
+    )
+    application = BootcampApplicationFactory.create()
+    for other_application in [
+        BootcampApplicationFactory.create(bootcamp_run=application.bootcamp_run),
+        BootcampApplicationFactory.create(),
+        application,
+    ]:
+        update_application_ledger(other_application)
+    BootcampApplicationFactory.create(bootcamp_run=application.bootcamp_run)
+    update_application_ledgers.delay(
+        application.bootcamp_run_id,
+        user_id=application.user_id if for_user else None,
+    )
+    applications = mock_reconcile.call_args[0][0]
+    expected = (
+        [application]
+        if for_user
+        else list(
+            application.bootcamp_run.applications.filter(ledger__isnull=False).order_by(
+                "id"
+            )
+        )
+    )
+    assert list(applications.order_by("id")) == expected
@@ -3,7 +3,7 @@
 from collections import OrderedDict
 
 import re
-from django.db.models import Count, Subquery, OuterRef, IntegerField, Prefetch, Q
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView
 from django_filters.rest_framework import DjangoFilterBackend
@@ -25,6 +25,7 @@ from applications.serializers import (
     SubmissionReviewSerializer,
 )
 from applications.api import get_or_create_bootcamp_application
+from applications.facets import get_review_submission_facets
 from applications.filters import ApplicationStepSubmissionFilterSet
 from applications.models import (
     ApplicantLetter,
@@ -109,7 +110,7 @@ class ReviewSubmissionPagination(LimitOffsetPagination):
 
     def paginate_queryset(self, queryset, request, view=None):
         """Paginate the queryset"""
-        self.facets = self.get_facets(queryset)
+        self.facets = self.get_facets(queryset, request, view=view)
         return super().paginate_queryset(queryset, request, view=view)
 
     def get_paginated_response(self, data):
@@ -126,27 +127,16 @@ class ReviewSubmissionPagination(LimitOffsetPagination):
             )
         )
 
-    def get_facets(self, queryset):
-        """Return a dictionary of facets"""
-        statuses = (
-            queryset.values("review_status")
-            .annotate(count=Count("review_status"))
-            .order_by("count")
-        )
-        qs = (
-            queryset.values("bootcamp_application__bootcamp_run")
-            .filter(bootcamp_application__bootcamp_run=OuterRef("pk"))
-            .order_by()
-            .annotate(count=Count("*"))
-            .values("count")
-        )
-        bootcamp_runs = (
-            BootcampRun.objects.values("id", "title", "start_date", "end_date")
-            .annotate(count=Subquery(qs, output_field=IntegerField()))
-            .filter(count__gte=1)
-            .distinct()
-        )
-        return {"review_statuses": statuses, "bootcamp_runs": bootcamp_runs}
+    def get_facets(self, queryset, request, view=None):
+        """Return a dictionary of facets, cached for the filters in the request"""
+        filterset_class = getattr(view, "filterset_class", None)
+        filter_names = filterset_class.get_filters() if filterset_class else []
+        filters = {
+            name: request.query_params.getlist(name)
+            for name in filter_names
+            if name in request.query_params
+        }
+        return get_review_submission_facets(queryset, filters)
 
 
 class ReviewSubmissionViewSet(
@@ -18,6 +18,7 @@ from applications.constants import (
     ALL_REVIEW_STATUSES,
     SUBMISSION_STATUS_SUBMITTED,
 )
+from applications import facets
 from applications.factories import (
     BootcampApplicationFactory,
     BootcampRunApplicationStepFactory,
@@ -262,6 +263,26 @@ def test_review_submission_list_expired(admin_drf_client, bootcamp_run_submissio
     }
 
 
+def test_review_submission_list_facets_cached(
+    mocker, admin_drf_client, bootcamp_run_submissions
+):
+    """
+    Paging through the review submission list should compute the facets once per filter set
+    """
+    compute_spy = mocker.spy(facets, "compute_review_submission_facets")
+    url = reverse("submissions_api-list")
+    bootcamp_run_id = bootcamp_run_submissions.bootcamp_runs[0].id
+    for offset in [0, 2, 4]:
+        resp = admin_drf_client.get(url, dict(limit=2, offset=offset))
+        assert resp.status_code == status.HTTP_200_OK
+        resp = admin_drf_client.get(
+            url, dict(limit=2, offset=offset, bootcamp_run_id=bootcamp_run_id)
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["facets"]["bootcamp_runs"][0]["id"] == bootcamp_run_id
+    assert compute_spy.call_count == 2
+
+
 def test_review_submission_list_query_bootcamp_run_id(admin_drf_client):
     """
     The review submission list view should return a list of submissions filtered by bootcamp run id
@@ -1,10 +1,7 @@
 """Auth pipline functions for user authentication"""
 
-import json
 import logging
 
-import requests
-from django.conf import settings
 from django.db import IntegrityError
 from django.shortcuts import reverse
 from social_core.backends.email import EmailAuth
@@ -22,7 +19,7 @@ from authentication.exceptions import (
 )
 from authentication.utils import SocialAuthState
 from compliance import api as compliance_api
-from hubspot_sync.task_helpers import sync_hubspot_user
+from hubspot_sync.task_helpers import submit_hubspot_user_form, sync_hubspot_user
 from profiles.serializers import ProfileSerializer, UserSerializer
 from profiles.utils import usernameify
 
@@ -253,29 +250,11 @@ def activate_user(
 
 def send_user_to_hubspot(request, **kwargs):
     """
-    Create a hubspot contact using the hubspot Forms API
+    Queue the creation of a hubspot contact using the hubspot Forms API
     Submit the user's email and optionally a hubspotutk cookie
     """
-    portal_id = settings.HUBSPOT_CONFIG.get("HUBSPOT_PORTAL_ID")
-    form_id = settings.HUBSPOT_CONFIG.get("HUBSPOT_CREATE_USER_FORM_ID")
-
-    if not (portal_id and form_id):
-        return {}
-
-    hutk = request.COOKIES.get("hubspotutk")
     email = kwargs.get("email", kwargs.get("details", {}).get("email"))
-
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-
-    data = {"email": email}
-
-    if hutk:
-        data["hs_context"] = json.dumps({"hutk": hutk})
-
-    url = f"https://forms.hubspot.com/uploads/form/v2/{portal_id}/{form_id}?&"
-
-    requests.post(url=url, data=data, headers=headers)
-
+    submit_hubspot_user_form(email, hutk=request.COOKIES.get("hubspotutk"))
     return {}
 
 
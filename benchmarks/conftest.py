@@ -0,0 +1,154 @@
+"""Fixtures for the benchmark suite"""
+
+# pylint: disable=redefined-outer-name
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.data import seed_benchmark_data
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless they were asked for"""
+    if config.getoption("--benchmarks"):
+        return
+    skip_benchmarks = pytest.mark.skip(reason="Use --benchmarks to run benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmarks)
+
+
+@pytest.fixture(scope="session")
+def benchmark_data(
+    request, django_db_setup, django_db_blocker
+):  # pylint: disable=unused-argument
+    """
+    Seed the database once for all benchmarks. The data is rolled back at the end of the session so
+    it never ends up in a reused test database.
+    """
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            yield seed_benchmark_data(
+                scale=request.config.getoption("--benchmark-scale")
+            )
+            transaction.set_rollback(True)
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """Collect the measurements of all benchmarks, then write the report and the baseline if requested"""
+    with open(BASELINE_PATH) as baseline_file:
+        baseline = json.load(baseline_file)
+    results = {}
+    yield baseline, results
+
+    config = request.config
+    with open(config.getoption("--benchmark-report"), "w") as report_file:
+        json.dump(
+            {"scale": config.getoption("--benchmark-scale"), "results": results},
+            report_file,
+            indent=2,
+            sort_keys=True,
+        )
+    if config.getoption("--benchmark-update-baseline"):
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(
+                {
+                    **baseline,
+                    **{
+                        name: {"queries": result["queries"]}
+                        for name, result in results.items()
+                    },
+                },
+                baseline_file,
+                indent=2,
+                sort_keys=True,
+            )
+            baseline_file.write("\n")
+
+
+def _measure_once(func, setup):
+    """
+    Call func once, with the arguments returned by setup if any
+
+    Returns:
+        tuple: The result, the elapsed seconds, and the queries that were run
+    """
+    kwargs = setup() if setup else {}
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = func(**kwargs)
+        elapsed = time.perf_counter() - start
+    if hasattr(response, "status_code"):
+        assert response.status_code < 400, response.content
+    return response, elapsed, queries.captured_queries
+
+
+@pytest.fixture
+def benchmark(request, benchmark_results):
+    """
+    Returns a function that measures the query count, wall time and peak memory of a request or any other
+    operation, and fails if the query count went past the baseline
+    """
+    baseline, results = benchmark_results
+    rounds = request.config.getoption("--benchmark-rounds")
+
+    def _benchmark(name, func, setup=None, items=None):
+        """
+        Args:
+            name (str): The name of the benchmark in the baseline and the report
+            func (callable): Makes the request and returns the response, or runs any other operation
+            setup (callable): Returns keyword arguments for func. It isn't measured.
+            items (int): The number of items func processes, to report a throughput
+
+        Returns:
+            HttpResponse: The response or result of the last call
+        """
+        # Warm up caches which are populated once per process, like content types
+        _measure_once(func, setup)
+
+        tracemalloc.start()
+        try:
+            _, _, queries = _measure_once(func, setup)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings = []
+        for _ in range(rounds):
+            response, elapsed, _ = _measure_once(func, setup)
+            timings.append(elapsed)
+
+        baseline_queries = baseline.get(name, {}).get("queries")
+        results[name] = {
+            "queries": len(queries),
+            "baseline_queries": baseline_queries,
+            "wall_time_ms": {
+                "min": min(timings) * 1000,
+                "median": statistics.median(timings) * 1000,
+                "max": max(timings) * 1000,
+            },
+            "peak_memory_kb": peak_memory / 1024,
+        }
+        if items:
+            results[name]["items_per_second"] = items / statistics.median(timings)
+        if baseline_queries is not None and len(queries) > baseline_queries:
+            pytest.fail(
+                "{name} ran {count} queries, more than the baseline of {baseline}:\n{queries}".format(
+                    name=name,
+                    count=len(queries),
+                    baseline=baseline_queries,
+                    queries="\n".join(query["sql"] for query in queries),
+                )
+            )
+        return response
+
+    return _benchmark
@@ -0,0 +1,133 @@
+"""Seed data for the benchmark suite"""
+
+from collections import namedtuple
+from itertools import cycle
+
+from backends.edxorg import EdxOrgOAuth2
+from applications.constants import AppStates, REVIEW_STATUS_PENDING
+from applications.factories import (
+    ApplicationStepSubmissionFactory,
+    BootcampApplicationFactory,
+)
+from applications.models import BootcampRunApplicationStep
+from ecommerce.factories import LineFactory, OrderFactory
+from ecommerce.models import Order
+from jobma.factories import JobFactory
+from klasses.factories import PersonalPriceFactory
+from klasses.models import BootcampRun
+from localdev.seed.api import create_seed_data
+from localdev.seed.utils import get_raw_seed_data_from_file
+from profiles.factories import UserFactory, UserSocialAuthFactory
+
+BENCHMARK_USERS_PER_SCALE = 1000
+
+BenchmarkData = namedtuple(
+    "BenchmarkData",
+    ["learner", "learner_username", "staff", "runs", "checkout_application"],
+)
+
+APPLICATION_STATES = [
+    AppStates.AWAITING_USER_SUBMISSIONS.value,
+    AppStates.AWAITING_SUBMISSION_REVIEW.value,
+    AppStates.AWAITING_PAYMENT.value,
+    AppStates.COMPLETE.value,
+    AppStates.REJECTED.value,
+]
+PAID_APPLICATION_STATES = {AppStates.AWAITING_PAYMENT.value, AppStates.COMPLETE.value}
+
+
+def _create_application(user, bootcamp_run, state, run_steps, job):
+    """
+    Create an application with a submission for each step of the run, and a fulfilled order if
+    the application has reached the payment stage
+
+    Args:
+        user (User): The applicant
+        bootcamp_run (BootcampRun): The run applied to
+        state (str): The application state
+        run_steps (list of BootcampRunApplicationStep): The application steps of the run
+        job (Job): The video interview job of the run
+
+    Returns:
+        BootcampApplication: The new application
+    """
+    application = BootcampApplicationFactory.create(
+        user=user, bootcamp_run=bootcamp_run, state=state
+    )
+    if state != AppStates.AWAITING_USER_SUBMISSIONS.value:
+        for run_step in run_steps:
+            ApplicationStepSubmissionFactory.create(
+                bootcamp_application=application,
+                run_application_step=run_step,
+                is_review_ready=True,
+                review_status=REVIEW_STATUS_PENDING,
+                content_object__interview__job=job,
+                content_object__interview__applicant=user,
+            )
+    if state in PAID_APPLICATION_STATES:
+        order = OrderFactory.create(
+            user=user, application=application, status=Order.FULFILLED
+        )
+        LineFactory.create(order=order, bootcamp_run=bootcamp_run)
+    return application
+
+
+def seed_benchmark_data(scale=1):
+    """
+    Seed bootcamps and runs from the localdev seed data, then create applicants with
+    applications, submissions and orders across those runs
+
+    Args:
+        scale (int): Multiplier for the number of applicants
+
+    Returns:
+        BenchmarkData: The objects the benchmarks make requests with
+    """
+    create_seed_data(get_raw_seed_data_from_file())
+    runs = list(BootcampRun.objects.order_by("id"))
+    run_steps = {run.id: [] for run in runs}
+    for run_step in BootcampRunApplicationStep.objects.order_by("id"):
+        run_steps[run_step.bootcamp_run_id].append(run_step)
+    jobs = {run.id: JobFactory.create(run=run) for run in runs}
+
+    states = cycle(APPLICATION_STATES)
+    run_cycle = cycle(runs)
+    for _ in range(BENCHMARK_USERS_PER_SCALE * scale):
+        bootcamp_run = next(run_cycle)
+        _create_application(
+            UserFactory.create(),
+            bootcamp_run,
+            next(states),
+            run_steps[bootcamp_run.id],
+            jobs[bootcamp_run.id],
+        )
+
+    # The user the learner-facing endpoints are requested as has applied to every run
+    learner = UserFactory.create()
+    social_auth = UserSocialAuthFactory.create(
+        user=learner, provider=EdxOrgOAuth2.name, uid=f"{learner.username}_edx"
+    )
+    applications = [
+        _create_application(
+            learner,
+            bootcamp_run,
+            state,
+            run_steps[bootcamp_run.id],
+            jobs[bootcamp_run.id],
+        )
+        for bootcamp_run, state in zip(runs, cycle(APPLICATION_STATES))
+    ]
+    for bootcamp_run in runs[::2]:
+        PersonalPriceFactory.create(user=learner, bootcamp_run=bootcamp_run)
+
+    return BenchmarkData(
+        learner=learner,
+        learner_username=social_auth.uid,
+        staff=UserFactory.create(is_staff=True),
+        runs=runs,
+        checkout_application=next(
+            application
+            for application in applications
+            if application.state == AppStates.AWAITING_PAYMENT.value
+        ),
+    )
@@ -0,0 +1,92 @@
+"""Query count and latency benchmarks for the main API endpoints"""
+
+# pylint: disable=redefined-outer-name
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from applications.constants import AppStates
+from applications.factories import BootcampApplicationFactory
+from ecommerce.api import create_unfulfilled_order, make_reference_id
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def test_applications_list(benchmark, benchmark_data, client):
+    """Benchmark the list of a learner's applications"""
+    client.force_login(benchmark_data.learner)
+    benchmark("applications-list", lambda: client.get(reverse("applications_api-list")))
+
+
+def test_applications_detail(benchmark, benchmark_data, client):
+    """Benchmark the detail of an application which has submissions and an order"""
+    client.force_login(benchmark_data.learner)
+    url = reverse(
+        "applications_api-detail",
+        kwargs={"pk": benchmark_data.checkout_application.id},
+    )
+    benchmark("applications-detail", lambda: client.get(url))
+
+
+def test_review_submissions(benchmark, benchmark_data, client):
+    """Benchmark the page of submissions to review, including the facets"""
+    client.force_login(benchmark_data.staff)
+    benchmark(
+        "review-submissions-list", lambda: client.get(reverse("submissions_api-list"))
+    )
+
+
+def test_user_bootcamp_run_list(benchmark, benchmark_data, client):
+    """Benchmark the payment history of a learner's bootcamp runs"""
+    client.force_login(benchmark_data.learner)
+    url = reverse(
+        "bootcamp-run-list", kwargs={"username": benchmark_data.learner_username}
+    )
+    benchmark("user-bootcamp-run-list", lambda: client.get(url))
+
+
+def test_checkout_data(benchmark, benchmark_data, client):
+    """Benchmark the checkout data of an application awaiting payment"""
+    client.force_login(benchmark_data.learner)
+    url = "{}?application={}".format(
+        reverse("checkout-data-detail"), benchmark_data.checkout_application.id
+    )
+    benchmark("checkout-data", lambda: client.get(url))
+
+
+def test_bootcamp_runs(benchmark, benchmark_data, client):
+    """Benchmark the list of bootcamp runs"""
+    client.force_login(benchmark_data.learner)
+    benchmark("bootcamp-runs-list", lambda: client.get(reverse("bootcamp-runs-list")))
+
+
+def test_order_fulfillment(benchmark, benchmark_data, client, mocker, settings):
+    """Benchmark the fulfillment of a new order by CyberSource"""
+    settings.CYBERSOURCE_REFERENCE_PREFIX = "benchmark"
+    mocker.patch(
+        "ecommerce.views.IsSignedByCyberSource.has_permission", return_value=True
+    )
+    mocker.patch("ecommerce.api.tasks")
+    bootcamp_run = benchmark_data.checkout_application.bootcamp_run
+
+    def setup():
+        """Create an unfulfilled order for a new application"""
+        application = BootcampApplicationFactory.create(
+            bootcamp_run=bootcamp_run, state=AppStates.AWAITING_PAYMENT.value
+        )
+        order = create_unfulfilled_order(
+            application=application, payment_amount=Decimal(100)
+        )
+        return {
+            "data": {
+                "req_reference_number": make_reference_id(order),
+                "decision": "ACCEPT",
+            }
+        }
+
+    benchmark(
+        "order-fulfillment",
+        lambda data: client.post(reverse("order-fulfillment"), data=data),
+        setup=setup,
+    )
@@ -0,0 +1,71 @@
+"""Throughput benchmarks for rendering emails"""
+
+import pytest
+
+from applications.constants import AppStates
+from applications.models import BootcampApplication
+from applications.serializers import BootcampApplicationDetailSerializer
+from mail.v2 import api as mail_api
+from mail.v2.constants import EMAIL_RECEIPT
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+RECEIPT_COUNT = 50
+# The web font stylesheet linked by every email, so the benchmark doesn't measure the network
+FONT_STYLESHEET = """
+@font-face {
+  font-family: 'Source Sans Pro';
+  font-style: normal;
+  font-weight: 400;
+  src: url(https://fonts.gstatic.com/s/sourcesanspro/v22/6xK3dSBYKcSV-LCoeQqfX1RYOo3qOK7l.ttf) format('truetype');
+}
+"""
+
+
+@pytest.fixture
+def receipt_recipients_and_contexts(benchmark_data):  # pylint: disable=unused-argument
+    """The recipients and contexts of receipts for completed applications"""
+    applications = (
+        BootcampApplication.objects.prefetch_state_data()
+        .filter(state=AppStates.COMPLETE.value)
+        .order_by("id")[:RECEIPT_COUNT]
+    )
+    return [
+        (
+            application.user.email,
+            {
+                "application": BootcampApplicationDetailSerializer(
+                    instance=application
+                ).data
+            },
+        )
+        for application in applications
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_render_receipts(
+    benchmark, mocker, settings, receipt_recipients_and_contexts, max_workers
+):
+    """Benchmark how many receipt emails are rendered per second"""
+    settings.MAIL_RENDER_WORKERS = max_workers
+    mocker.patch("mail.v2.api._fetch_stylesheet", return_value=FONT_STYLESHEET)
+    base_context = mail_api.get_base_context()
+
+    def setup():
+        """Copy the contexts, since rendering adds the subject to them"""
+        return {
+            "recipients_and_contexts": [
+                (recipient, {**base_context, **context})
+                for recipient, context in receipt_recipients_and_contexts
+            ]
+        }
+
+    benchmark(
+        f"render-receipts-{max_workers}-workers",
+        lambda recipients_and_contexts: list(
+            mail_api.messages_for_recipients(recipients_and_contexts, EMAIL_RECEIPT)
+        ),
+        setup=setup,
+        items=len(receipt_recipients_and_contexts),
+    )
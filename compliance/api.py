@@ -1,17 +1,31 @@
 """Compliance API"""
 
 from collections import namedtuple
+from datetime import timedelta
+from functools import lru_cache
+import hashlib
+import hmac
+import json
 import logging
 
 from django.conf import settings
+from django.db.models import Q
 from lxml import etree
+from mitol.common.utils import now_in_utc
 from nacl.encoding import Base64Encoder
 from nacl.public import PublicKey, SealedBox
+import requests
+from requests.adapters import HTTPAdapter
 from zeep import Client
 from zeep.plugins import HistoryPlugin
+from zeep.transports import Transport
+from zeep.wsdl import Document
 from zeep.wsse.username import UsernameToken
 
 from compliance.constants import (
+    CYBERSOURCE_CONNECTION_POOL_SIZE,
+    CYBERSOURCE_OPERATION_TIMEOUT,
+    CYBERSOURCE_WSDL_TIMEOUT,
     REASON_CODE_SUCCESS,
     EXPORTS_BLOCKED_REASON_CODES,
     TEMPORARY_FAILURE_REASON_CODES,
@@ -40,9 +54,51 @@ def is_exports_verification_enabled():
     return all(getattr(settings, key) for key in EXPORTS_REQUIRED_KEYS)
 
 
+@lru_cache(maxsize=1)
+def get_cybersource_transport():
+    """
+    Returns the transport shared by all CyberSource clients of this process, so that connections are reused
+
+    Returns:
+        zeep.transports.Transport: a transport with a pooled session and timeouts
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=CYBERSOURCE_CONNECTION_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return Transport(
+        session=session,
+        timeout=CYBERSOURCE_WSDL_TIMEOUT,
+        operation_timeout=CYBERSOURCE_OPERATION_TIMEOUT,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_cybersource_wsdl(wsdl_url):
+    """
+    Loads and parses the CyberSource WSDL once per process
+
+    Args:
+        wsdl_url (str): the url of the WSDL
+
+    Returns:
+        zeep.wsdl.Document: the parsed WSDL
+    """
+    return Document(wsdl_url, get_cybersource_transport())
+
+
+def clear_cybersource_client_cache():
+    """Discards the cached CyberSource WSDL and transport"""
+    get_cybersource_wsdl.cache_clear()
+    get_cybersource_transport.cache_clear()
+
+
 def get_cybersource_client():
     """
-    Configures and authenticates a CyberSource client
+    Configures and authenticates a CyberSource client. The client is cheap to create since the parsed WSDL
+    and the transport are shared, and each client has its own history plugin.
 
     Returns:
         (zeep.Client, zeep.plugins.HistoryPlugin):
@@ -52,7 +108,12 @@ def get_cybersource_client():
         settings.CYBERSOURCE_MERCHANT_ID, settings.CYBERSOURCE_TRANSACTION_KEY
     )
     history = HistoryPlugin()
-    client = Client(settings.CYBERSOURCE_WSDL_URL, wsse=wsse, plugins=[history])
+    client = Client(
+        get_cybersource_wsdl(settings.CYBERSOURCE_WSDL_URL),
+        wsse=wsse,
+        transport=get_cybersource_transport(),
+        plugins=[history],
+    )
     return client, history
 
 
@@ -92,9 +153,9 @@ def get_encryption_public_key():
     )
 
 
-def log_exports_inquiry(user, response, last_sent, last_received):
+def make_exports_inquiry(user, response, last_sent, last_received):
     """
-    Log a request/response for an export inquiry for a given user
+    Build an unsaved log of a request/response for an export inquiry for a given user
 
     Args:
         user (User): the user that was checked for exports compliance
@@ -103,7 +164,7 @@ def log_exports_inquiry(user, response, last_sent, last_received):
         last_received (dict): the raw response received for this call
 
     Returns:
-        ExportsInquiryLog: the generated log record of the exports inquiry
+        ExportsInquiryLog: the unsaved log record of the exports inquiry, or None for a temporary failure
     """
     # render lxml data structures into a string so we can encrypt it
     # pylint: disable=c-extension-no-member
@@ -134,7 +195,7 @@ def log_exports_inquiry(user, response, last_sent, last_received):
         "ascii"
     )
 
-    return ExportsInquiryLog.objects.create(
+    return ExportsInquiryLog(
         user=user,
         computed_result=compute_result_from_codes(reason_code, info_code),
         reason_code=reason_code,
@@ -144,6 +205,25 @@ def log_exports_inquiry(user, response, last_sent, last_received):
     )
 
 
+def log_exports_inquiry(user, response, last_sent, last_received):
+    """
+    Log a request/response for an export inquiry for a given user
+
+    Args:
+        user (User): the user that was checked for exports compliance
+        response (etree.Element): the root response node from the API call
+        last_sent (dict): the raw request sent for this call
+        last_received (dict): the raw response received for this call
+
+    Returns:
+        ExportsInquiryLog: the generated log record of the exports inquiry
+    """
+    exports_inquiry = make_exports_inquiry(user, response, last_sent, last_received)
+    if exports_inquiry is not None:
+        exports_inquiry.save()
+    return exports_inquiry
+
+
 def decrypt_exports_inquiry(exports_inquiry_log, private_key):
     """
     Decrypts an exports inquiry log given a private key
@@ -208,10 +288,16 @@ def get_bill_to_address(user):
     return billing_address
 
 
-def verify_user_with_exports(user):
-    """Verify the user against the CyberSource exports service"""
-    client, history = get_cybersource_client()
+def get_exports_payload(user):
+    """
+    Create the request to the CyberSource exports service for a user
 
+    Args:
+        user (User): the user to verify
+
+    Returns:
+        dict: the arguments of the runTransaction call
+    """
     payload = {
         "merchantID": settings.CYBERSOURCE_MERCHANT_ID,
         "merchantReferenceCode": user.id,
@@ -229,9 +315,120 @@ def verify_user_with_exports(user):
     if sanctions_lists:
         payload["exportService"]["sanctionsLists"] = sanctions_lists
 
+    return payload
+
+
+def run_exports_inquiry(user, payload):
+    """
+    Send a request to the CyberSource exports service, without touching the database
+
+    Args:
+        user (User): the user to verify
+        payload (dict): the request created by get_exports_payload
+
+    Returns:
+        ExportsInquiryLog: the unsaved log record of the exports inquiry, or None for a temporary failure
+    """
+    client, history = get_cybersource_client()
+
     response = client.service.runTransaction(**payload)
 
-    return log_exports_inquiry(user, response, history.last_sent, history.last_received)
+    exports_inquiry = make_exports_inquiry(
+        user, response, history.last_sent, history.last_received
+    )
+    if exports_inquiry is not None:
+        exports_inquiry.identity_hash = get_exports_identity_hash(payload)
+    return exports_inquiry
+
+
+def _normalize_exports_value(value):
+    """Normalize case and whitespace of a value sent to the exports service"""
+    if isinstance(value, dict):
+        return {key: _normalize_exports_value(item) for key, item in value.items()}
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).casefold()
+
+
+def get_exports_identity_hash(payload):
+    """
+    Computes a keyed hash of the screened identity, so that equivalent requests can reuse a recent result
+    without the name and address being readable from the database
+
+    Args:
+        payload (dict): the request created by get_exports_payload
+
+    Returns:
+        str: the hex digest of the normalized billing address and exports service options
+    """
+    identity = _normalize_exports_value(
+        {"billTo": payload["billTo"], "exportService": payload["exportService"]}
+    )
+    return hmac.new(
+        settings.SECRET_KEY.encode(),
+        json.dumps(identity, sort_keys=True).encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def get_cached_exports_inquiry(user, identity_hash):
+    """
+    Finds a recent accepted or denied exports inquiry for the same identity, and copies it for the user
+
+    Args:
+        user (User): the user to verify
+        identity_hash (str): the hash computed by get_exports_identity_hash
+
+    Returns:
+        ExportsInquiryLog: an unsaved copy of the recent log record, or None if there isn't one
+    """
+    now = now_in_utc()
+    recent = Q()
+    for result, ttl in [
+        (RESULT_SUCCESS, settings.CYBERSOURCE_EXPORT_SUCCESS_CACHE_TTL),
+        (RESULT_DENIED, settings.CYBERSOURCE_EXPORT_DENIED_CACHE_TTL),
+    ]:
+        if ttl > 0:
+            recent |= Q(
+                computed_result=result, created_on__gte=now - timedelta(seconds=ttl)
+            )
+    if not recent:
+        return None
+    cached = (
+        ExportsInquiryLog.objects.filter(recent, identity_hash=identity_hash)
+        .order_by("-created_on")
+        .first()
+    )
+    if cached is None:
+        return None
+    log.info(
+        "Reusing exports inquiry %d for user %d with the same identity",
+        cached.id,
+        user.id,
+    )
+    return ExportsInquiryLog(
+        user=user,
+        computed_result=cached.computed_result,
+        reason_code=cached.reason_code,
+        info_code=cached.info_code,
+        encrypted_request=cached.encrypted_request,
+        encrypted_response=cached.encrypted_response,
+        identity_hash=identity_hash,
+    )
+
+
+def verify_user_with_exports(user):
+    """
+    Verify the user against the CyberSource exports service, reusing a recent result for the same
+    name and address if there is one
+    """
+    payload = get_exports_payload(user)
+    exports_inquiry = get_cached_exports_inquiry(
+        user, get_exports_identity_hash(payload)
+    ) or run_exports_inquiry(user, payload)
+    if exports_inquiry is not None:
+        exports_inquiry.save()
+    return exports_inquiry
 
 
 def get_latest_exports_inquiry(user):
@@ -1,15 +1,19 @@
 """Tests for compliance api"""
 
 # pylint: disable=redefined-outer-name,c-extension-no-member
+from datetime import timedelta
 import time
 
 import pytest
 from lxml import etree
+from mitol.common.utils import now_in_utc
 from nacl.encoding import Base64Encoder
 from nacl.public import SealedBox
 
 from compliance import api
 from compliance.constants import (
+    CYBERSOURCE_OPERATION_TIMEOUT,
+    CYBERSOURCE_WSDL_TIMEOUT,
     RESULT_SUCCESS,
     RESULT_DENIED,
     RESULT_UNKNOWN,
@@ -17,6 +21,7 @@ from compliance.constants import (
 )
 from compliance.factories import ExportsInquiryLogFactory
 from compliance.models import ExportsInquiryLog
+from compliance.test_utils import mock_cybersource_wsdl
 
 
 @pytest.mark.usefixtures("cybersource_settings")
@@ -33,6 +38,22 @@ def test_is_exports_verification_disabled(settings, key):
     assert api.is_exports_verification_enabled() is False
 
 
+def test_get_cybersource_client(mocked_responses, cybersource_settings):
+    """get_cybersource_client should load the WSDL once and share it and the transport between clients"""
+    mock_cybersource_wsdl(mocked_responses, cybersource_settings)
+
+    client, history = api.get_cybersource_client()
+    other_client, other_history = api.get_cybersource_client()
+
+    assert len(mocked_responses.calls) == 2  # the WSDL and its XSD
+    assert client is not other_client
+    assert history is not other_history
+    assert client.wsdl is other_client.wsdl
+    assert client.transport is other_client.transport
+    assert client.transport.load_timeout == CYBERSOURCE_WSDL_TIMEOUT
+    assert client.transport.operation_timeout == CYBERSOURCE_OPERATION_TIMEOUT
+
+
 def test_decrypt_exports_inquiry(mocker, cybersource_private_key):
     """Test that decrypt_exports_inquiry can decrypted an encrypted log"""
     request = b"<sent/>"
@@ -87,6 +108,9 @@ def test_verify_user_with_exports(
     result = api.verify_user_with_exports(user)
 
     assert result.computed_result == expected_result
+    assert result.identity_hash == api.get_exports_identity_hash(
+        api.get_exports_payload(user)
+    )
 
     assert ExportsInquiryLog.objects.filter(user=user).exists()
 
@@ -147,6 +171,74 @@ def test_verify_user_with_exports_sanctions_lists(
         assert "sanctionsLists" not in payload["exportService"]
 
 
+def test_get_exports_identity_hash(user, cybersource_settings):
+    """The identity hash should ignore case and whitespace, but not the address or service options"""
+    payload = api.get_exports_payload(user)
+    identity_hash = api.get_exports_identity_hash(payload)
+    assert len(identity_hash) == 64
+
+    variant = api.get_exports_payload(user)
+    variant["merchantReferenceCode"] = user.id + 1
+    variant["billTo"]["firstName"] = f"  {payload['billTo']['firstName'].upper()} "
+    assert api.get_exports_identity_hash(variant) == identity_hash
+
+    variant["billTo"]["city"] = "Another City"
+    assert api.get_exports_identity_hash(variant) != identity_hash
+
+    cybersource_settings.CYBERSOURCE_EXPORT_SERVICE_SANCTIONS_LISTS = "OFAC"
+    assert api.get_exports_identity_hash(api.get_exports_payload(user)) != (
+        identity_hash
+    )
+
+
+@pytest.mark.usefixtures("cybersource_settings")
+@pytest.mark.parametrize(
+    "computed_result, age, ttl, is_reused",
+    [
+        [RESULT_SUCCESS, 10, 60, True],
+        [RESULT_DENIED, 10, 60, True],
+        [RESULT_SUCCESS, 100, 60, False],
+        [RESULT_DENIED, 10, 0, False],
+        [RESULT_UNKNOWN, 10, 60, False],
+    ],
+)
+def test_verify_user_with_exports_cached(
+    mocker, settings, user, computed_result, age, ttl, is_reused
+):  # pylint: disable=too-many-arguments
+    """verify_user_with_exports should reuse a recent accepted or denied result for the same identity"""
+    settings.CYBERSOURCE_EXPORT_SUCCESS_CACHE_TTL = ttl
+    settings.CYBERSOURCE_EXPORT_DENIED_CACHE_TTL = ttl
+    cached = ExportsInquiryLogFactory.create(
+        computed_result=computed_result,
+        identity_hash=api.get_exports_identity_hash(api.get_exports_payload(user)),
+    )
+    ExportsInquiryLog.objects.filter(id=cached.id).update(
+        created_on=now_in_utc() - timedelta(seconds=age)
+    )
+    fresh = ExportsInquiryLogFactory.build(user=user, computed_result=RESULT_SUCCESS)
+    mock_run = mocker.patch("compliance.api.run_exports_inquiry", return_value=fresh)
+
+    result = api.verify_user_with_exports(user)
+
+    assert result.user == user
+    assert result.id is not None
+    if is_reused:
+        mock_run.assert_not_called()
+        assert result.id != cached.id
+        assert result.identity_hash == cached.identity_hash
+        for field in [
+            "computed_result",
+            "reason_code",
+            "info_code",
+            "encrypted_request",
+            "encrypted_response",
+        ]:
+            assert getattr(result, field) == getattr(cached, field)
+    else:
+        mock_run.assert_called_once()
+        assert result == fresh
+
+
 def test_get_latest_export_inquiry(user):
     """Test that get_latest_export_inquiry returns the latest log entry"""
     log1 = ExportsInquiryLogFactory.create(user=user)
@@ -66,3 +66,12 @@ EXPORTS_BLOCKED_REASON_CODES = [
     REASON_CODE_EMBARGO_COUNTRY_EMAIL,
     REASON_CODE_EMBARGO_COUNTRY_BY_IP,
 ]
+
+# Seconds to wait for the CyberSource WSDL to load and for each SOAP call
+CYBERSOURCE_WSDL_TIMEOUT = 30
+CYBERSOURCE_OPERATION_TIMEOUT = 15
+# Max number of connections to CyberSource kept open by each process
+CYBERSOURCE_CONNECTION_POOL_SIZE = 10
+
+# Number of users to re-screen between checkpoints
+EXPORTS_RESCREENING_BATCH_SIZE = 100
@@ -0,0 +1,89 @@
+"""
+Management command to re-screen existing users against the exports service
+"""
+
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from compliance.api import is_exports_verification_enabled
+from compliance.constants import EXPORTS_RESCREENING_BATCH_SIZE
+from compliance.rescreening import reset_rescreening_checkpoint, rescreen_users
+from compliance.tasks import rescreen_users_with_exports
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Management command to re-screen existing users against the exports service
+    """
+
+    help = (
+        "Re-screen all active users with a legal address against the exports service, resuming an "
+        "interrupted re-screening unless --restart is given"
+    )
+
+    def add_arguments(self, parser):
+        """
+        Definition of arguments this command accepts
+        """
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=EXPORTS_RESCREENING_BATCH_SIZE,
+            help="Number of users to screen between checkpoints",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard the checkpoint of an earlier re-screening and start from the first user",
+        )
+        parser.add_argument(
+            "--async",
+            dest="run_async",
+            action="store_true",
+            help="Re-screen in celery tasks, which email a summary to the admins when they finish",
+        )
+
+    def write_progress(self, progress):
+        """
+        Report the progress of the re-screening
+
+        Args:
+            progress (RescreeningProgress): The progress of the re-screening
+        """
+        self.stdout.write(
+            f"  {progress.screened}/{progress.total} screened, {progress.failed} failed, "
+            f"{len(progress.denied_user_ids)} newly denied"
+        )
+
+    def handle(self, *args, **options):
+        """Run the command"""
+        if not is_exports_verification_enabled():
+            self.stderr.write(self.style.ERROR("Export compliance checks are disabled"))
+            sys.exit(1)
+
+        if options["restart"]:
+            reset_rescreening_checkpoint()
+
+        if options["run_async"]:
+            rescreen_users_with_exports.delay(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS("Queued the exports re-screening"))
+            return
+
+        progress = rescreen_users(options["batch_size"], progress=self.write_progress)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Re-screening finished: {progress.screened} users screened, {progress.failed} failed"
+            )
+        )
+        if progress.denied_user_ids:
+            self.stdout.write(self.style.WARNING("Newly denied users:"))
+            for user_id, email in (
+                User.objects.filter(id__in=progress.denied_user_ids)
+                .order_by("id")
+                .values_list("id", "email")
+            ):
+                self.stdout.write(self.style.WARNING(f"  {user_id}: {email}"))
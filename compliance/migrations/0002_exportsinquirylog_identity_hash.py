@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance", "0001_add_export_inquiry_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportsinquirylog",
+            name="identity_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="exportsinquirylog",
+            index=models.Index(
+                fields=["identity_hash", "created_on"],
+                name="compliance__identit_cf8eb2_idx",
+            ),
+        ),
+    ]
@@ -34,6 +34,12 @@ class ExportsInquiryLog(TimestampedModel):
     encrypted_request = models.TextField()
     encrypted_response = models.TextField()
 
+    # keyed hash of the screened name, address and exports service options, to reuse recent results
+    identity_hash = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["identity_hash", "created_on"])]
+
     @property
     def is_denied(self):
         """Returns true if the export result was denied"""
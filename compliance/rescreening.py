@@ -0,0 +1,216 @@
+"""
+Re-screening of existing users against the CyberSource exports service, for when the sanctions lists change.
+Users are screened in batches ordered by id with a bounded number of concurrent requests. The cursor is
+checkpointed in redis after every batch so that an interrupted re-screening continues where it stopped.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db.models import OuterRef, Subquery
+from django_redis import get_redis_connection
+
+from compliance.api import get_exports_payload, run_exports_inquiry
+from compliance.constants import RESULT_DENIED
+from compliance.models import ExportsInquiryLog
+
+log = logging.getLogger()
+
+User = get_user_model()
+
+RESCREENING_KEY = "compliance:rescreening"
+RESCREENING_DENIED_KEY = "compliance:rescreening:denied"
+
+RescreeningProgress = namedtuple(
+    "RescreeningProgress", ["screened", "failed", "total", "denied_user_ids"]
+)
+
+
+def get_rescreening_users():
+    """
+    Returns:
+        QuerySet: The active users with a legal address, annotated with the result of their latest exports inquiry
+    """
+    return (
+        User.objects.filter(is_active=True, legal_address__isnull=False)
+        .select_related("legal_address")
+        .annotate(
+            previous_result=Subquery(
+                ExportsInquiryLog.objects.filter(user=OuterRef("pk"))
+                .order_by("-created_on", "-id")
+                .values("computed_result")[:1]
+            )
+        )
+        .order_by("id")
+    )
+
+
+def get_rescreening_checkpoint():
+    """
+    Get the progress of the current re-screening
+
+    Returns:
+        (int, RescreeningProgress): The last screened user id, and the progress so far without a total
+    """
+    redis = get_redis_connection("default")
+    checkpoint = redis.hgetall(RESCREENING_KEY)
+    return int(checkpoint.get(b"cursor", 0)), RescreeningProgress(
+        int(checkpoint.get(b"screened", 0)),
+        int(checkpoint.get(b"failed", 0)),
+        None,
+        sorted(int(user_id) for user_id in redis.smembers(RESCREENING_DENIED_KEY)),
+    )
+
+
+def save_rescreening_checkpoint(cursor, screened, failed, denied_user_ids):
+    """
+    Commit the cursor of the re-screening after a batch was screened
+
+    Args:
+        cursor (int): The last screened user id
+        screened (int): The number of users screened so far
+        failed (int): The number of users which couldn't be screened so far
+        denied_user_ids (list of int): Users of the batch who were newly denied
+    """
+    pipe = get_redis_connection("default").pipeline()
+    pipe.hset(
+        RESCREENING_KEY,
+        mapping={"cursor": cursor, "screened": screened, "failed": failed},
+    )
+    if denied_user_ids:
+        pipe.sadd(RESCREENING_DENIED_KEY, *denied_user_ids)
+    pipe.execute()
+
+
+def reset_rescreening_checkpoint():
+    """Forget the progress of the re-screening, so that it starts from the first user"""
+    get_redis_connection("default").delete(RESCREENING_KEY, RESCREENING_DENIED_KEY)
+
+
+def _screen_user(user, payload):
+    """
+    Screen a user, logging any errors so that the rest of the batch continues
+
+    Returns:
+        ExportsInquiryLog: the unsaved log record of the exports inquiry, or None if it failed
+    """
+    try:
+        return run_exports_inquiry(user, payload)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unable to re-screen user %d for exports compliance", user.id)
+        return None
+
+
+def rescreen_users_batch(users):
+    """
+    Screen a batch of users concurrently and store the results with one query
+
+    Args:
+        users (list of User): Users annotated by get_rescreening_users
+
+    Returns:
+        (int, list of int): The number of users which couldn't be screened, and the ids of users who were newly denied
+    """
+    # the requests are built here, since the threads only talk to CyberSource and never to the database
+    payloads = [get_exports_payload(user) for user in users]
+    with ThreadPoolExecutor(
+        max_workers=settings.CYBERSOURCE_EXPORT_RESCREENING_CONCURRENCY
+    ) as executor:
+        exports_inquiries = list(executor.map(_screen_user, users, payloads))
+    ExportsInquiryLog.objects.bulk_create(
+        [inquiry for inquiry in exports_inquiries if inquiry is not None]
+    )
+    denied_user_ids = [
+        user.id
+        for user, inquiry in zip(users, exports_inquiries)
+        if inquiry is not None
+        and inquiry.is_denied
+        and user.previous_result != RESULT_DENIED
+    ]
+    for user_id in denied_user_ids:
+        log.info("User %d was newly denied by the exports re-screening", user_id)
+    return exports_inquiries.count(None), denied_user_ids
+
+
+def rescreen_next_batch(batch_size):
+    """
+    Screen the users after the checkpoint and commit the checkpoint
+
+    Args:
+        batch_size (int): The number of users to screen
+
+    Returns:
+        (RescreeningProgress, bool): The progress, and whether all users have been screened
+    """
+    cursor, status = get_rescreening_checkpoint()
+    users = get_rescreening_users().filter(id__gt=cursor)
+    batch = list(users[:batch_size])
+    if batch:
+        failed, denied_user_ids = rescreen_users_batch(batch)
+        save_rescreening_checkpoint(
+            batch[-1].id,
+            status.screened + len(batch),
+            status.failed + failed,
+            denied_user_ids,
+        )
+        cursor, status = get_rescreening_checkpoint()
+    remaining = users.filter(id__gt=cursor).count() if batch else 0
+    return status._replace(total=status.screened + remaining), remaining == 0
+
+
+def rescreen_users(batch_size, progress=None):
+    """
+    Screen all users, resuming from the checkpoint of an earlier re-screening if there is one
+
+    Args:
+        batch_size (int): The number of users to screen between checkpoints
+        progress (Callable): Called with a RescreeningProgress after each batch
+
+    Returns:
+        RescreeningProgress: The progress once all users were screened
+    """
+    while True:
+        status, finished = rescreen_next_batch(batch_size)
+        if finished:
+            reset_rescreening_checkpoint()
+            return status
+        if progress:
+            progress(status)
+
+
+def send_rescreening_summary(status):
+    """
+    Email the admins the users who were newly denied by a re-screening
+
+    Args:
+        status (RescreeningProgress): The progress of the finished re-screening
+    """
+    log.info(
+        "Exports re-screening finished: %d users screened, %d failed, %d newly denied",
+        status.screened,
+        status.failed,
+        len(status.denied_user_ids),
+    )
+    if not status.denied_user_ids:
+        return
+    emails = User.objects.filter(id__in=status.denied_user_ids).values_list(
+        "email", flat=True
+    )
+    try:
+        with mail.get_connection(settings.NOTIFICATION_EMAIL_BACKEND) as connection:
+            mail.send_mail(
+                f"Exports Compliance: {len(status.denied_user_ids)} users denied by re-screening",
+                "The following users were denied due to exports violations when they were re-screened:\n"
+                + "\n".join(sorted(emails)),
+                settings.EMAIL_SUPPORT,
+                [settings.ADMIN_EMAIL],
+                connection=connection,
+            )
+    except Exception:  # pylint: disable=broad-except
+        log.exception(
+            "Exception sending email to support regarding the exports re-screening"
+        )
@@ -0,0 +1,126 @@
+"""Tests for the exports re-screening of existing users"""
+
+# pylint: disable=redefined-outer-name
+import pytest
+
+from compliance import rescreening
+from compliance.constants import RESULT_DENIED, RESULT_SUCCESS
+from compliance.factories import ExportsInquiryLogFactory
+from compliance.models import ExportsInquiryLog
+from compliance.tasks import rescreen_users_with_exports
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_checkpoint():
+    """Remove any re-screening checkpoint left in redis"""
+    rescreening.reset_rescreening_checkpoint()
+    yield
+    rescreening.reset_rescreening_checkpoint()
+
+
+@pytest.fixture
+def users():
+    """Active users with a legal address, ordered by id"""
+    UserFactory.create(is_active=False)
+    UserFactory.create(legal_address=None)
+    return sorted(UserFactory.create_batch(4), key=lambda user: user.id)
+
+
+@pytest.fixture
+def mock_inquiry(mocker, users):
+    """Mock the exports service, which denies the first two users and fails for the last one"""
+
+    def run_exports_inquiry(user, payload):  # pylint: disable=unused-argument
+        if user == users[3]:
+            raise ConnectionError
+        return ExportsInquiryLogFactory.build(
+            user=user,
+            computed_result=RESULT_DENIED if user in users[:2] else RESULT_SUCCESS,
+        )
+
+    return mocker.patch(
+        "compliance.rescreening.run_exports_inquiry", side_effect=run_exports_inquiry
+    )
+
+
+def test_rescreening_checkpoint():
+    """The checkpoint should keep the cursor, the counts and the newly denied users"""
+    cursor, status = rescreening.get_rescreening_checkpoint()
+    assert cursor == 0
+    assert status == rescreening.RescreeningProgress(0, 0, None, [])
+    rescreening.save_rescreening_checkpoint(10, 5, 1, [3, 2])
+    rescreening.save_rescreening_checkpoint(20, 8, 1, [7])
+    assert rescreening.get_rescreening_checkpoint() == (
+        20,
+        rescreening.RescreeningProgress(8, 1, None, [2, 3, 7]),
+    )
+
+
+def test_rescreen_users(
+    mocker, settings, django_assert_max_num_queries, users, mock_inquiry
+):
+    """rescreen_users should screen users in batches, store the results in bulk and report newly denied users"""
+    settings.CYBERSOURCE_EXPORT_RESCREENING_CONCURRENCY = 2
+    ExportsInquiryLogFactory.create(user=users[0], computed_result=RESULT_DENIED)
+    progress_mock = mocker.Mock()
+
+    with django_assert_max_num_queries(8):
+        status = rescreening.rescreen_users(3, progress=progress_mock)
+
+    assert sorted(call.args[0].id for call in mock_inquiry.call_args_list) == [
+        user.id for user in users
+    ]
+    assert status == rescreening.RescreeningProgress(4, 1, 4, [users[1].id])
+    progress_mock.assert_called_once_with(
+        rescreening.RescreeningProgress(3, 0, 4, [users[1].id])
+    )
+    assert ExportsInquiryLog.objects.filter(user__in=users).count() == 4
+    assert rescreening.get_rescreening_checkpoint()[0] == 0
+
+
+def test_rescreen_users_resumes(mocker, users, mock_inquiry):
+    """rescreen_users should continue after the last checkpoint"""
+    rescreening.save_rescreening_checkpoint(users[1].id, 2, 0, [users[0].id])
+    status = rescreening.rescreen_users(10)
+    assert sorted(call.args[0].id for call in mock_inquiry.call_args_list) == [
+        user.id for user in users[2:]
+    ]
+    assert status == rescreening.RescreeningProgress(4, 1, 4, [users[0].id])
+
+
+def test_send_rescreening_summary(mocker, settings, users):
+    """send_rescreening_summary should email the admins the newly denied users"""
+    settings.ADMIN_EMAIL = "admin@example.com"
+    mock_send = mocker.patch("compliance.rescreening.mail.send_mail")
+    rescreening.send_rescreening_summary(
+        rescreening.RescreeningProgress(4, 0, 4, [users[0].id])
+    )
+    mock_send.assert_called_once()
+    assert users[0].email in mock_send.call_args.args[1]
+    assert mock_send.call_args.args[3] == ["admin@example.com"]
+
+    mock_send.reset_mock()
+    rescreening.send_rescreening_summary(rescreening.RescreeningProgress(4, 0, 4, []))
+    mock_send.assert_not_called()
+
+
+@pytest.mark.usefixtures("cybersource_settings")
+def test_rescreen_users_with_exports(mocker, users, mock_inquiry):
+    """The task should queue itself for each batch and send a summary at the end"""
+    mock_summary = mocker.patch("compliance.rescreening.send_rescreening_summary")
+    rescreen_users_with_exports.delay(2)
+    assert mock_inquiry.call_count == 4
+    mock_summary.assert_called_once_with(
+        rescreening.RescreeningProgress(4, 1, 4, [users[0].id, users[1].id])
+    )
+    assert rescreening.get_rescreening_checkpoint()[0] == 0
+
+
+def test_rescreen_users_with_exports_disabled(mocker):
+    """The task should do nothing if exports verification isn't configured"""
+    mock_batch = mocker.patch("compliance.rescreening.rescreen_next_batch")
+    rescreen_users_with_exports.delay()
+    mock_batch.assert_not_called()
@@ -0,0 +1,26 @@
+"""Compliance celery tasks"""
+
+import logging
+
+from compliance import api, rescreening
+from compliance.constants import EXPORTS_RESCREENING_BATCH_SIZE
+from main.celery import app
+
+log = logging.getLogger(__name__)
+
+
+@app.task(acks_late=True)
+def rescreen_users_with_exports(batch_size=EXPORTS_RESCREENING_BATCH_SIZE):
+    """
+    Re-screen the next batch of users against the exports service, then queue the next batch until every
+    user was screened and the admins were sent a summary
+    """
+    if not api.is_exports_verification_enabled():
+        log.warning("Export compliance checks are disabled")
+        return
+    status, finished = rescreening.rescreen_next_batch(batch_size)
+    if finished:
+        rescreening.reset_rescreening_checkpoint()
+        rescreening.send_rescreening_summary(status)
+    else:
+        rescreen_users_with_exports.delay(batch_size)
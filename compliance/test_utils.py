@@ -4,6 +4,8 @@ from nacl.public import PrivateKey
 from nacl.encoding import Base64Encoder
 from rest_framework import status
 
+from compliance.api import clear_cybersource_client_cache
+
 SERVICE_VERSION = "1.154"
 
 DATA_DIR = "compliance/test_data/cybersource"
@@ -32,6 +34,8 @@ def mock_cybersource_wsdl(mocked_responses, settings, service_version=SERVICE_VE
     """
     Mocks the responses to achieve a functional WSDL
     """
+    # the WSDL is cached once it's loaded, so it has to be cleared for it to be loaded from the mocks
+    clear_cybersource_client_cache()
     # in order for zeep to load the wsdl, it will load the wsdl and the accompanying xsd definitions
     with open(f"{DATA_DIR}/CyberSourceTransaction_{service_version}.wsdl", "r") as wsdl:
         mocked_responses.add(
@@ -16,6 +16,33 @@ def pytest_addoption(parser):
         action="store_true",
         help="Run tests only (no cov, no pylint, warning output silenced)",
     )
+    parser.addoption(
+        "--benchmarks",
+        action="store_true",
+        help="Run the benchmarks, which are skipped otherwise",
+    )
+    parser.addoption(
+        "--benchmark-scale",
+        type=int,
+        default=2,
+        help="Seed this many thousand users for the benchmarks",
+    )
+    parser.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=5,
+        help="Number of timed requests for each benchmark",
+    )
+    parser.addoption(
+        "--benchmark-report",
+        default="benchmark_report.json",
+        help="Path of the JSON report written by the benchmarks",
+    )
+    parser.addoption(
+        "--benchmark-update-baseline",
+        action="store_true",
+        help="Store the query counts of this benchmark run as the new baseline",
+    )
 
 
 def pytest_cmdline_main(config):
@@ -32,6 +59,9 @@ def pytest_configure(config):
     # fixture can't be used here, and an environment variable can't be used because we don't yet have a way to define
     # env vars that will be set exclusively for the test suite when Docker containers are spun up.
     settings.MEDIA_ROOT = TEST_MEDIA_ROOT
+    config.addinivalue_line(
+        "markers", "benchmark: query count and latency benchmark, needs --benchmarks"
+    )
     if getattr(config.option, "simple") is True:
         # NOTE: These plugins are already configured by the time the pytest_cmdline_main hook is run, so we can't
         #       simply add/alter the command line options in that hook. This hook is being used to
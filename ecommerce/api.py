@@ -20,14 +20,17 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Q
 from django_fsm import TransitionNotAllowed
+from mitol.common.utils import now_in_utc
 import pytz
 from rest_framework.exceptions import ValidationError
 
+from applications.api import update_application_ledger
 from applications.constants import AppStates
 from applications.models import BootcampApplication
 from applications.serializers import BootcampApplicationDetailSerializer
 from ecommerce import tasks
 from ecommerce.constants import (
+    CYBERSOURCE_DECISION_ACCEPT,
     CYBERSOURCE_DECISION_CANCEL,
     WIRE_TRANSFER_AMOUNT,
     WIRE_TRANSFER_ID,
@@ -36,18 +39,23 @@ from ecommerce.constants import (
     WIRE_TRANSFER_BOOTCAMP_RUN_ID,
     WIRE_TRANSFER_BOOTCAMP_START_DATE,
     WIRE_TRANSFER_BOOTCAMP_NAME,
+    WIRE_TRANSFER_IMPORT_BATCH_SIZE,
 )
 from ecommerce.exceptions import (
     EcommerceException,
     ParseException,
     WireTransferImportException,
 )
-from ecommerce.models import Line, Order, WireTransferReceipt
+from ecommerce.models import Line, Order, Receipt, WireTransferReceipt
 from hubspot_sync.task_helpers import (
     sync_hubspot_application,
     sync_hubspot_application_from_order,
 )
-from klasses.api import deactivate_run_enrollment
+from klasses.api import (
+    deactivate_run_enrollment,
+    get_personal_prices,
+    personal_price_memo,
+)
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
 from klasses.models import BootcampRun
 from klasses.serializers import InstallmentSerializer
@@ -289,13 +297,14 @@ def generate_cybersource_sa_payload(order, redirect_url, ip_address=None):
     return payload
 
 
-def get_new_order_by_reference_number(reference_number):
+def get_new_order_by_reference_number(reference_number, lock=False):
     """
     Parse a reference number received from CyberSource and lookup the corresponding Order.
 
     Args:
         reference_number (str):
             A string which contains the order id and the instance which generated it
+        lock (bool): If true, lock the order row until the end of the transaction
     Returns:
         Order:
             An order
@@ -325,8 +334,11 @@ def get_new_order_by_reference_number(reference_number):
         )
         raise ParseException("CyberSource prefix doesn't match")
 
+    orders = Order.objects.select_related("application")
+    if lock:
+        orders = orders.select_for_update(of=("self",))
     try:
-        return Order.objects.select_related("application").get(id=order_id)
+        return orders.get(id=order_id)
     except Order.DoesNotExist:
         raise EcommerceException("Unable to find order {}".format(order_id))
 
@@ -357,7 +369,17 @@ def complete_successful_order(order, send_receipt=True):
     """
     order.status = Order.FULFILLED
     order.save_and_log(None)
+    _complete_order_application(order, send_receipt=send_receipt)
+
 
+def _complete_order_application(order, send_receipt):
+    """
+    Update the application and notify other services about an order which was just fulfilled
+
+    Args:
+        order (Order): An order which has just been fulfilled
+        send_receipt (bool): Flag that indicates whether a receipt should be emailed to the user
+    """
     application = order.application
     if application.is_paid_in_full:
         try:
@@ -386,7 +408,17 @@ def handle_rejected_order(*, order, decision):
     """
     order.status = Order.FAILED
     order.save_and_log(None)
+    _notify_rejected_order(order=order, decision=decision)
 
+
+def _notify_rejected_order(*, order, decision):
+    """
+    Notify staff and other services about an order which CyberSource just rejected
+
+    Args:
+        order (Order): An order which has just failed
+        decision (str): The decision from Cybersource's response
+    """
     log.warning(
         "Order fulfillment failed: received a decision that wasn't ACCEPT for order %s",
         order,
@@ -410,6 +442,85 @@ def handle_rejected_order(*, order, decision):
     sync_hubspot_application_from_order(order)
 
 
+def record_cybersource_receipt(data):
+    """
+    Save the message from CyberSource in a receipt. CyberSource can deliver the same message more than
+    once, so only one receipt is kept for each transaction uuid.
+
+    Args:
+        data (dict): The message from CyberSource
+
+    Returns:
+        tuple of (Receipt, bool): The receipt and whether it was created by this call
+    """
+    transaction_uuid = data.get("req_transaction_uuid")
+    if not transaction_uuid:
+        return Receipt.objects.create(data=data), True
+    return Receipt.objects.get_or_create(
+        transaction_uuid=transaction_uuid, defaults={"data": data}
+    )
+
+
+def fulfill_order_from_receipt(receipt_id):
+    """
+    Fulfill or reject the order a CyberSource receipt is for. The receipt and the order are locked while
+    the order status changes, so concurrent messages about the same order are handled one at a time.
+    The application, Hubspot and emails are updated after the transaction commits, and the receipt is
+    marked as processed once that succeeds. If that step fails the task is retried, and a receipt which
+    was linked to its order but not processed yet is finished again instead of being skipped.
+
+    Args:
+        receipt_id (int): The id of the Receipt
+    """
+    with transaction.atomic():
+        receipt = Receipt.objects.select_for_update().get(id=receipt_id)
+        decision = receipt.data["decision"]
+        if receipt.processed_on is not None:
+            log.info("Receipt %d was already processed", receipt.id)
+            return
+        if receipt.order_id is not None:
+            # An earlier attempt updated the order from 'created' but failed before the receipt was processed
+            order = receipt.order
+            previous_status = Order.CREATED
+            log.info(
+                "Receipt %d was not processed yet, finishing order %d",
+                receipt.id,
+                order.id,
+            )
+        else:
+            order = get_new_order_by_reference_number(
+                receipt.data["req_reference_number"], lock=True
+            )
+            receipt.order = order
+
+            previous_status = order.status
+            if previous_status == Order.CREATED:
+                order.status = (
+                    Order.FULFILLED
+                    if decision == CYBERSOURCE_DECISION_ACCEPT
+                    else Order.FAILED
+                )
+                order.save_and_log(None)
+            else:
+                # Nothing is left to do for this receipt after the transaction commits
+                receipt.processed_on = now_in_utc()
+            receipt.save()
+
+    if previous_status == Order.FAILED and decision == CYBERSOURCE_DECISION_CANCEL:
+        # This is a duplicate message, ignore since it's already handled
+        return
+    elif previous_status != Order.CREATED:
+        raise EcommerceException(
+            "Order {} is expected to have status 'created'".format(order.id)
+        )
+
+    if decision != CYBERSOURCE_DECISION_ACCEPT:
+        _notify_rejected_order(order=order, decision=decision)
+    else:
+        _complete_order_application(order, send_receipt=True)
+    Receipt.objects.filter(id=receipt.id).update(processed_on=now_in_utc())
+
+
 def serialize_user_bootcamp_runs(user):
     """
     Returns serialized bootcamp run and payment details for a user.
@@ -420,12 +531,18 @@ def serialize_user_bootcamp_runs(user):
     Returns:
         list: list of dictionaries describing a bootcamp run and payments for it by the user
     """
-    return [
-        serialize_user_bootcamp_run(user, bootcamp_run)
-        for bootcamp_run in BootcampRun.objects.filter(applications__user=user)
+    bootcamp_runs = list(
+        BootcampRun.objects.filter(applications__user=user)
         .select_related("bootcamp")
+        .with_installment_schedules()
         .order_by("run_key")
-    ]
+    )
+    with personal_price_memo():
+        get_personal_prices((user, bootcamp_run) for bootcamp_run in bootcamp_runs)
+        return [
+            serialize_user_bootcamp_run(user, bootcamp_run)
+            for bootcamp_run in bootcamp_runs
+        ]
 
 
 def serialize_user_bootcamp_run(user, bootcamp_run):
@@ -455,7 +572,7 @@ def serialize_user_bootcamp_run(user, bootcamp_run):
             Line.for_user_bootcamp_run(user, bootcamp_run), many=True
         ).data,
         "installments": InstallmentSerializer(
-            bootcamp_run.installment_set.order_by("deadline"), many=True
+            bootcamp_run.installment_schedule.installments, many=True
         ).data,
     }
 
@@ -513,23 +630,57 @@ WireTransfer = namedtuple(
 )
 
 
-def parse_wire_transfer_csv(csv_path):
+WireTransferImportError = namedtuple(
+    "WireTransferImportError", ["wire_transfer_id", "error"]
+)
+
+
+class WireTransferImportReport:
     """
-    Read CSV file and convert to WireTransfer objects for further processing
+    Summary of a wire transfer import, listing the wire transfer ids by outcome
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.imported = []
+        self.updated = []
+        self.skipped = []
+        self.failed = []
+
+    @property
+    def total(self):
+        """Number of rows which were processed"""
+        return (
+            len(self.imported)
+            + len(self.updated)
+            + len(self.skipped)
+            + len(self.failed)
+        )
+
+    def __str__(self):
+        return "{prefix}{total} wire transfers: {imported} imported, {updated} updated, {skipped} unchanged, {failed} failed".format(
+            prefix="[DRY RUN] " if self.dry_run else "",
+            total=self.total,
+            imported=len(self.imported),
+            updated=len(self.updated),
+            skipped=len(self.skipped),
+            failed=len(self.failed),
+        )
+
+
+def _read_wire_transfer_header(reader):
+    """
+    Advance a CSV reader past the header row
 
     Args:
-        csv_path (str): Path to the CSV file
+        reader (iterable of list): A CSV reader
 
     Returns:
-        (list of WireTransfer, list):
+        (list, dict): The header row and a lookup of required header field to column index
     """
-    with open(csv_path) as csv_file:
-        rows = list(csv.reader(csv_file))
-
-    for col, row in enumerate(rows):
+    for row in reader:
         if WIRE_TRANSFER_LEARNER_EMAIL in row:
             header_row = row
-            header_row_index = col
             break
     else:
         raise WireTransferImportException("Unable to find header row")
@@ -543,20 +694,49 @@ def parse_wire_transfer_csv(csv_path):
         if field not in header_index_lookup:
             raise WireTransferImportException(f"Unable to find column header {field}")
 
-    wire_transfers = [
-        WireTransfer(
-            id=int(row[header_index_lookup[WIRE_TRANSFER_ID]]),
-            learner_email=row[header_index_lookup[WIRE_TRANSFER_LEARNER_EMAIL]],
-            amount=Decimal(row[header_index_lookup[WIRE_TRANSFER_AMOUNT]]),
-            bootcamp_run_id=row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_RUN_ID]],
-            bootcamp_start_date=parse_datetime(
-                row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_START_DATE]]
-            ),
-            bootcamp_name=row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_NAME]],
-            row=row,
-        )
-        for row in rows[header_row_index + 1 :]
-    ]
+    return header_row, header_index_lookup
+
+
+def _parse_wire_transfer_row(row, header_index_lookup):
+    """
+    Convert a CSV row into a WireTransfer
+
+    Args:
+        row (list of str): A row of the CSV
+        header_index_lookup (dict): A lookup of required header field to column index
+
+    Returns:
+        WireTransfer: The parsed wire transfer
+    """
+    return WireTransfer(
+        id=int(row[header_index_lookup[WIRE_TRANSFER_ID]]),
+        learner_email=row[header_index_lookup[WIRE_TRANSFER_LEARNER_EMAIL]],
+        amount=Decimal(row[header_index_lookup[WIRE_TRANSFER_AMOUNT]]),
+        bootcamp_run_id=row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_RUN_ID]],
+        bootcamp_start_date=parse_datetime(
+            row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_START_DATE]]
+        ),
+        bootcamp_name=row[header_index_lookup[WIRE_TRANSFER_BOOTCAMP_NAME]],
+        row=row,
+    )
+
+
+def parse_wire_transfer_csv(csv_path):
+    """
+    Read CSV file and convert to WireTransfer objects for further processing
+
+    Args:
+        csv_path (str): Path to the CSV file
+
+    Returns:
+        (list of WireTransfer, list):
+    """
+    with open(csv_path) as csv_file:
+        reader = csv.reader(csv_file)
+        header_row, header_index_lookup = _read_wire_transfer_header(reader)
+        wire_transfers = [
+            _parse_wire_transfer_row(row, header_index_lookup) for row in reader
+        ]
 
     return wire_transfers, header_row
 
@@ -633,6 +813,9 @@ def import_wire_transfer(wire_transfer, header_row, forced=False):
             order.application = application
             order.user = user
             order.save()
+            if previous_application:
+                # The order no longer counts towards the previous application's payments
+                update_application_ledger(previous_application)
 
             update_application(application, order)
             update_application(previous_application, None)
@@ -678,22 +861,269 @@ def import_wire_transfer(wire_transfer, header_row, forced=False):
     log.info("Wire transfer %d successfully imported", wire_transfer.id)
 
 
-def import_wire_transfers(csv_path, force_flag=False):
+def _batch_wire_transfers(wire_transfers, batch_size):
     """
-    Import orders from a CSV file with file transfers
+    Group wire transfers into batches. A batch is closed early if a wire transfer id repeats,
+    so that a later row for the same id sees the receipt created by an earlier one.
 
     Args:
-        csv_path (str): Path to a CSV file
+        wire_transfers (iterable of WireTransfer): The wire transfers to group
+        batch_size (int): The maximum number of wire transfers per batch
+
+    Yields:
+        list of WireTransfer: A batch of wire transfers with unique ids
     """
-    wire_transfers, header_row = parse_wire_transfer_csv(csv_path)
+    batch = {}
+    for wire_transfer in wire_transfers:
+        if len(batch) >= batch_size or wire_transfer.id in batch:
+            yield list(batch.values())
+            batch = {}
+        batch[wire_transfer.id] = wire_transfer
+    if batch:
+        yield list(batch.values())
+
 
+def _complete_wire_transfer_orders(orders, report):
+    """
+    Complete the orders of wire transfers, each in its own savepoint
+
+    Args:
+        orders (list of (Order, WireTransfer)): Created orders with their wire transfers
+        report (WireTransferImportReport): The report to record the results in
+    """
+    for order, wire_transfer in orders:
+        try:
+            with transaction.atomic():
+                complete_successful_order(order)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                "Unable to complete order for wire transfer %d", wire_transfer.id
+            )
+            # Removes the line and receipt too, so the row can be imported again
+            order.delete()
+            report.failed.append(WireTransferImportError(wire_transfer.id, str(exc)))
+        else:
+            log.info("Wire transfer %d successfully imported", wire_transfer.id)
+            report.imported.append(wire_transfer.id)
+
+
+def _create_wire_transfer_orders(new_wire_transfers, report):
+    """
+    Create and fulfill orders for wire transfers which have not been imported yet. The orders are created
+    and completed in one transaction, so an interrupted import never leaves receipts for unfulfilled orders.
+
+    Args:
+        new_wire_transfers (list of (WireTransfer, BootcampApplication, dict)):
+            Wire transfers with their application and receipt data
+        report (WireTransferImportReport): The report to record the results in
+    """
     with transaction.atomic():
-        # transaction is here so, if there is a missing user and we error,
-        # make sure not to write only half the wire transfers
-        for wire_transfer in wire_transfers:
+        orders = Order.objects.bulk_create(
+            [
+                Order(
+                    status=Order.CREATED,
+                    total_price_paid=wire_transfer.amount,
+                    application=application,
+                    user=application.user,
+                    payment_type=Order.WIRE_TRANSFER_TYPE,
+                )
+                for wire_transfer, application, _ in new_wire_transfers
+            ]
+        )
+        Line.objects.bulk_create(
+            [
+                Line(
+                    order=order,
+                    bootcamp_run=application.bootcamp_run,
+                    description=f"Wire transfer payment for {application.bootcamp_run}",
+                    price=wire_transfer.amount,
+                )
+                for order, (wire_transfer, application, _) in zip(
+                    orders, new_wire_transfers
+                )
+            ]
+        )
+        WireTransferReceipt.objects.bulk_create(
+            [
+                WireTransferReceipt(
+                    wire_transfer_id=wire_transfer.id, data=data, order=order
+                )
+                for order, (wire_transfer, _, data) in zip(orders, new_wire_transfers)
+            ]
+        )
+        _complete_wire_transfer_orders(
+            [
+                (order, wire_transfer)
+                for order, (wire_transfer, _, _) in zip(orders, new_wire_transfers)
+            ],
+            report,
+        )
+
+
+def _import_wire_transfer_batch(
+    wire_transfers, header_row, report, *, force_flag, dry_run
+):
+    """
+    Import a batch of wire transfers, looking up all related objects up front
+
+    Args:
+        wire_transfers (list of WireTransfer): Wire transfers with unique ids
+        header_row (list of str): The header row of the CSV
+        report (WireTransferImportReport): The report to record the results in
+        force_flag (bool): If True, existing orders will be updated to match the wire transfer
+        dry_run (bool): If True, only report what would be done
+    """
+    users_by_email = {
+        user.email: user
+        for user in User.objects.filter(
+            email__in={wire_transfer.learner_email for wire_transfer in wire_transfers}
+        )
+    }
+    runs_by_run_id = {
+        run.bootcamp_run_id: run
+        for run in BootcampRun.objects.filter(
+            bootcamp_run_id__in={
+                wire_transfer.bootcamp_run_id for wire_transfer in wire_transfers
+            }
+        ).select_related("bootcamp")
+    }
+    applications = {
+        (application.user_id, application.bootcamp_run_id): application
+        for application in BootcampApplication.objects.filter(
+            user__in=users_by_email.values(), bootcamp_run__in=runs_by_run_id.values()
+        ).select_related("user", "bootcamp_run__bootcamp", "ledger")
+    }
+    receipts = {}
+    for receipt in (
+        WireTransferReceipt.objects.filter(
+            wire_transfer_id__in=[wire_transfer.id for wire_transfer in wire_transfers]
+        )
+        .select_related("order")
+        .order_by("id")
+    ):
+        receipts.setdefault(receipt.wire_transfer_id, receipt)
+
+    new_wire_transfers = []
+    incomplete_orders = []
+    for wire_transfer in wire_transfers:
+        user = users_by_email.get(wire_transfer.learner_email)
+        bootcamp_run = runs_by_run_id.get(wire_transfer.bootcamp_run_id)
+        application = (
+            applications.get((user.id, bootcamp_run.id))
+            if user and bootcamp_run
+            else None
+        )
+        if user is None:
+            error = f"No user with email {wire_transfer.learner_email}"
+        elif bootcamp_run is None:
+            error = f"No bootcamp run with id {wire_transfer.bootcamp_run_id}"
+        elif application is None:
+            error = f"No application for {user.email} in {bootcamp_run.bootcamp_run_id}"
+        else:
+            error = None
+        if error:
+            report.failed.append(WireTransferImportError(wire_transfer.id, error))
+            continue
+
+        data = {header_row[col]: value for col, value in enumerate(wire_transfer.row)}
+        receipt = receipts.get(wire_transfer.id)
+        if receipt is None:
+            new_wire_transfers.append((wire_transfer, application, data))
+            continue
+
+        difference = wire_transfer_difference(receipt.data, data)
+        if receipt.order.status == Order.CREATED and not difference["order_fields"]:
+            # the order was created by an import which stopped before completing it
+            incomplete_orders.append((receipt.order, wire_transfer))
+        elif not difference["order_fields"] and not difference["receipt_fields"]:
+            report.skipped.append(wire_transfer.id)
+        elif difference["order_fields"] and not force_flag:
+            report.failed.append(
+                WireTransferImportError(
+                    wire_transfer.id, "Use --force flag to update the order."
+                )
+            )
+        elif dry_run:
+            report.updated.append(wire_transfer.id)
+        else:
             try:
-                import_wire_transfer(wire_transfer, header_row, force_flag)
-            except:  # noqa: E722
-                raise WireTransferImportException(
-                    f"Error while importing row with Id column={wire_transfer.id}"
+                with transaction.atomic():
+                    import_wire_transfer(wire_transfer, header_row, force_flag)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception("Unable to update wire transfer %d", wire_transfer.id)
+                report.failed.append(
+                    WireTransferImportError(wire_transfer.id, str(exc))
                 )
+            else:
+                report.updated.append(wire_transfer.id)
+
+    if dry_run:
+        report.imported.extend(
+            wire_transfer.id for _, wire_transfer in incomplete_orders
+        )
+        report.imported.extend(
+            wire_transfer.id for wire_transfer, _, _ in new_wire_transfers
+        )
+        return
+    if incomplete_orders:
+        _complete_wire_transfer_orders(incomplete_orders, report)
+    if new_wire_transfers:
+        _create_wire_transfer_orders(new_wire_transfers, report)
+
+
+def _iter_wire_transfers(reader, header_index_lookup, report):
+    """
+    Lazily parse the rows of a wire transfer CSV, recording unparseable rows as failures
+
+    Args:
+        reader (csv.reader): A CSV reader positioned after the header row
+        header_index_lookup (dict): A lookup of required header field to column index
+        report (WireTransferImportReport): The report to record the failures in
+
+    Yields:
+        WireTransfer: The parsed wire transfers
+    """
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            yield _parse_wire_transfer_row(row, header_index_lookup)
+        except (ValueError, ArithmeticError, IndexError, OverflowError) as exc:
+            report.failed.append(
+                WireTransferImportError(
+                    None, f"Unable to parse line {reader.line_num}: {exc}"
+                )
+            )
+
+
+def import_wire_transfers(
+    csv_path,
+    force_flag=False,
+    *,
+    dry_run=False,
+    batch_size=WIRE_TRANSFER_IMPORT_BATCH_SIZE,
+):
+    """
+    Import orders from a CSV file with file transfers. The file is streamed in batches, and each
+    row is imported on its own, so a bad row doesn't prevent the rest of the file from being imported.
+
+    Args:
+        csv_path (str): Path to a CSV file
+        force_flag (bool): If True, existing orders will be updated to match the wire transfer
+        dry_run (bool): If True, nothing is written and the report describes what would be done
+        batch_size (int): The number of rows to look up and create at once
+
+    Returns:
+        WireTransferImportReport: The results of the import
+    """
+    report = WireTransferImportReport(dry_run=dry_run)
+    with open(csv_path) as csv_file:
+        reader = csv.reader(csv_file)
+        header_row, header_index_lookup = _read_wire_transfer_header(reader)
+        for batch in _batch_wire_transfers(
+            _iter_wire_transfers(reader, header_index_lookup, report), batch_size
+        ):
+            _import_wire_transfer_batch(
+                batch, header_row, report, force_flag=force_flag, dry_run=dry_run
+            )
+    return report
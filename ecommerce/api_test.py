@@ -10,6 +10,7 @@ import hashlib
 import hmac
 from pathlib import Path
 from types import SimpleNamespace
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMessage
@@ -28,6 +29,8 @@ from ecommerce.api import (
     get_new_order_by_reference_number,
     import_wire_transfers,
     import_wire_transfer,
+    WireTransferImportError,
+    _batch_wire_transfers,
     ISO_8601_FORMAT,
     make_reference_id,
     parse_wire_transfer_csv,
@@ -36,7 +39,9 @@ from ecommerce.api import (
     send_receipt_email,
     create_refund_order,
     complete_successful_order,
+    fulfill_order_from_receipt,
     process_refund,
+    record_cybersource_receipt,
     WireTransfer,
 )
 from ecommerce.exceptions import (
@@ -45,7 +50,7 @@ from ecommerce.exceptions import (
     WireTransferImportException,
 )
 from ecommerce.factories import LineFactory, OrderFactory
-from ecommerce.models import Line, Order, WireTransferReceipt
+from ecommerce.models import Line, Order, Receipt, WireTransferReceipt
 from ecommerce.serializers import LineSerializer
 from ecommerce.test_utils import create_test_application, create_test_order
 from klasses.constants import ENROLL_CHANGE_STATUS_REFUNDED
@@ -313,6 +318,101 @@ def test_status(application):
     assert ex.value.args[0] == "Unable to find order {}".format(order.id)
 
 
+def test_record_cybersource_receipt():
+    """record_cybersource_receipt should keep one receipt for each transaction uuid"""
+    data = {"req_transaction_uuid": "abc", "decision": "ACCEPT"}
+    receipt, created = record_cybersource_receipt(data)
+    assert created is True
+    assert receipt.transaction_uuid == "abc"
+    assert receipt.data == data
+    assert record_cybersource_receipt({**data, "decision": "CANCEL"}) == (
+        receipt,
+        False,
+    )
+
+    for _ in range(2):
+        assert record_cybersource_receipt({"decision": "ACCEPT"})[1] is True
+    assert Receipt.objects.count() == 3
+
+
+@pytest.mark.parametrize("decision", ["ACCEPT", "CANCEL"])
+def test_fulfill_order_from_receipt(mocker, application, decision):
+    """fulfill_order_from_receipt should update the order once, then finish the order after the lock is released"""
+    complete_mock = mocker.patch("ecommerce.api._complete_order_application")
+    notify_mock = mocker.patch("ecommerce.api._notify_rejected_order")
+    order = create_test_order(application, 123, fulfilled=False)
+    receipt = Receipt.objects.create(
+        data={"req_reference_number": make_reference_id(order), "decision": decision}
+    )
+    audit_count = order.orderaudit_set.count()
+
+    for _ in range(2):
+        fulfill_order_from_receipt(receipt.id)
+
+    receipt.refresh_from_db()
+    order.refresh_from_db()
+    assert receipt.order == order
+    assert receipt.processed_on is not None
+    assert order.status == (Order.FULFILLED if decision == "ACCEPT" else Order.FAILED)
+    assert order.orderaudit_set.count() == audit_count + 1
+    if decision == "ACCEPT":
+        complete_mock.assert_called_once_with(order, send_receipt=True)
+        notify_mock.assert_not_called()
+    else:
+        notify_mock.assert_called_once_with(order=order, decision=decision)
+        complete_mock.assert_not_called()
+
+
+def test_fulfill_order_from_receipt_retry(mocker, application):
+    """fulfill_order_from_receipt should finish an order again if that failed after the commit"""
+    complete_mock = mocker.patch(
+        "ecommerce.api._complete_order_application",
+        side_effect=[ConnectionError, None],
+    )
+    order = create_test_order(application, 123, fulfilled=False)
+    receipt = Receipt.objects.create(
+        data={"req_reference_number": make_reference_id(order), "decision": "ACCEPT"}
+    )
+    audit_count = order.orderaudit_set.count()
+
+    with pytest.raises(ConnectionError):
+        fulfill_order_from_receipt(receipt.id)
+    order.refresh_from_db()
+    receipt.refresh_from_db()
+    assert order.status == Order.FULFILLED
+    assert receipt.processed_on is None
+
+    fulfill_order_from_receipt(receipt.id)
+    receipt.refresh_from_db()
+    assert receipt.processed_on is not None
+    assert complete_mock.call_count == 2
+    complete_mock.assert_called_with(order, send_receipt=True)
+    assert order.orderaudit_set.count() == audit_count + 1
+
+    # The application is not complete after an installment, but the receipt was processed
+    application.refresh_from_db()
+    assert application.state != AppStates.COMPLETE.value
+    fulfill_order_from_receipt(receipt.id)
+    assert complete_mock.call_count == 2
+
+
+def test_fulfill_order_from_receipt_not_created(mocker, application):
+    """fulfill_order_from_receipt should mark the receipt processed if the order was already handled"""
+    complete_mock = mocker.patch("ecommerce.api._complete_order_application")
+    order = create_test_order(application, 123, fulfilled=True)
+    receipt = Receipt.objects.create(
+        data={"req_reference_number": make_reference_id(order), "decision": "ACCEPT"}
+    )
+
+    with pytest.raises(EcommerceException):
+        fulfill_order_from_receipt(receipt.id)
+    receipt.refresh_from_db()
+    assert receipt.order == order
+    assert receipt.processed_on is not None
+    fulfill_order_from_receipt(receipt.id)
+    complete_mock.assert_not_called()
+
+
 @pytest.fixture()
 def test_data():
     """
@@ -1007,19 +1107,169 @@ def test_import_wire_transfers_update_existing_order_bootcamp(mocker):
     assert receipt.order.application.bootcamp_run == bootcamp_run
 
 
-def test_import_wire_transfers(mocker):
-    """import_wire_transfers should iterate through the list of wire transfers, processing one at a time"""
-    import_mock = mocker.patch("ecommerce.api.import_wire_transfer")
-    csv_path = Path(__file__).parent / "testdata" / "example_wire_transfers.csv"
-    import_wire_transfers(csv_path)
-    wire_transfers, header_row = parse_wire_transfer_csv(csv_path)
-    for wire_transfer in wire_transfers:
-        import_mock.assert_any_call(wire_transfer, header_row, False)
+@pytest.fixture
+def wire_transfer_csv():
+    """Path to the example wire transfer CSV"""
+    return Path(__file__).parent / "testdata" / "example_wire_transfers.csv"
 
 
-def test_import_wire_transfers_error(mocker):
-    """import_wire_transfers should reraise errors"""
-    mocker.patch("ecommerce.api.import_wire_transfer", side_effect=ZeroDivisionError)
-    csv_path = Path(__file__).parent / "testdata" / "example_wire_transfers.csv"
-    with pytest.raises(WireTransferImportException):
-        import_wire_transfers(csv_path)
+@pytest.fixture
+def doof_application():
+    """An application for the learner in the first row of the example wire transfer CSV"""
+    run = BootcampRunFactory.create(
+        bootcamp__title="How to be Evil",
+        start_date=datetime(2019, 12, 21),
+        bootcamp_run_id="bootcamp-v1:public+SVCR-ol+R1",
+    )
+    return BootcampApplicationFactory.create(
+        bootcamp_run=run,
+        user__email="hdoof@odl.mit.edu",
+        state=AppStates.AWAITING_PAYMENT.value,
+    )
+
+
+def test_import_wire_transfers(mocker, wire_transfer_csv, doof_application):
+    """import_wire_transfers should import each row on its own and report the results"""
+    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    report = import_wire_transfers(wire_transfer_csv)
+    assert report.imported == [2]
+    assert report.failed == [
+        WireTransferImportError(3, "No user with email pplatypus@odl.mit.edu")
+    ]
+    receipt = WireTransferReceipt.objects.get()
+    assert receipt.wire_transfer_id == 2
+    assert receipt.data["Amount"] == "100"
+    order = receipt.order
+    assert order.status == Order.FULFILLED
+    assert order.total_price_paid == 100
+    assert order.application == doof_application
+    assert order.user == doof_application.user
+    assert order.payment_type == Order.WIRE_TRANSFER_TYPE
+    assert order.line_set.get().bootcamp_run == doof_application.bootcamp_run
+    assert order.orderaudit_set.count() == 1
+
+    report = import_wire_transfers(wire_transfer_csv)
+    assert report.imported == []
+    assert report.skipped == [2]
+    assert Order.objects.count() == 1
+
+
+def test_import_wire_transfers_force(mocker, wire_transfer_csv, doof_application):
+    """import_wire_transfers should only update the order of an imported wire transfer if forced"""
+    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    import_wire_transfers(wire_transfer_csv)
+    receipt = WireTransferReceipt.objects.get()
+    receipt.data["Amount"] = "50"
+    receipt.save()
+
+    report = import_wire_transfers(wire_transfer_csv)
+    assert report.updated == []
+    assert report.failed[0] == WireTransferImportError(
+        2, "Use --force flag to update the order."
+    )
+    report = import_wire_transfers(wire_transfer_csv, True)
+    assert report.updated == [2]
+    receipt.refresh_from_db()
+    assert receipt.data["Amount"] == "100"
+
+
+def test_import_wire_transfers_dry_run(wire_transfer_csv, doof_application):
+    """import_wire_transfers should not write anything during a dry run"""
+    report = import_wire_transfers(wire_transfer_csv, dry_run=True)
+    assert report.dry_run is True
+    assert report.imported == [2]
+    assert len(report.failed) == 1
+    assert Order.objects.count() == 0
+    assert WireTransferReceipt.objects.count() == 0
+
+
+def test_import_wire_transfers_error(mocker, wire_transfer_csv, doof_application):
+    """import_wire_transfers should remove the order for a row which could not be completed"""
+    mocker.patch(
+        "ecommerce.api.complete_successful_order", side_effect=ZeroDivisionError
+    )
+    report = import_wire_transfers(wire_transfer_csv)
+    assert report.imported == []
+    assert [failure.wire_transfer_id for failure in report.failed] == [3, 2]
+    assert Order.objects.count() == 0
+    assert Line.objects.count() == 0
+    assert WireTransferReceipt.objects.count() == 0
+
+
+def test_import_wire_transfers_interrupted(mocker, wire_transfer_csv, doof_application):
+    """An import which stops before completing its orders should not leave any orders or receipts behind"""
+    mocker.patch("ecommerce.api.complete_successful_order", side_effect=SystemExit)
+    with pytest.raises(SystemExit):
+        import_wire_transfers(wire_transfer_csv)
+    assert Order.objects.count() == 0
+    assert WireTransferReceipt.objects.count() == 0
+
+
+def test_import_wire_transfers_incomplete_order(
+    mocker, wire_transfer_csv, doof_application
+):
+    """import_wire_transfers should complete an order which was left created with a receipt"""
+    mocker.patch("ecommerce.api.tasks.send_receipt_email")
+    with patch("ecommerce.api.complete_successful_order"):
+        import_wire_transfers(wire_transfer_csv)
+    order = WireTransferReceipt.objects.get().order
+    assert order.status == Order.CREATED
+
+    assert import_wire_transfers(wire_transfer_csv, dry_run=True).imported == [2]
+    order.refresh_from_db()
+    assert order.status == Order.CREATED
+
+    report = import_wire_transfers(wire_transfer_csv)
+    assert report.imported == [2]
+    assert report.skipped == []
+    order.refresh_from_db()
+    assert order.status == Order.FULFILLED
+    doof_application.refresh_from_db()
+    assert doof_application.state == AppStates.COMPLETE.value
+    assert Order.objects.count() == 1
+
+    assert import_wire_transfers(wire_transfer_csv).skipped == [2]
+
+
+def test_import_wire_transfers_queries(
+    mocker, django_assert_max_num_queries, wire_transfer_csv, doof_application
+):
+    """import_wire_transfers should look up the rows of a batch with a constant number of queries"""
+    complete_mock = mocker.patch("ecommerce.api.complete_successful_order")
+    # 4 lookups, 3 bulk inserts, and savepoints around the inserts and each completed order
+    with django_assert_max_num_queries(11):
+        report = import_wire_transfers(wire_transfer_csv)
+    assert report.imported == [2]
+    complete_mock.assert_called_once()
+
+
+def test_import_wire_transfers_unparseable_row(tmp_path, wire_transfer_csv):
+    """import_wire_transfers should report rows which can't be parsed and skip blank rows"""
+    csv_path = tmp_path / "wire_transfers.csv"
+    csv_path.write_text(
+        wire_transfer_csv.read_text().replace(",100,", ",lots,") + ",,,\n"
+    )
+    report = import_wire_transfers(csv_path, dry_run=True)
+    assert report.total == 2
+    assert report.failed[0].wire_transfer_id is None
+    assert report.failed[0].error.startswith("Unable to parse line 4")
+
+
+def test_batch_wire_transfers():
+    """_batch_wire_transfers should close a batch when full or when a wire transfer id repeats"""
+    wire_transfers = [
+        WireTransfer(
+            id=wire_transfer_id,
+            learner_email="",
+            amount=Decimal(1),
+            bootcamp_start_date=None,
+            bootcamp_name="",
+            bootcamp_run_id="",
+            row=[],
+        )
+        for wire_transfer_id in [1, 2, 3, 3, 4]
+    ]
+    assert [
+        [wire_transfer.id for wire_transfer in batch]
+        for batch in _batch_wire_transfers(wire_transfers, 2)
+    ] == [[1, 2], [3], [3, 4]]
@@ -9,3 +9,7 @@ class EcommerceConfig(AppConfig):
     """AppConfig for Ecommerce"""
 
     name = "ecommerce"
+
+    def ready(self):
+        """Application is ready"""
+        import ecommerce.signals  # noqa: F401
@@ -0,0 +1,116 @@
+"""Checkout data for applications awaiting payment, cached in redis"""
+
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from mitol.common.utils import now_in_utc
+
+from applications.constants import AppStates
+from applications.models import BootcampApplication
+
+CHECKOUT_DATA_CACHE_KEY_PREFIX = "ecommerce:checkout_data"
+
+
+def get_checkout_data_cache_key(application_id):
+    """
+    Args:
+        application_id (int): A BootcampApplication id
+
+    Returns:
+        str: The cache key for the checkout data of the application
+    """
+    return f"{CHECKOUT_DATA_CACHE_KEY_PREFIX}:{application_id}"
+
+
+def get_cached_checkout_data(application_id, user):
+    """
+    Get the cached checkout data of an application
+
+    Args:
+        application_id (int): A BootcampApplication id
+        user (User): The user requesting the checkout data
+
+    Returns:
+        dict or None: The serialized checkout data, or None if it isn't cached for this user
+    """
+    cached = cache.get(get_checkout_data_cache_key(application_id))
+    if cached is None or cached["user_id"] != user.id:
+        return None
+    return cached["data"]
+
+
+def get_checkout_data_timeout(bootcamp_run):
+    """
+    Get how long the checkout data of an application can be cached. The amount due and whether the run is
+    payable change when a deadline passes, so the data is not kept past the next installment deadline.
+
+    Args:
+        bootcamp_run (BootcampRun): The bootcamp run of the application
+
+    Returns:
+        int: The number of seconds to cache the checkout data for
+    """
+    now = now_in_utc()
+    next_installment = bootcamp_run.installment_schedule.next_installment(now)
+    if next_installment is None:
+        return settings.CHECKOUT_DATA_CACHE_TTL
+    return min(
+        settings.CHECKOUT_DATA_CACHE_TTL,
+        math.ceil((next_installment.deadline - now).total_seconds()),
+    )
+
+
+def cache_checkout_data(application, data):
+    """
+    Cache the checkout data of an application
+
+    Args:
+        application (BootcampApplication): An application
+        data (dict): The serialized checkout data
+    """
+    cache.set(
+        get_checkout_data_cache_key(application.id),
+        {"user_id": application.user_id, "data": data},
+        timeout=get_checkout_data_timeout(application.bootcamp_run),
+    )
+
+
+def _delete_checkout_data(application_ids):
+    """Delete the cached checkout data of the applications"""
+    cache.delete_many(
+        [
+            get_checkout_data_cache_key(application_id)
+            for application_id in application_ids
+        ]
+    )
+
+
+def invalidate_checkout_data(application_ids):
+    """
+    Delete the cached checkout data of some applications. The data is deleted again once the transaction
+    commits, so checkout data computed from the uncommitted state by other requests is not kept either.
+
+    Args:
+        application_ids (iterable of int): BootcampApplication ids
+    """
+    application_ids = list(application_ids)
+    if not application_ids:
+        return
+    _delete_checkout_data(application_ids)
+    transaction.on_commit(lambda: _delete_checkout_data(application_ids))
+
+
+def invalidate_awaiting_payment_checkout_data(**filters):
+    """
+    Delete the cached checkout data of the applications awaiting payment which match the filters
+
+    Args:
+        filters (dict): Filters for BootcampApplication, for example bootcamp_run_id
+    """
+    invalidate_checkout_data(
+        BootcampApplication.objects.filter(
+            state=AppStates.AWAITING_PAYMENT.value, **filters
+        ).values_list("id", flat=True)
+    )
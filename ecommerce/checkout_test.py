@@ -0,0 +1,94 @@
+"""Tests for the cached checkout data"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from mitol.common.utils import now_in_utc
+import pytest
+
+from applications.constants import AppStates
+from applications.factories import BootcampApplicationFactory
+from ecommerce.checkout import (
+    cache_checkout_data,
+    get_cached_checkout_data,
+    get_checkout_data_cache_key,
+    get_checkout_data_timeout,
+    invalidate_checkout_data,
+)
+from ecommerce.factories import OrderFactory
+from klasses.factories import InstallmentFactory, PersonalPriceFactory
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def application():
+    """An application awaiting payment, with its checkout data cached"""
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    cache_checkout_data(application, {"id": application.id})
+    return application
+
+
+def test_get_cached_checkout_data(application):
+    """Cached checkout data should only be returned for the user it was cached for"""
+    assert get_cached_checkout_data(application.id, application.user) == {
+        "id": application.id
+    }
+    assert get_cached_checkout_data(application.id, UserFactory.create()) is None
+    invalidate_checkout_data([application.id])
+    assert get_cached_checkout_data(application.id, application.user) is None
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda app: OrderFactory.create(application=app, user=app.user),
+        lambda app: app.save(),
+        lambda app: InstallmentFactory.create(bootcamp_run=app.bootcamp_run),
+        lambda app: PersonalPriceFactory.create(
+            bootcamp_run=app.bootcamp_run, user=app.user
+        ),
+        lambda app: app.bootcamp_run.save(),
+    ],
+)
+def test_checkout_data_invalidated(application, change):
+    """Changes to the orders, application, prices or run should invalidate the cached checkout data"""
+    other_application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    cache_checkout_data(other_application, {})
+
+    change(application)
+    assert get_cached_checkout_data(application.id, application.user) is None
+    assert get_cached_checkout_data(other_application.id, other_application.user) == {}
+
+
+@pytest.mark.parametrize(
+    "deadline_seconds, expected_timeout", [(None, 3600), (7200, 3600), (60, 60)]
+)
+def test_checkout_data_timeout(settings, mocker, deadline_seconds, expected_timeout):
+    """Checkout data should not be cached past the next installment deadline"""
+    settings.CHECKOUT_DATA_CACHE_TTL = 3600
+    now = now_in_utc()
+    mocker.patch("ecommerce.checkout.now_in_utc", return_value=now)
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    InstallmentFactory.create(
+        bootcamp_run=application.bootcamp_run, deadline=now - timedelta(days=1)
+    )
+    if deadline_seconds is not None:
+        InstallmentFactory.create(
+            bootcamp_run=application.bootcamp_run,
+            deadline=now + timedelta(seconds=deadline_seconds),
+        )
+    application.bootcamp_run.clear_installment_schedule()
+
+    assert get_checkout_data_timeout(application.bootcamp_run) == expected_timeout
+    cache_checkout_data(application, {})
+    assert (
+        0 < cache.ttl(get_checkout_data_cache_key(application.id)) <= expected_timeout
+    )
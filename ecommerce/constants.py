@@ -50,3 +50,13 @@ WIRE_TRANSFER_HEADER_FIELDS = [
     WIRE_TRANSFER_BOOTCAMP_NAME,
     WIRE_TRANSFER_BOOTCAMP_START_DATE,
 ]
+WIRE_TRANSFER_IMPORT_BATCH_SIZE = 500
+
+PAYMENT_EXPORT_BATCH_SIZE = 2000
+PAYMENT_EXPORT_FORMAT_CSV = "csv"
+PAYMENT_EXPORT_FORMAT_JSONL = "jsonl"
+PAYMENT_EXPORT_FORMATS = [PAYMENT_EXPORT_FORMAT_CSV, PAYMENT_EXPORT_FORMAT_JSONL]
+PAYMENT_EXPORT_CONTENT_TYPES = {
+    PAYMENT_EXPORT_FORMAT_CSV: "text/csv",
+    PAYMENT_EXPORT_FORMAT_JSONL: "application/x-ndjson",
+}
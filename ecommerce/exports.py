@@ -0,0 +1,196 @@
+"""Streaming exports of orders and payments for finance"""
+
+import csv
+from datetime import datetime, time, timedelta
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef, Subquery
+from django.db.models.fields.json import KeyTextTransform
+import pytz
+
+from ecommerce.constants import (
+    PAYMENT_EXPORT_BATCH_SIZE,
+    PAYMENT_EXPORT_FORMAT_CSV,
+    PAYMENT_EXPORT_FORMAT_JSONL,
+)
+from ecommerce.models import Line, Receipt, WireTransferReceipt
+
+# Export column names mapped to the lookups which load them
+PAYMENT_EXPORT_FIELDS = {
+    "order_id": "order_id",
+    "order_created_on": "order__created_on",
+    "order_updated_on": "order__updated_on",
+    "order_status": "order__status",
+    "payment_type": "order__payment_type",
+    "total_price_paid": "order__total_price_paid",
+    "line_id": "id",
+    "line_price": "price",
+    "line_description": "description",
+    "application_id": "order__application_id",
+    "user_id": "order__user_id",
+    "user_email": "order__user__email",
+    "user_name": "order__user__profile__name",
+    "bootcamp_title": "bootcamp_run__bootcamp__title",
+    "bootcamp_run_id": "bootcamp_run_id",
+    "bootcamp_run_title": "bootcamp_run__title",
+    "bootcamp_run_key": "bootcamp_run__run_key",
+    "receipt_transaction_id": "receipt_transaction_id",
+    "receipt_payment_method": "receipt_payment_method",
+    "receipt_card_type": "receipt_card_type",
+    "wire_transfer_id": "wire_transfer_id",
+}
+PAYMENT_EXPORT_COLUMNS = list(PAYMENT_EXPORT_FIELDS)
+
+
+def _latest_receipt_value(key):
+    """
+    Args:
+        key (str): A key of the CyberSource message
+
+    Returns:
+        Subquery: The value of the key in the latest receipt for the order of a line
+    """
+    return Subquery(
+        Receipt.objects.filter(order_id=OuterRef("order_id"))
+        .order_by("-id")
+        .annotate(value=KeyTextTransform(key, "data"))
+        .values("value")[:1]
+    )
+
+
+def get_payment_export_queryset(
+    *, start_date=None, end_date=None, bootcamp_run_id=None, statuses=None
+):
+    """
+    Build a query for the export rows, with one row for each order line
+
+    Args:
+        start_date (datetime.date or None): Only include orders created on or after this day (UTC)
+        end_date (datetime.date or None): Only include orders created on or before this day (UTC)
+        bootcamp_run_id (int or None): Only include lines for this bootcamp run
+        statuses (list of str or None): Only include orders with these statuses
+
+    Returns:
+        QuerySet: A values() query of the export rows, ordered by line id
+    """
+    lines = Line.objects.all()
+    if start_date is not None:
+        lines = lines.filter(
+            order__created_on__gte=datetime.combine(start_date, time.min, pytz.UTC)
+        )
+    if end_date is not None:
+        lines = lines.filter(
+            order__created_on__lt=datetime.combine(
+                end_date + timedelta(days=1), time.min, pytz.UTC
+            )
+        )
+    if bootcamp_run_id is not None:
+        lines = lines.filter(bootcamp_run_id=bootcamp_run_id)
+    if statuses:
+        lines = lines.filter(order__status__in=statuses)
+    return (
+        lines.annotate(
+            receipt_transaction_id=_latest_receipt_value("transaction_id"),
+            receipt_payment_method=_latest_receipt_value("req_payment_method"),
+            receipt_card_type=_latest_receipt_value("req_card_type"),
+            wire_transfer_id=Subquery(
+                WireTransferReceipt.objects.filter(order_id=OuterRef("order_id"))
+                .order_by("-id")
+                .values("wire_transfer_id")[:1]
+            ),
+        )
+        .order_by("id")
+        .values(*PAYMENT_EXPORT_FIELDS.values())
+    )
+
+
+def iter_payment_export_batches(batch_size=PAYMENT_EXPORT_BATCH_SIZE, **filters):
+    """
+    Load the export rows in batches. Each batch is a separate query which continues after the last line
+    of the previous batch, so memory use doesn't grow with the size of the export.
+
+    Args:
+        batch_size (int): The number of rows in each batch
+        filters (dict): Filters for get_payment_export_queryset
+
+    Yields:
+        list of dict: Export rows, keyed by column name
+    """
+    queryset = get_payment_export_queryset(**filters)
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return
+        last_id = batch[-1]["id"]
+        yield [
+            {column: row[lookup] for column, lookup in PAYMENT_EXPORT_FIELDS.items()}
+            for row in batch
+        ]
+
+
+class _Echo:
+    """A file-like object which returns what is written to it, so csv.writer can build lines"""
+
+    def write(self, value):
+        """Return the value instead of writing it"""
+        return value
+
+
+def _csv_value(value):
+    """Format a value for a CSV cell"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(batches):
+    """
+    Args:
+        batches (iterable of list of dict): Export rows
+
+    Yields:
+        str: The CSV header, then the CSV lines for each batch
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(PAYMENT_EXPORT_COLUMNS)
+    for batch in batches:
+        yield "".join(
+            writer.writerow(
+                [_csv_value(row[column]) for column in PAYMENT_EXPORT_COLUMNS]
+            )
+            for row in batch
+        )
+
+
+def iter_jsonl(batches):
+    """
+    Args:
+        batches (iterable of list of dict): Export rows
+
+    Yields:
+        str: One JSON object per line for each row of a batch
+    """
+    for batch in batches:
+        yield "".join(f"{json.dumps(row, cls=DjangoJSONEncoder)}\n" for row in batch)
+
+
+PAYMENT_EXPORT_WRITERS = {
+    PAYMENT_EXPORT_FORMAT_CSV: iter_csv,
+    PAYMENT_EXPORT_FORMAT_JSONL: iter_jsonl,
+}
+
+
+def iter_payment_export(export_format, **filters):
+    """
+    Stream an export of orders and payments
+
+    Args:
+        export_format (str): The output format, one of PAYMENT_EXPORT_FORMATS
+        filters (dict): Filters for get_payment_export_queryset
+
+    Returns:
+        iterator of str: Chunks of the export
+    """
+    return PAYMENT_EXPORT_WRITERS[export_format](iter_payment_export_batches(**filters))
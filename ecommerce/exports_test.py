@@ -0,0 +1,118 @@
+"""Tests for the payment exports"""
+
+import csv
+from datetime import date, datetime
+import io
+import json
+
+import pytest
+import pytz
+
+from ecommerce.constants import PAYMENT_EXPORT_FORMAT_CSV, PAYMENT_EXPORT_FORMAT_JSONL
+from ecommerce.exports import (
+    PAYMENT_EXPORT_COLUMNS,
+    iter_payment_export,
+    iter_payment_export_batches,
+)
+from ecommerce.factories import LineFactory, ReceiptFactory
+from ecommerce.models import Order, WireTransferReceipt
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lines():
+    """Order lines created on different days"""
+    lines = LineFactory.create_batch(3, order__status=Order.FULFILLED)
+    for day, line in zip([1, 2, 3], lines):
+        Order.objects.filter(id=line.order_id).update(
+            created_on=datetime(2023, 1, day, 12, tzinfo=pytz.UTC)
+        )
+    return lines
+
+
+def test_iter_payment_export_batches(lines, django_assert_num_queries):
+    """The export rows should be loaded in batches, with the details of the latest receipt"""
+    ReceiptFactory.create(order=lines[0].order, data={"req_card_type": "001"})
+    ReceiptFactory.create(
+        order=lines[0].order,
+        data={
+            "req_payment_method": "card",
+            "req_card_type": "002",
+            "transaction_id": "123",
+        },
+    )
+    WireTransferReceipt.objects.create(
+        wire_transfer_id=7, order=lines[1].order, data={}
+    )
+
+    with django_assert_num_queries(3):
+        batches = list(iter_payment_export_batches(batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    rows = [row for batch in batches for row in batch]
+    assert [row["line_id"] for row in rows] == [line.id for line in lines]
+    assert list(rows[0]) == PAYMENT_EXPORT_COLUMNS
+    assert rows[0]["order_id"] == lines[0].order_id
+    assert rows[0]["line_price"] == lines[0].price
+    assert rows[0]["user_email"] == lines[0].order.user.email
+    assert rows[0]["bootcamp_run_key"] == lines[0].bootcamp_run.run_key
+    assert rows[0]["receipt_payment_method"] == "card"
+    assert rows[0]["receipt_card_type"] == "002"
+    assert rows[0]["receipt_transaction_id"] == "123"
+    assert rows[0]["wire_transfer_id"] is None
+    assert rows[1]["wire_transfer_id"] == 7
+    assert rows[1]["receipt_card_type"] is None
+
+
+@pytest.mark.parametrize(
+    "filters, expected_indexes",
+    [
+        ({"start_date": date(2023, 1, 2)}, [1, 2]),
+        ({"end_date": date(2023, 1, 2)}, [0, 1]),
+        ({"start_date": date(2023, 1, 2), "end_date": date(2023, 1, 2)}, [1]),
+        ({"statuses": [Order.REFUNDED]}, []),
+    ],
+)
+def test_iter_payment_export_batches_filters(lines, filters, expected_indexes):
+    """The export rows should be filtered by order creation date and status"""
+    assert [
+        row["line_id"]
+        for batch in iter_payment_export_batches(**filters)
+        for row in batch
+    ] == [lines[index].id for index in expected_indexes]
+
+
+def test_iter_payment_export_batches_run(lines):
+    """The export rows should be filtered by bootcamp run"""
+    assert [
+        row["line_id"]
+        for batch in iter_payment_export_batches(
+            bootcamp_run_id=lines[1].bootcamp_run_id
+        )
+        for row in batch
+    ] == [lines[1].id]
+
+
+def test_iter_payment_export_csv(lines):
+    """The CSV export should have a header and a line for each order line"""
+    rows = list(
+        csv.DictReader(
+            io.StringIO("".join(iter_payment_export(PAYMENT_EXPORT_FORMAT_CSV)))
+        )
+    )
+    assert [int(row["line_id"]) for row in rows] == [line.id for line in lines]
+    assert rows[0]["order_created_on"] == "2023-01-01T12:00:00+00:00"
+    assert rows[0]["line_price"] == str(lines[0].price)
+
+
+def test_iter_payment_export_jsonl(lines):
+    """The JSON lines export should have one JSON object for each order line"""
+    rows = [
+        json.loads(row)
+        for row in "".join(
+            iter_payment_export(PAYMENT_EXPORT_FORMAT_JSONL)
+        ).splitlines()
+    ]
+    assert [row["line_id"] for row in rows] == [line.id for line in lines]
+    assert rows[0]["order_created_on"] == "2023-01-01T12:00:00Z"
+    assert rows[0]["line_price"] == str(lines[0].price)
@@ -0,0 +1,80 @@
+"""Management command to export orders and payments for finance"""
+
+from datetime import date
+import sys
+
+from django.core.management import BaseCommand
+
+from ecommerce.constants import (
+    PAYMENT_EXPORT_BATCH_SIZE,
+    PAYMENT_EXPORT_FORMAT_CSV,
+    PAYMENT_EXPORT_FORMATS,
+)
+from ecommerce.exports import iter_payment_export
+from ecommerce.models import Order
+
+
+class Command(BaseCommand):
+    """Writes a CSV or JSON lines export of order lines with their payment details"""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=PAYMENT_EXPORT_FORMATS,
+            default=PAYMENT_EXPORT_FORMAT_CSV,
+            help="The output format",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="The path of the file to write, or standard output if not set",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="Only export orders created on or after this day (YYYY-MM-DD, UTC)",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Only export orders created on or before this day (YYYY-MM-DD, UTC)",
+        )
+        parser.add_argument(
+            "--run", type=int, help="Only export lines for this bootcamp run id"
+        )
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=Order.STATUSES,
+            help="Only export orders with this status. Can be repeated",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PAYMENT_EXPORT_BATCH_SIZE,
+            help="The number of rows loaded with each query",
+        )
+        super().add_arguments(parser)
+
+    def handle(self, *args, **options):
+        """Handle command execution"""
+        chunks = iter_payment_export(
+            options["format"],
+            batch_size=options["batch_size"],
+            start_date=options["start_date"],
+            end_date=options["end_date"],
+            bootcamp_run_id=options["run"],
+            statuses=options["status"],
+        )
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote payment export to {options['output']}")
+            )
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
@@ -3,6 +3,7 @@
 from django.core.management import BaseCommand
 
 from ecommerce.api import import_wire_transfers
+from ecommerce.constants import WIRE_TRANSFER_IMPORT_BATCH_SIZE
 
 
 class Command(BaseCommand):
@@ -21,7 +22,34 @@ class Command(BaseCommand):
             dest="force",
             help="Migrate applications even if the 'from' run and 'to' run belong to different bootcamps.",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            dest="dry_run",
+            help="Report what would be imported without writing anything",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=WIRE_TRANSFER_IMPORT_BATCH_SIZE,
+            help="Number of rows to look up and create at once",
+        )
 
     def handle(self, *args, **options):
         """Import CSV of wire transfers"""
-        import_wire_transfers(options["csv_path"], options["force"])
+        report = import_wire_transfers(
+            options["csv_path"],
+            options["force"],
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+        )
+        for failure in report.failed:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"Id={failure.wire_transfer_id}: {failure.error}"
+                    if failure.wire_transfer_id is not None
+                    else failure.error
+                )
+            )
+        style = self.style.ERROR if report.failed else self.style.SUCCESS
+        self.stdout.write(style(str(report)))
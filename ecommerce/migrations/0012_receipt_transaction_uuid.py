@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 04:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0011_alter_json_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="transaction_uuid",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
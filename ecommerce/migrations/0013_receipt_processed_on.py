@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-18 05:47
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backpopulate_processed_on(apps, schema_editor):
+    """Mark receipts which were already linked to an order as processed"""
+    Receipt = apps.get_model("ecommerce", "Receipt")
+    Receipt.objects.filter(order__isnull=False).update(processed_on=F("updated_on"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0012_receipt_transaction_uuid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receipt",
+            name="processed_on",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backpopulate_processed_on, migrations.RunPython.noop),
+    ]
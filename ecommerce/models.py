@@ -5,6 +5,7 @@ from django.db.models import (
     CharField,
     CASCADE,
     DecimalField,
+    DateTimeField,
     ForeignKey,
     IntegerField,
     SET_NULL,
@@ -174,6 +175,8 @@ class Receipt(TimestampedModel):
 
     order = ForeignKey(Order, null=True, on_delete=CASCADE)
     data = JSONField()
+    transaction_uuid = CharField(max_length=64, null=True, blank=True, unique=True)
+    processed_on = DateTimeField(null=True, blank=True)
 
     @property
     def payment_method(self):
@@ -1,8 +1,11 @@
 """Serializers for ecommerce"""
 
+from operator import attrgetter
+
 from rest_framework import serializers
 
 from applications.models import BootcampApplication
+from ecommerce.constants import PAYMENT_EXPORT_FORMAT_CSV, PAYMENT_EXPORT_FORMATS
 from ecommerce.models import Order, Line, Receipt
 from klasses.serializers import BootcampRunSerializer, InstallmentSerializer
 
@@ -18,6 +21,28 @@ class PaymentSerializer(serializers.Serializer):
     application_id = serializers.IntegerField()
 
 
+class PaymentExportSerializer(serializers.Serializer):
+    """
+    Serializer for the filters of the payment export API
+    """
+
+    file_format = serializers.ChoiceField(
+        choices=PAYMENT_EXPORT_FORMATS, default=PAYMENT_EXPORT_FORMAT_CSV
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    bootcamp_run_id = serializers.IntegerField(required=False)
+    status = serializers.MultipleChoiceField(choices=Order.STATUSES, required=False)
+
+    def validate(self, attrs):
+        """Check that the date range isn't reversed"""
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("start_date must not be after end_date")
+        return attrs
+
+
 class OrderPartialSerializer(serializers.ModelSerializer):
     """
     Serializer for Order
@@ -104,20 +129,20 @@ class CheckoutDataSerializer(serializers.ModelSerializer):
     installments = serializers.SerializerMethodField()
 
     def get_payments(self, application):
-        """Serialized payments made by the user"""
+        """Serialized payments made by the user, using the prefetched orders and lines"""
+        lines = (
+            min(order.line_set.all(), key=attrgetter("id"), default=None)
+            for order in application.orders.all()
+            if order.status == Order.FULFILLED
+        )
         return LineSerializer(
-            (
-                order.line_set.first()
-                for order in application.orders.all()
-                if order.status == Order.FULFILLED
-            ),
-            many=True,
+            [line for line in lines if line is not None], many=True
         ).data
 
     def get_installments(self, application):
         """Installments with prices and due dates"""
         return InstallmentSerializer(
-            application.bootcamp_run.installment_set.order_by("deadline"), many=True
+            application.bootcamp_run.installment_schedule.installments, many=True
         ).data
 
     class Meta:
@@ -2,6 +2,7 @@
 
 import pytest
 
+from applications.models import BootcampApplication
 from main.utils import serializer_date_format
 from ecommerce.factories import (
     LineFactory,
@@ -144,6 +145,27 @@ def test_checkout_data(has_paid):
     }
 
 
+def test_checkout_data_payments_prefetched(django_assert_num_queries):
+    """The checkout data serializer should only use the prefetched orders and lines for payments"""
+    application = BootcampApplicationFactory.create()
+    lines = [
+        LineFactory.create(
+            order__status=status,
+            order__application=application,
+            order__user=application.user,
+            bootcamp_run=application.bootcamp_run,
+        )
+        for status in [Order.FULFILLED, Order.CREATED, Order.FULFILLED]
+    ]
+    application = BootcampApplication.objects.prefetch_related(
+        "orders__line_set__bootcamp_run"
+    ).get(id=application.id)
+
+    with django_assert_num_queries(0):
+        payments = CheckoutDataSerializer().get_payments(application)
+    assert payments == [LineSerializer(lines[0]).data, LineSerializer(lines[2]).data]
+
+
 def test_order_serializer():
     """OrderSerializer should return expected data"""
     order = OrderFactory.create()
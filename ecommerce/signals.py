@@ -0,0 +1,92 @@
+"""Signals for ecommerce models"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from applications.api import update_application_ledger
+from applications.models import BootcampApplication
+from ecommerce.checkout import (
+    invalidate_awaiting_payment_checkout_data,
+    invalidate_checkout_data,
+)
+from ecommerce.models import Order
+from klasses.models import BootcampRun, Installment, PersonalPrice
+
+
+@receiver(post_save, sender=Order, dispatch_uid="order_post_save")
+def update_ledger_for_order(
+    sender, instance, created, **kwargs
+):  # pylint:disable=unused-argument
+    """Keep the payment ledger of the order's application up to date"""
+    if instance.application_id is not None:
+        update_application_ledger(instance.application)
+
+
+@receiver(post_delete, sender=Order, dispatch_uid="order_post_delete")
+def update_ledger_for_deleted_order(
+    sender, instance, origin=None, **kwargs
+):  # pylint:disable=unused-argument
+    """
+    Keep the payment ledger of the order's application up to date when the order itself was deleted.
+    Orders deleted along with their application or user are skipped, since the ledger is deleted too.
+    """
+    if instance.application_id is None:
+        return
+    if isinstance(origin, Order) or getattr(origin, "model", None) is Order:
+        update_application_ledger(instance.application)
+
+
+@receiver([post_save, post_delete], sender=Order, dispatch_uid="order_checkout_data")
+def invalidate_checkout_data_for_order(
+    sender, instance, **kwargs
+):  # pylint:disable=unused-argument
+    """Invalidate the cached checkout data of the order's application"""
+    if instance.application_id is not None:
+        invalidate_checkout_data([instance.application_id])
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=BootcampApplication,
+    dispatch_uid="bootcamp_application_checkout_data",
+)
+def invalidate_checkout_data_for_application(
+    sender, instance, **kwargs
+):  # pylint:disable=unused-argument
+    """Invalidate the cached checkout data of an application when it changes, for example its state"""
+    invalidate_checkout_data([instance.id])
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=PersonalPrice,
+    dispatch_uid="personal_price_checkout_data",
+)
+def invalidate_checkout_data_for_personal_price(
+    sender, instance, **kwargs
+):  # pylint:disable=unused-argument
+    """Invalidate the cached checkout data of the applications which the personal price is for"""
+    invalidate_awaiting_payment_checkout_data(
+        bootcamp_run_id=instance.bootcamp_run_id, user_id=instance.user_id
+    )
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Installment,
+    dispatch_uid="installment_checkout_data",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=BootcampRun,
+    dispatch_uid="bootcamp_run_checkout_data",
+)
+def invalidate_checkout_data_for_run(
+    sender, instance, **kwargs
+):  # pylint:disable=unused-argument
+    """Invalidate the cached checkout data of the applications for a bootcamp run when the run or its prices change"""
+    invalidate_awaiting_payment_checkout_data(
+        bootcamp_run_id=(
+            instance.id if sender is BootcampRun else instance.bootcamp_run_id
+        )
+    )
@@ -1,6 +1,9 @@
 """Ecommerce celery tasks"""
 
+from django.core.exceptions import ObjectDoesNotExist
+
 from ecommerce import api
+from ecommerce.exceptions import EcommerceException, ParseException
 from main.celery import app
 
 
@@ -8,3 +11,22 @@ from main.celery import app
 def send_receipt_email(application_id):
     """Task to send a receipt email for an application"""
     api.send_receipt_email(application_id)
+
+
+@app.task(
+    acks_late=True,
+    autoretry_for=(Exception,),
+    # A malformed message or an order in an unexpected state won't be fixed by retrying
+    dont_autoretry_for=(
+        EcommerceException,
+        ParseException,
+        KeyError,
+        ObjectDoesNotExist,
+    ),
+    max_retries=5,
+    retry_backoff=30,
+    retry_jitter=True,
+)
+def fulfill_order(receipt_id):
+    """Task to fulfill or reject the order for a CyberSource receipt"""
+    api.fulfill_order_from_receipt(receipt_id)
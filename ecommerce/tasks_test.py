@@ -1,6 +1,10 @@
 """Ecommerce task tests"""
 
-from ecommerce.tasks import send_receipt_email
+from celery.exceptions import Retry
+import pytest
+
+from ecommerce.exceptions import EcommerceException
+from ecommerce.tasks import fulfill_order, send_receipt_email
 
 
 def test_send_receipt_email(mocker):
@@ -8,3 +12,26 @@ def test_send_receipt_email(mocker):
     mock_api = mocker.patch("ecommerce.tasks.api")
     send_receipt_email.delay(123)
     mock_api.send_receipt_email.assert_called_once_with(123)
+
+
+def test_fulfill_order(mocker):
+    """Test fulfill_order"""
+    mock_api = mocker.patch("ecommerce.tasks.api")
+    fulfill_order.delay(123)
+    mock_api.fulfill_order_from_receipt.assert_called_once_with(123)
+
+
+def test_fulfill_order_retry(mocker):
+    """fulfill_order should be retried if finishing the order fails"""
+    mock_api = mocker.patch("ecommerce.tasks.api")
+    mock_api.fulfill_order_from_receipt.side_effect = ConnectionError
+    with pytest.raises(Retry):
+        fulfill_order.delay(123)
+
+
+def test_fulfill_order_no_retry(mocker):
+    """fulfill_order should not be retried if the order is in an unexpected state"""
+    mock_api = mocker.patch("ecommerce.tasks.api")
+    mock_api.fulfill_order_from_receipt.side_effect = EcommerceException
+    with pytest.raises(EcommerceException):
+        fulfill_order.delay(123)
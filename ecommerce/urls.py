@@ -7,6 +7,7 @@ from django.urls import path, re_path
 from ecommerce.views import (
     CheckoutDataView,
     OrderFulfillmentView,
+    PaymentExportView,
     PaymentView,
     UserBootcampRunDetail,
     UserBootcampRunList,
@@ -38,5 +39,6 @@ urlpatterns = [
         name="bootcamp-run-statement",
     ),
     path("api/orders/<int:pk>/", OrderView.as_view(), name="order-api"),
+    path("api/v0/payments/export/", PaymentExportView.as_view(), name="payment-export"),
     path("api/checkout/", CheckoutDataView.as_view(), name="checkout-data-detail"),
 ]
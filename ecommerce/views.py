@@ -5,14 +5,15 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http.response import Http404
+from django.http.response import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from ipware import get_client_ip
+from mitol.common.utils import now_in_utc
 from rest_framework import status as statuses
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.generics import CreateAPIView, GenericAPIView, RetrieveAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
 from rest_framework.validators import ValidationError
@@ -21,21 +22,22 @@ from rest_framework.views import APIView
 from applications.constants import AppStates
 from applications.models import BootcampApplication
 from backends.edxorg import EdxOrgOAuth2
+from ecommerce import tasks
 from ecommerce.api import (
-    complete_successful_order,
     create_unfulfilled_order,
     generate_cybersource_sa_payload,
-    get_new_order_by_reference_number,
-    handle_rejected_order,
+    record_cybersource_receipt,
     serialize_user_bootcamp_run,
     serialize_user_bootcamp_runs,
 )
-from ecommerce.constants import CYBERSOURCE_DECISION_ACCEPT, CYBERSOURCE_DECISION_CANCEL
-from ecommerce.exceptions import EcommerceException
-from ecommerce.models import Line, Order, Receipt
+from ecommerce.checkout import cache_checkout_data, get_cached_checkout_data
+from ecommerce.constants import PAYMENT_EXPORT_CONTENT_TYPES
+from ecommerce.exports import iter_payment_export
+from ecommerce.models import Line, Order
 from ecommerce.permissions import IsSignedByCyberSource
 from ecommerce.serializers import (
     CheckoutDataSerializer,
+    PaymentExportSerializer,
     PaymentSerializer,
     OrderSerializer,
 )
@@ -111,30 +113,17 @@ class OrderFulfillmentView(APIView):
 
     def post(self, request, *args, **kwargs):  # pylint: disable=unused-argument
         """
-        Confirmation from CyberSource which fulfills an existing Order.
+        Confirmation from CyberSource which fulfills an existing Order. The message is saved in a receipt
+        and the order is fulfilled by a task, so CyberSource gets its response right away.
         """
-        # First, save this information in a receipt
-        receipt = Receipt.objects.create(data=request.data)
-
-        # Link the order with the receipt if we can parse it
-        reference_number = request.data["req_reference_number"]
-        order = get_new_order_by_reference_number(reference_number)
-        receipt.order = order
-        receipt.save()
-
-        decision = request.data["decision"]
-        if order.status == Order.FAILED and decision == CYBERSOURCE_DECISION_CANCEL:
-            # This is a duplicate message, ignore since it's already handled
-            return Response(status=statuses.HTTP_200_OK)
-        elif order.status != Order.CREATED:
-            raise EcommerceException(
-                "Order {} is expected to have status 'created'".format(order.id)
-            )
-
-        if decision != CYBERSOURCE_DECISION_ACCEPT:
-            handle_rejected_order(order=order, decision=decision)
+        receipt, created = record_cybersource_receipt(request.data)
+        if created:
+            tasks.fulfill_order.delay(receipt.id)
         else:
-            complete_successful_order(order)
+            log.info(
+                "Ignoring duplicate CyberSource message for transaction %s",
+                receipt.transaction_uuid,
+            )
 
         # The response does not matter to CyberSource
         return Response(status=statuses.HTTP_200_OK)
@@ -233,12 +222,12 @@ class CheckoutDataView(RetrieveAPIView):
             BootcampApplication.objects.filter(
                 user=self.request.user, state=AppStates.AWAITING_PAYMENT.value
             )
-            .select_related("bootcamp_run")
+            .select_related("user", "bootcamp_run__bootcamp", "ledger")
             .prefetch_related(
                 "bootcamp_run__personal_prices",
                 "bootcamp_run__installment_set",
                 "orders",
-                "orders__line_set",
+                "orders__line_set__bootcamp_run",
             )
             .order_by("id")
         )
@@ -248,6 +237,53 @@ class CheckoutDataView(RetrieveAPIView):
         application_id = self.request.query_params.get("application")
         return get_object_or_404(self.get_queryset(), id=application_id)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Respond with the cached checkout data, serializing the application if it isn't cached"""
+        application_id = request.query_params.get("application")
+        if application_id is None or not application_id.isdigit():
+            raise Http404
+        data = get_cached_checkout_data(application_id, request.user)
+        if data is None:
+            application = self.get_object()
+            data = self.get_serializer(application).data
+            cache_checkout_data(application, data)
+        return Response(data)
+
+
+class PaymentExportView(APIView):
+    """
+    Admin view which streams an export of order lines with their payment details
+    """
+
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """Stream the export for the filters in the query parameters"""
+        serializer = PaymentExportSerializer(
+            data={
+                **request.query_params.dict(),
+                "status": request.query_params.getlist("status"),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+        export_format = filters["file_format"]
+        response = StreamingHttpResponse(
+            iter_payment_export(
+                export_format,
+                start_date=filters.get("start_date"),
+                end_date=filters.get("end_date"),
+                bootcamp_run_id=filters.get("bootcamp_run_id"),
+                statuses=list(filters.get("status", [])),
+            ),
+            content_type=PAYMENT_EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="payments-{now_in_utc():%Y%m%d%H%M%S}.{export_format}"'
+        )
+        return response
+
 
 class OrderView(RetrieveAPIView):
     """API view for Orders"""
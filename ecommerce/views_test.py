@@ -1,5 +1,6 @@
 """Tests for ecommerce views"""
 
+import json
 from unittest.mock import PropertyMock
 
 from django.urls import resolve, reverse
@@ -251,6 +252,29 @@ def test_missing_fields(client, mocker):
     assert Receipt.objects.first().data == data
 
 
+def test_duplicate_transaction(client, mocker):
+    """
+    If CyberSource sends the same message more than once, only one receipt should be saved and the
+    order should only be fulfilled once
+    """
+    data = {
+        "req_reference_number": "BOOTCAMP-1",
+        "req_transaction_uuid": "abc",
+        "decision": "ACCEPT",
+    }
+    mocker.patch(
+        "ecommerce.views.IsSignedByCyberSource.has_permission", return_value=True
+    )
+    fulfill_mock = mocker.patch("ecommerce.views.tasks.fulfill_order.delay")
+    for _ in range(2):
+        resp = client.post(reverse("order-fulfillment"), data=data)
+        assert resp.status_code == statuses.HTTP_200_OK
+
+    receipt = Receipt.objects.get()
+    assert receipt.transaction_uuid == "abc"
+    fulfill_mock.assert_called_once_with(receipt.id)
+
+
 @pytest.mark.parametrize(
     "decision, should_send_email", [("CANCEL", False), ("something else", True)]
 )
@@ -540,6 +564,45 @@ def test_checkout_data(mocker, client):
     )
 
 
+def test_checkout_data_cached(client, django_assert_num_queries):
+    """The checkout data API should serve the cached checkout data until the application changes"""
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    client.force_login(application.user)
+    url = f'{reverse("checkout-data-detail")}?application={application.id}'
+    data = client.get(url).json()
+
+    with django_assert_num_queries(2):
+        # The session and the user
+        assert client.get(url).json() == data
+
+    application.state = AppStates.COMPLETE.value
+    application.save()
+    assert client.get(url).status_code == statuses.HTTP_404_NOT_FOUND
+
+
+def test_checkout_data_other_user(client, user):
+    """The checkout data API should not return cached checkout data of another user"""
+    application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    client.force_login(application.user)
+    url = f'{reverse("checkout-data-detail")}?application={application.id}'
+    assert client.get(url).status_code == statuses.HTTP_200_OK
+
+    client.force_login(user)
+    assert client.get(url).status_code == statuses.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize("application_id", ["", "abc"])
+def test_checkout_data_invalid_application_id(client, user, application_id):
+    """The checkout data API should 404 if the application id isn't a number"""
+    client.force_login(user)
+    resp = client.get(f'{reverse("checkout-data-detail")}?application={application_id}')
+    assert resp.status_code == statuses.HTTP_404_NOT_FOUND
+
+
 def test_checkout_data_no_application_id(client, user):
     """check that the application query parameter is required"""
     client.force_login(user)
@@ -553,6 +616,37 @@ def test_checkout_data_anonymous(client):
     assert resp.status_code == statuses.HTTP_403_FORBIDDEN
 
 
+def test_payment_export(admin_drf_client):
+    """Admins should be able to stream an export of orders and payments"""
+    line = LineFactory.create(order__status=Order.FULFILLED)
+    LineFactory.create(order__status=Order.FULFILLED)
+    resp = admin_drf_client.get(
+        reverse("payment-export"),
+        {"file_format": "jsonl", "bootcamp_run_id": line.bootcamp_run_id},
+    )
+    assert resp.status_code == statuses.HTTP_200_OK
+    assert resp["Content-Type"] == "application/x-ndjson"
+    assert resp["Content-Disposition"].startswith('attachment; filename="payments-')
+    rows = b"".join(resp.streaming_content).decode().splitlines()
+    assert [json.loads(row)["line_id"] for row in rows] == [line.id]
+
+
+def test_payment_export_invalid_dates(admin_drf_client):
+    """The payment export should reject a reversed date range"""
+    resp = admin_drf_client.get(
+        reverse("payment-export"),
+        {"start_date": "2023-02-01", "end_date": "2023-01-01"},
+    )
+    assert resp.status_code == statuses.HTTP_400_BAD_REQUEST
+
+
+def test_payment_export_permissions(client, user):
+    """Only admins should be able to export payments"""
+    client.force_login(user)
+    resp = client.get(reverse("payment-export"))
+    assert resp.status_code == statuses.HTTP_403_FORBIDDEN
+
+
 def test_order_view_permissions(client, user):
     """A user should not be able to access order data if it does not belong to them"""
     random_user = UserFactory.create(is_staff=False, is_superuser=False)
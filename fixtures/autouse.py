@@ -2,8 +2,18 @@
 
 import pytest
 
+from hubspot_sync.id_cache import clear_local_hubspot_id_cache
+
 
 @pytest.fixture(autouse=True)
 def disable_hubspot_api(settings):
     """Disable Hubspot API by default for tests"""
     settings.MITOL_HUBSPOT_API_PRIVATE_TOKEN = None
+
+
+@pytest.fixture(autouse=True)
+def clear_local_hubspot_id_cache_between_tests():
+    """Start every test without hubspot ids cached in the process, since the HubspotObjects of earlier tests are rolled back"""
+    clear_local_hubspot_id_cache()
+    yield
+    clear_local_hubspot_id_cache()
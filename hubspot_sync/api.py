@@ -1,41 +1,64 @@
 """Hubspot CRM API sync utilities"""
 
+import hashlib
+import json
 import logging
 import re
+import time
 from builtins import hasattr
-from decimal import Decimal
+from collections import namedtuple
+from typing import Iterable
 
+import requests
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from hubspot.crm.objects import SimplePublicObject, SimplePublicObjectInput
-from mitol.common.utils.collections import replace_null_values
+from mitol.common.utils.collections import chunks, replace_null_values
+from mitol.hubspot_api import api as hubspot_api
 from mitol.hubspot_api.api import (
     HubspotApi,
     HubspotAssociationType,
     HubspotObjectType,
-    associate_objects_request,
-    find_contact,
-    find_deal,
-    find_line_item,
-    find_product,
     get_all_objects,
     get_line_items_for_deal,
-    upsert_object_request,
 )
 from mitol.hubspot_api.models import HubspotObject
 
 from applications.constants import INTEGRATION_PREFIX
 from applications.models import BootcampApplication, BootcampApplicationLine
+from hubspot_sync.constants import (
+    HUBSPOT_FORM_SUBMISSION_TIMEOUT,
+    HUBSPOT_FORMS_URL,
+    HUBSPOT_ID_SYNC_CHUNK_SIZE,
+)
+from hubspot_sync.id_cache import (
+    get_cached_hubspot_id,
+    get_cached_hubspot_ids,
+    invalidate_hubspot_ids,
+)
+from hubspot_sync.models import HubspotSyncFingerprint
+from hubspot_sync.rate_limit import rate_limited
 from hubspot_sync.serializers import (
     HubspotDealSerializer,
     HubspotLineSerializer,
     HubspotProductSerializer,
+    get_deal_queryset,
+    preload_deal_data,
 )
 from klasses.models import BootcampRun
 
 log = logging.getLogger()
 
+# Take a rate limit token for each Hubspot API call of the single object syncs. The line item lookup
+# reads the associations of the deal and then its line items.
+associate_objects_request = rate_limited(hubspot_api.associate_objects_request)
+find_contact = rate_limited(hubspot_api.find_contact)
+find_deal = rate_limited(hubspot_api.find_deal)
+find_line_item = rate_limited(hubspot_api.find_line_item, tokens=2)
+find_product = rate_limited(hubspot_api.find_product)
+upsert_object_request = rate_limited(hubspot_api.upsert_object_request)
+
 
 def parse_hubspot_deal_id(hubspot_id) -> int:
     """
@@ -164,6 +187,47 @@ def make_deal_sync_message(application_id):
     return make_object_properties_message(properties)
 
 
+def make_deal_sync_messages(application_ids):
+    """
+    Create the bodies of sync messages for many deals, with a constant number of queries
+
+    Args:
+        application_ids (list of int): BootcampApplication ids
+
+    Returns:
+        dict: SimplePublicObjectInput for each application, keyed by application id
+    """
+    applications = list(get_deal_queryset().filter(id__in=application_ids))
+    serializer = HubspotDealSerializer(
+        applications,
+        many=True,
+        context={"deal_preload": preload_deal_data(applications)},
+    )
+    return {
+        application.id: make_object_properties_message(properties)
+        for application, properties in zip(applications, serializer.data)
+    }
+
+
+def make_sync_messages(ct_model_name, object_ids):
+    """
+    Create the bodies of sync messages for many objects of the same type, in bulk if the type supports it
+
+    Args:
+        ct_model_name (str): The model name of the objects
+        object_ids (list of int): The object ids
+
+    Returns:
+        list: SimplePublicObjectInput for each object, in the order of object_ids
+    """
+    if ct_model_name in BULK_MODEL_FUNCTION_MAPPING:
+        messages = BULK_MODEL_FUNCTION_MAPPING[ct_model_name](object_ids)
+        return [messages[int(object_id)] for object_id in object_ids]
+    return [
+        MODEL_FUNCTION_MAPPING[ct_model_name](object_id) for object_id in object_ids
+    ]
+
+
 def make_line_sync_message(application_line_id):
     """
     Create the body of a sync message for a Line Item.
@@ -180,6 +244,138 @@ def make_line_sync_message(application_line_id):
     return make_object_properties_message(properties)
 
 
+def make_sync_fingerprint(hubspot_id: str, properties: dict) -> str:
+    """
+    Hash the payload of a sync, along with the hubspot id it is sent to. Associations are synced
+    separately, both by the single and the batch syncs, so they have their own fingerprint.
+
+    Args:
+        hubspot_id(str): The hubspot id of the object
+        properties(dict): The properties sent to Hubspot
+
+    Returns:
+        str: The fingerprint
+    """
+    return hashlib.sha256(
+        json.dumps([hubspot_id, properties], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def make_association_fingerprint(hubspot_id: str, **related_ids) -> str:
+    """
+    Hash the hubspot ids of the objects an object was associated with
+
+    Args:
+        hubspot_id(str): The hubspot id of the object
+        related_ids(dict): Hubspot ids of associated objects
+
+    Returns:
+        str: The fingerprint
+    """
+    return hashlib.sha256(
+        json.dumps([hubspot_id, related_ids], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_sync_fingerprints(
+    content_type: ContentType, object_ids: Iterable, field: str = "fingerprint"
+) -> dict:
+    """
+    Get the fingerprints of the last syncs of some objects
+
+    Args:
+        content_type(ContentType): The content type of the objects
+        object_ids(iterable of int): The object ids
+        field(str): "fingerprint" for the properties, "association_fingerprint" for the associations
+
+    Returns:
+        dict: Fingerprints keyed by object id, for objects which have one
+    """
+    return dict(
+        HubspotSyncFingerprint.objects.filter(
+            hubspot_object__content_type=content_type,
+            hubspot_object__object_id__in=object_ids,
+        ).values_list("hubspot_object__object_id", field)
+    )
+
+
+def save_sync_fingerprints(
+    content_type: ContentType, fingerprints: dict, field: str = "fingerprint"
+):
+    """
+    Store the fingerprints of successful syncs. Objects without a HubspotObject are skipped.
+
+    Args:
+        content_type(ContentType): The content type of the objects
+        fingerprints(dict): Fingerprints keyed by object id
+        field(str): "fingerprint" for the properties, "association_fingerprint" for the associations
+    """
+    hubspot_object_ids = HubspotObject.objects.filter(
+        content_type=content_type, object_id__in=fingerprints.keys()
+    ).values_list("object_id", "id")
+    HubspotSyncFingerprint.objects.bulk_create(
+        [
+            HubspotSyncFingerprint(
+                hubspot_object_id=hubspot_object_id,
+                **{field: fingerprints[object_id]},
+            )
+            for object_id, hubspot_object_id in hubspot_object_ids
+        ],
+        update_conflicts=True,
+        unique_fields=["hubspot_object"],
+        update_fields=[field, "updated_on"],
+    )
+
+
+def is_sync_current(
+    content_type: ContentType,
+    object_id: int,
+    hubspot_id: str,
+    fingerprint: str,
+    field: str = "fingerprint",
+) -> bool:
+    """
+    Check whether the last sync of an object sent the same payload
+
+    Args:
+        content_type(ContentType): The content type of the object
+        object_id(int): The object id
+        hubspot_id(str): The hubspot id of the object, if it has been synced
+        fingerprint(str): The fingerprint of the payload about to be sent
+        field(str): "fingerprint" for the properties, "association_fingerprint" for the associations
+
+    Returns:
+        bool: True if the sync can be skipped
+    """
+    return bool(hubspot_id) and (
+        get_sync_fingerprints(content_type, [object_id], field=field).get(object_id)
+        == fingerprint
+    )
+
+
+def get_unsynced_objects(content_type: ContentType):
+    """
+    Get the objects of a model which don't have a hubspot id yet. Only active users with an email
+    address and a social auth are synced as contacts.
+
+    Args:
+        content_type(ContentType): The content type of the model
+
+    Returns:
+        QuerySet: The unsynced objects
+    """
+    unsynced_objects = content_type.model_class().objects.exclude(
+        id__in=HubspotObject.objects.filter(content_type=content_type).values(
+            "object_id"
+        )
+    )
+    if content_type.model == "user":
+        unsynced_objects = unsynced_objects.filter(
+            is_active=True, email__contains="@"
+        ).exclude(social_auth__isnull=True)
+    return unsynced_objects
+
+
 def get_hubspot_id_for_object(
     obj: BootcampApplication or BootcampApplicationLine or BootcampRun or User,
     raise_error: bool = False,
@@ -197,11 +393,9 @@ def get_hubspot_id_for_object(
     """
 
     content_type = ContentType.objects.get_for_model(obj)
-    hubspot_obj = HubspotObject.objects.filter(
-        object_id=obj.id, content_type=content_type
-    ).first()
-    if hubspot_obj:
-        return hubspot_obj.hubspot_id
+    hubspot_id = get_cached_hubspot_id(content_type.id, obj.id)
+    if hubspot_id:
+        return hubspot_id
     if isinstance(obj, User):
         hubspot_obj = find_contact(obj.email)
     elif isinstance(obj, BootcampApplication):
@@ -239,6 +433,122 @@ def get_hubspot_id_for_object(
         )
 
 
+def _upsert_if_changed(
+    content_type: ContentType,
+    hubspot_type: str,
+    object_id: int,
+    body: SimplePublicObjectInput,
+    hubspot_id: str = None,
+) -> SimplePublicObject:
+    """
+    Create or update an object in Hubspot, unless its last sync sent the same payload
+
+    Args:
+        content_type(ContentType): The content type of the object
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        object_id(int): The object id
+        body(SimplePublicObjectInput): The properties of the object
+        hubspot_id(str): The hubspot id of the object, looked up if not given
+
+    Returns:
+        SimplePublicObject: The hubspot object, only with the payload properties if the sync was skipped
+    """
+    if hubspot_id is None:
+        hubspot_id = get_cached_hubspot_id(content_type.id, object_id)
+    if is_sync_current(
+        content_type,
+        object_id,
+        hubspot_id,
+        make_sync_fingerprint(hubspot_id, body.properties),
+    ):
+        return SimplePublicObject(id=hubspot_id, properties=body.properties)
+    result = upsert_object_request(
+        content_type, hubspot_type, object_id=object_id, body=body
+    )
+    save_sync_fingerprints(
+        content_type, {object_id: make_sync_fingerprint(result.id, body.properties)}
+    )
+    return result
+
+
+def get_hubspot_ids_for_objects(objects: Iterable) -> dict:
+    """
+    Get the hubspot ids of many objects from the cache, with one query per content type for the ones
+    which aren't cached, querying Hubspot only for objects which haven't been synced before
+
+    Args:
+        objects(iterable of BootcampApplication or BootcampApplicationLine or BootcampRun or User): The objects
+
+    Returns:
+        dict: Hubspot ids keyed by object, None for objects without a match in Hubspot
+    """
+    objects = list(objects)
+    if not objects:
+        return {}
+    content_types = ContentType.objects.get_for_models(*{type(obj) for obj in objects})
+    known_ids = {
+        model: get_cached_hubspot_ids(
+            content_type.id, [obj.id for obj in objects if type(obj) is model]
+        )
+        for model, content_type in content_types.items()
+    }
+    return {
+        obj: known_ids[type(obj)].get(obj.id) or get_hubspot_id_for_object(obj)
+        for obj in objects
+    }
+
+
+def submit_user_form(email: str, hutk: str = None):
+    """
+    Create a hubspot contact for a new user with the Forms API, linked to the visitor's hubspotutk
+    cookie if there is one. Rate limit and server errors are raised so that the submission can be retried,
+    other error responses are only logged.
+
+    Args:
+        email(str): The user's email address
+        hutk(str): The value of the hubspotutk cookie when the user registered
+    """
+    portal_id = settings.HUBSPOT_CONFIG.get("HUBSPOT_PORTAL_ID")
+    form_id = settings.HUBSPOT_CONFIG.get("HUBSPOT_CREATE_USER_FORM_ID")
+    if not (portal_id and form_id):
+        return
+    data = {"email": email}
+    if hutk:
+        data["hs_context"] = json.dumps({"hutk": hutk})
+
+    start = time.monotonic()
+    try:
+        response = requests.post(
+            url=f"{HUBSPOT_FORMS_URL}/{portal_id}/{form_id}?&",
+            data=data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=HUBSPOT_FORM_SUBMISSION_TIMEOUT,
+        )
+    except requests.exceptions.RequestException as exc:
+        log.warning(
+            "Hubspot form %s submission failed after %.0fms: %s",
+            form_id,
+            (time.monotonic() - start) * 1000,
+            exc,
+        )
+        raise
+    log.info(
+        "Hubspot form %s submission returned %d in %.0fms",
+        form_id,
+        response.status_code,
+        (time.monotonic() - start) * 1000,
+    )
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    elif not response.ok:
+        log.error(
+            "Hubspot form %s rejected a submission with status %d: %s",
+            form_id,
+            response.status_code,
+            response.text,
+        )
+
+
 def sync_contact_with_hubspot(user_id: int) -> SimplePublicObject:
     """
     Sync a user with a hubspot contact
@@ -252,8 +562,8 @@ def sync_contact_with_hubspot(user_id: int) -> SimplePublicObject:
     body = make_contact_sync_message(user_id)
     content_type = ContentType.objects.get_for_model(User)
 
-    return upsert_object_request(
-        content_type, HubspotObjectType.CONTACTS.value, object_id=user_id, body=body
+    return _upsert_if_changed(
+        content_type, HubspotObjectType.CONTACTS.value, user_id, body
     )
 
 
@@ -271,10 +581,14 @@ def sync_product_with_hubspot(product_id: int) -> SimplePublicObject:
     content_type = ContentType.objects.get_for_model(BootcampRun)
 
     # Check if a matching hubspot object has been or can be synced
-    get_hubspot_id_for_object(BootcampRun.objects.get(id=product_id))
-
-    return upsert_object_request(
-        content_type, HubspotObjectType.PRODUCTS.value, object_id=product_id, body=body
+    hubspot_id = get_hubspot_id_for_object(BootcampRun.objects.get(id=product_id))
+
+    return _upsert_if_changed(
+        content_type,
+        HubspotObjectType.PRODUCTS.value,
+        product_id,
+        body,
+        hubspot_id=hubspot_id,
     )
 
 
@@ -293,22 +607,45 @@ def sync_line_item_with_hubspot(line_id: int) -> SimplePublicObject:
     content_type = ContentType.objects.get_for_model(BootcampApplicationLine)
 
     # Check if a matching hubspot object has been or can be synced
-    get_hubspot_id_for_object(line)
+    hubspot_id = get_hubspot_id_for_object(line)
+    deal_id = get_hubspot_id_for_object(line.application)
+    if is_sync_current(
+        content_type,
+        line_id,
+        hubspot_id,
+        make_sync_fingerprint(hubspot_id, body.properties),
+    ):
+        result = SimplePublicObject(id=hubspot_id, properties=body.properties)
+    else:
+        # Create or update the line items
+        result = upsert_object_request(
+            content_type, HubspotObjectType.LINES.value, object_id=line_id, body=body
+        )
+        save_sync_fingerprints(
+            content_type, {line_id: make_sync_fingerprint(result.id, body.properties)}
+        )
 
-    # Create or update the line items
-    result = upsert_object_request(
-        content_type, HubspotObjectType.LINES.value, object_id=line_id, body=body
-    )
     # Associate the parent deal with the line item
-    associate_objects_request(
-        HubspotObjectType.LINES.value,
+    association_fingerprint = make_association_fingerprint(result.id, deal=deal_id)
+    if not is_sync_current(
+        content_type,
+        line_id,
         result.id,
-        HubspotObjectType.DEALS.value,
-        get_hubspot_id_for_object(
-            BootcampApplicationLine.objects.get(id=line_id).application
-        ),
-        HubspotAssociationType.LINE_DEAL.value,
-    )
+        association_fingerprint,
+        field="association_fingerprint",
+    ):
+        associate_objects_request(
+            HubspotObjectType.LINES.value,
+            result.id,
+            HubspotObjectType.DEALS.value,
+            deal_id,
+            HubspotAssociationType.LINE_DEAL.value,
+        )
+        save_sync_fingerprints(
+            content_type,
+            {line_id: association_fingerprint},
+            field="association_fingerprint",
+        )
     return result
 
 
@@ -327,15 +664,38 @@ def sync_deal_with_hubspot(application_id: int) -> SimplePublicObject:
     content_type = ContentType.objects.get_for_model(BootcampApplication)
 
     # Check if a matching hubspot object has been or can be synced
-    get_hubspot_id_for_object(application)
+    hubspot_id = get_hubspot_id_for_object(application)
+    contact = get_hubspot_id_for_object(application.user)
+
+    if is_sync_current(
+        content_type,
+        application_id,
+        hubspot_id,
+        make_sync_fingerprint(hubspot_id, body.properties),
+    ):
+        result = SimplePublicObject(id=hubspot_id, properties=body.properties)
+    else:
+        # Create or update the order aka deal
+        result = upsert_object_request(
+            content_type,
+            HubspotObjectType.DEALS.value,
+            object_id=application_id,
+            body=body,
+        )
+        save_sync_fingerprints(
+            content_type,
+            {application_id: make_sync_fingerprint(result.id, body.properties)},
+        )
 
-    # Create or update the order aka deal
-    result = upsert_object_request(
-        content_type, HubspotObjectType.DEALS.value, object_id=application_id, body=body
-    )
     # Create association between deal and contact if any
-    contact = get_hubspot_id_for_object(application.user)
-    if contact:
+    association_fingerprint = make_association_fingerprint(result.id, contact=contact)
+    if contact and not is_sync_current(
+        content_type,
+        application_id,
+        result.id,
+        association_fingerprint,
+        field="association_fingerprint",
+    ):
         associate_objects_request(
             HubspotObjectType.DEALS.value,
             result.id,
@@ -343,170 +703,281 @@ def sync_deal_with_hubspot(application_id: int) -> SimplePublicObject:
             contact,
             HubspotAssociationType.DEAL_CONTACT.value,
         )
+        save_sync_fingerprints(
+            content_type,
+            {application_id: association_fingerprint},
+            field="association_fingerprint",
+        )
 
     sync_line_item_with_hubspot(application.line.id)
     return result
 
 
-def sync_contact_hubspot_ids_to_db():
+HubspotIdSyncResult = namedtuple(
+    "HubspotIdSyncResult", ["matched", "unmatched", "complete"]
+)
+
+
+def bulk_sync_hubspot_ids_to_db(
+    content_type: ContentType, hubspot_ids: Iterable
+) -> int:
+    """
+    Create or update HubspotObjects in bulk. Hubspot ids which already belong to another object of the
+    content type are skipped, since a hubspot id can only be stored once per content type.
+
+    Args:
+        content_type(ContentType): The content type of the objects
+        hubspot_ids(iterable of (int, str)): Object ids with their hubspot ids
+
+    Returns:
+        int: The number of skipped objects
+    """
+    skipped = 0
+    for chunk in chunks(hubspot_ids, chunk_size=HUBSPOT_ID_SYNC_CHUNK_SIZE):
+        # Only the last hubspot id for an object can be written in a single statement
+        chunk_ids = dict(chunk)
+        mapped_object_ids = dict(
+            HubspotObject.objects.filter(
+                content_type=content_type, hubspot_id__in=set(chunk_ids.values())
+            ).values_list("hubspot_id", "object_id")
+        )
+        object_ids_by_hubspot_id = {}
+        for object_id, hubspot_id in chunk_ids.items():
+            if (
+                mapped_object_ids.get(hubspot_id, object_id) != object_id
+                or hubspot_id in object_ids_by_hubspot_id
+            ):
+                log.warning(
+                    "Hubspot id %s for %s %d is already used by another object",
+                    hubspot_id,
+                    content_type.model,
+                    object_id,
+                )
+                skipped += 1
+            else:
+                object_ids_by_hubspot_id[hubspot_id] = object_id
+        if not object_ids_by_hubspot_id:
+            continue
+        HubspotObject.objects.bulk_create(
+            [
+                HubspotObject(
+                    content_type=content_type,
+                    object_id=object_id,
+                    hubspot_id=hubspot_id,
+                )
+                for hubspot_id, object_id in object_ids_by_hubspot_id.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["object_id", "content_type"],
+            update_fields=["hubspot_id"],
+        )
+        # bulk_create doesn't send the signals which remove the cached ids
+        invalidate_hubspot_ids(content_type.id, object_ids_by_hubspot_id.values())
+    return skipped
+
+
+def _sync_matches_to_db(content_type: ContentType, matches: Iterable) -> dict:
+    """
+    Create or update HubspotObjects for matched remote objects, and count matched and unmatched ones
+
+    Args:
+        content_type(ContentType): The content type of the objects
+        matches(iterable of (int, str) or None): Object id and hubspot id for each remote object, None if unmatched
+
+    Returns:
+        dict: Counts of matched and unmatched objects, skipped objects count as unmatched
+    """
+    counts = {"matched": 0, "unmatched": 0}
+    skipped = bulk_sync_hubspot_ids_to_db(content_type, _count_matches(matches, counts))
+    counts["matched"] -= skipped
+    counts["unmatched"] += skipped
+    return counts
+
+
+def _count_matches(matches: Iterable, counts: dict) -> Iterable:
+    """
+    Count matched and unmatched remote objects while passing on the matched ones
+
+    Args:
+        matches(iterable of (int, str) or None): Object id and hubspot id for each remote object, None if unmatched
+        counts(dict): Counts of matched and unmatched objects to update
+
+    Yields:
+        (int, str): Object id and hubspot id of each matched object
+    """
+    for match in matches:
+        if match is None:
+            counts["unmatched"] += 1
+        else:
+            counts["matched"] += 1
+            yield match
+
+
+def sync_contact_hubspot_ids_to_db() -> HubspotIdSyncResult:
     """
     Create HubspotObjects for all contacts in Hubspot
 
     Returns:
-        bool: True if hubspot id matches found for all Users
+        HubspotIdSyncResult: Matched and unmatched contact counts, and whether all Users have hubspot ids
     """
-    contacts = get_all_objects(
-        HubspotObjectType.CONTACTS.value, properties=["email", "hs_additional_emails"]
-    )
     content_type = ContentType.objects.get_for_model(User)
     active_users = User.objects.filter(is_active=True)
-    for contact in contacts:
-        user = active_users.filter(email=contact.properties["email"]).first()
-        if not user and contact.properties["hs_additional_emails"]:
-            user = active_users.filter(
-                email__in=contact.properties["hs_additional_emails"].split(";")
-            ).first()
-        if user:
-            HubspotObject.objects.update_or_create(
-                content_type=content_type,
-                object_id=user.id,
-                defaults={"hubspot_id": contact.id},
-            )
-    return (
-        active_users.count()
-        == HubspotObject.objects.filter(content_type=content_type).count()
+    user_ids_by_email = {}
+    for user_id, email in active_users.order_by("id").values_list("id", "email"):
+        user_ids_by_email.setdefault(email, user_id)
+
+    def match_contacts():
+        """Yield the matching user id and hubspot id for each contact"""
+        for contact in get_all_objects(
+            HubspotObjectType.CONTACTS.value,
+            properties=["email", "hs_additional_emails"],
+        ):
+            user_id = user_ids_by_email.get(contact.properties["email"])
+            if user_id is None and contact.properties.get("hs_additional_emails"):
+                user_id = min(
+                    (
+                        user_ids_by_email[email]
+                        for email in contact.properties["hs_additional_emails"].split(
+                            ";"
+                        )
+                        if email in user_ids_by_email
+                    ),
+                    default=None,
+                )
+            yield (user_id, contact.id) if user_id is not None else None
+
+    counts = _sync_matches_to_db(content_type, match_contacts())
+    return HubspotIdSyncResult(
+        **counts,
+        complete=active_users.count()
+        == HubspotObject.objects.filter(content_type=content_type).count(),
     )
 
 
-def sync_product_hubspot_ids_to_db() -> bool:
+def sync_product_hubspot_ids_to_db() -> HubspotIdSyncResult:
     """
-    Create HubspotObjects for BootcampRuns, return True if all BootcampRuns have hubspot ids
+    Create HubspotObjects for BootcampRuns
 
     Returns:
-        bool: True if hubspot id matches found for all BootcampRuns
+        HubspotIdSyncResult: Matched and unmatched product counts, and whether all BootcampRuns have hubspot ids
     """
     content_type = ContentType.objects.get_for_model(BootcampRun)
     product_mapping = {}
-    for bootcamp_run in BootcampRun.objects.all():
-        product_mapping.setdefault(bootcamp_run.title, []).append(bootcamp_run.id)
-    products = get_all_objects(
-        HubspotObjectType.PRODUCTS.value, properties=["name", "bootcamp_run_id"]
-    )
-    for product in products:
-        matching_runs = product_mapping.get(product.properties["name"])
-        if not matching_runs:
-            continue
-        if len(matching_runs) > 1:
-            # Narrow down by price
-            for obj_id in matching_runs:
-                if (
-                    BootcampRun.objects.get(id=obj_id).bootcamp_run_id
-                    == product.properties["bootcamp_run_id"]
-                ):
-                    matching_run = obj_id
-        else:
-            matching_run = matching_runs[0]
-        HubspotObject.objects.update_or_create(
-            content_type=content_type,
-            object_id=matching_run,
-            defaults={"hubspot_id": product.id},
-        )
-    return (
-        BootcampRun.objects.count()
-        == HubspotObject.objects.filter(content_type=content_type).count()
+    for run_id, title, bootcamp_run_id in BootcampRun.objects.values_list(
+        "id", "title", "bootcamp_run_id"
+    ):
+        product_mapping.setdefault(title, []).append((run_id, bootcamp_run_id))
+
+    def match_products():
+        """Yield the matching run id and hubspot id for each product"""
+        for product in get_all_objects(
+            HubspotObjectType.PRODUCTS.value, properties=["name", "bootcamp_run_id"]
+        ):
+            matching_runs = product_mapping.get(product.properties["name"], [])
+            if len(matching_runs) > 1:
+                # Narrow down by run id
+                matching_runs = [
+                    (run_id, bootcamp_run_id)
+                    for run_id, bootcamp_run_id in matching_runs
+                    if bootcamp_run_id == product.properties.get("bootcamp_run_id")
+                ]
+            yield (matching_runs[0][0], product.id) if matching_runs else None
+
+    counts = _sync_matches_to_db(content_type, match_products())
+    return HubspotIdSyncResult(
+        **counts,
+        complete=BootcampRun.objects.count()
+        == HubspotObject.objects.filter(content_type=content_type).count(),
     )
 
 
-def sync_deal_line_hubspot_ids_to_db(application, hubspot_application_id) -> bool:
+def get_deal_line_hubspot_id(
+    hubspot_application_id: str, bootcamp_run_id: int, run_ids_by_hubspot_id: dict
+) -> str or None:
     """
-    Create HubspotObjects for all of a deal's line items, return True if matches found for all lines
+    Find the hubspot id of a deal's line item
 
     Args:
-        application(Order or B2BOrder): The order to sync Hubspot line items for
         hubspot_application_id(str): The Hubspot deal id
+        bootcamp_run_id(int): The id of the application's BootcampRun
+        run_ids_by_hubspot_id(dict): BootcampRun ids keyed by their Hubspot product ids
 
     Returns:
-        bool: True if matches found for all the order lines
-
+        str: The hubspot id of the line item, or None if there is no match
     """
-    client = HubspotApi()
     line_items = get_line_items_for_deal(hubspot_application_id)
-    application_line = application.line
-
-    matches = 0
     if len(line_items) == 1:
-        HubspotObject.objects.update_or_create(
-            content_type=ContentType.objects.get_for_model(application_line),
-            object_id=application_line.id,
-            defaults={"hubspot_id": line_items[0].id},
-        )
-        matches += 1
-    else:  # Multiple lines, need to match by product (BootcampRun)
-        for line in line_items:
-            details = client.crm.line_items.basic_api.get_by_id(line.id)
-            hs_product = HubspotObject.objects.filter(
-                hubspot_id=details.properties["hs_product_id"],
-                content_type=ContentType.objects.get_for_model(BootcampRun),
-            ).first()
-            if hs_product:
-                product_id = hs_product.object_id
-                matching_line = BootcampApplicationLine.objects.filter(
-                    application=application,
-                    application__bootcamp_run__id=product_id,
-                ).first()
-                if matching_line:
-                    HubspotObject.objects.update_or_create(
-                        content_type=ContentType.objects.get_for_model(
-                            BootcampApplicationLine
-                        ),
-                        object_id=matching_line.id,
-                        defaults={"hubspot_id": line.id},
-                    )
-                    matches += 1
-    return matches == 1
-
-
-def sync_deal_hubspot_ids_to_db() -> bool:
-    """
-    Create Hubspot objects for bootcamp applications, return True if all applications
-    (and optionally lines) have hubspot ids
+        return line_items[0].id
+    # Multiple lines, need to match by product (BootcampRun)
+    client = HubspotApi()
+    for line in line_items:
+        details = client.crm.line_items.basic_api.get_by_id(line.id)
+        if (
+            run_ids_by_hubspot_id.get(details.properties["hs_product_id"])
+            == bootcamp_run_id
+        ):
+            return line.id
+    return None
+
+
+def sync_deal_hubspot_ids_to_db() -> HubspotIdSyncResult:
+    """
+    Create Hubspot objects for bootcamp applications and their lines
 
     Returns:
-        bool: True if matches found for all Orders and B2BOrders (and optionally their lines)
+        HubspotIdSyncResult: Matched and unmatched deal counts, and whether all applications
+            and lines have hubspot ids
     """
     content_type = ContentType.objects.get_for_model(BootcampApplication)
-    deals = get_all_objects(
-        HubspotObjectType.DEALS.value, properties=["dealname", "amount"]
+    line_content_type = ContentType.objects.get_for_model(BootcampApplicationLine)
+    run_ids_by_application_id = dict(
+        BootcampApplication.objects.values_list("id", "bootcamp_run_id")
+    )
+    line_ids_by_application_id = dict(
+        BootcampApplicationLine.objects.values_list("application_id", "id")
+    )
+    run_ids_by_hubspot_id = dict(
+        HubspotObject.objects.filter(
+            content_type=ContentType.objects.get_for_model(BootcampRun)
+        ).values_list("hubspot_id", "object_id")
     )
+    line_hubspot_ids = []
     lines_synced = True
-    for deal in deals:
-        deal_name = deal.properties["dealname"]
-        deal_price = Decimal(deal.properties["amount"] or "0.00")
-        try:
-            object_id = int(deal_name.split("-")[-1])
-        except ValueError:
-            # this isn't a deal that can be synced, ie "AMx Run 3 - SPIN MASTER"
-            continue
-        applications = list(BootcampApplication.objects.filter(id=object_id))
-        if len(applications) > 1:
-            applications = [
-                application
-                for application in applications
-                if application.price == deal_price
-            ]
-        if applications:
-            application = applications[0]
-            HubspotObject.objects.update_or_create(
-                content_type=content_type,
-                object_id=application.id,
-                defaults={"hubspot_id": deal.id},
+
+    def match_deals():
+        """Yield the matching application id and hubspot id for each deal, and find its line"""
+        nonlocal lines_synced
+        for deal in get_all_objects(
+            HubspotObjectType.DEALS.value, properties=["dealname", "amount"]
+        ):
+            try:
+                application_id = int(deal.properties["dealname"].split("-")[-1])
+            except ValueError:
+                # this isn't a deal that can be synced, ie "AMx Run 3 - SPIN MASTER"
+                continue
+            if application_id not in run_ids_by_application_id:
+                yield None
+                continue
+            yield application_id, deal.id
+            line_hubspot_id = get_deal_line_hubspot_id(
+                deal.id,
+                run_ids_by_application_id[application_id],
+                run_ids_by_hubspot_id,
             )
-            if not sync_deal_line_hubspot_ids_to_db(application, deal.id):
+            line_id = line_ids_by_application_id.get(application_id)
+            if line_hubspot_id and line_id:
+                line_hubspot_ids.append((line_id, line_hubspot_id))
+            else:
                 lines_synced = False
-    return (
-        BootcampApplication.objects.count()
+
+    counts = _sync_matches_to_db(content_type, match_deals())
+    if bulk_sync_hubspot_ids_to_db(line_content_type, line_hubspot_ids):
+        lines_synced = False
+    return HubspotIdSyncResult(
+        **counts,
+        complete=len(run_ids_by_application_id)
         == HubspotObject.objects.filter(content_type=content_type).count()
-        and lines_synced
+        and lines_synced,
     )
 
 
@@ -516,3 +987,7 @@ MODEL_FUNCTION_MAPPING = {
     "bootcampapplicationline": make_line_sync_message,
     "bootcamprun": make_product_sync_message,
 }
+
+BULK_MODEL_FUNCTION_MAPPING = {
+    "bootcampapplication": make_deal_sync_messages,
+}
@@ -5,6 +5,8 @@ Hubspot API tests
 from unittest.mock import ANY
 
 import pytest
+import requests
+from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from mitol.hubspot_api.api import HubspotAssociationType
 from mitol.hubspot_api.factories import HubspotObjectFactory, SimplePublicObjectFactory
@@ -14,7 +16,11 @@ from applications.factories import BootcampApplicationFactory
 from applications.models import BootcampApplication, BootcampApplicationLine
 from hubspot_sync import api
 from hubspot_sync.conftest import FAKE_HUBSPOT_ID
-from hubspot_sync.constants import HUBSPOT_DEAL_PREFIX
+from hubspot_sync.constants import (
+    HUBSPOT_DEAL_PREFIX,
+    HUBSPOT_FORM_SUBMISSION_TIMEOUT,
+)
+from hubspot_sync.id_cache import clear_local_hubspot_id_cache
 from hubspot_sync.serializers import (
     HubspotDealSerializer,
     HubspotLineSerializer,
@@ -73,6 +79,43 @@ def test_make_deal_sync_message(hubspot_application):
 
 
 @pytest.mark.django_db
+def test_make_deal_sync_messages(django_assert_num_queries):
+    """make_deal_sync_messages should serialize many deals with a constant number of queries"""
+    applications = BootcampApplicationFactory.create_batch(4)
+    for application in applications:
+        InstallmentFactory.create(bootcamp_run=application.bootcamp_run)
+    application_ids = [application.id for application in applications]
+
+    with django_assert_num_queries(6):
+        messages = api.make_deal_sync_messages(application_ids)
+    assert messages == {
+        application_id: api.make_deal_sync_message(application_id)
+        for application_id in application_ids
+    }
+
+
+@pytest.mark.parametrize("ct_model_name", ["bootcampapplication", "bootcamprun"])
+def test_make_sync_messages(mocker, ct_model_name):
+    """make_sync_messages should use the bulk function for the model if there is one"""
+    bulk_mock = mocker.Mock(return_value={2: "message 2", 1: "message 1"})
+    single_mock = mocker.Mock(side_effect=lambda object_id: f"message {object_id}")
+    mocker.patch.dict(
+        api.BULK_MODEL_FUNCTION_MAPPING, {"bootcampapplication": bulk_mock}
+    )
+    mocker.patch.dict(api.MODEL_FUNCTION_MAPPING, {ct_model_name: single_mock})
+
+    assert api.make_sync_messages(ct_model_name, [1, 2]) == [
+        "message 1",
+        "message 2",
+    ]
+    if ct_model_name == "bootcampapplication":
+        bulk_mock.assert_called_once_with([1, 2])
+        single_mock.assert_not_called()
+    else:
+        bulk_mock.assert_not_called()
+        assert single_mock.call_count == 2
+
+
 def test_make_line_sync_message(hubspot_application):
     """Test make_line_sync_message serializes a line and returns a properly formatted sync message"""
     serialized_line = HubspotLineSerializer(hubspot_application.line).data
@@ -162,6 +205,127 @@ def test_sync_deal_with_hubspot(mocker, mock_hubspot_api, hubspot_application):
     )
 
 
+def test_sync_contact_with_hubspot_unchanged(mock_hubspot_api):
+    """A contact sync should be skipped if the properties haven't changed since the last sync"""
+    user = UserFactory.create()
+    basic_api = mock_hubspot_api.return_value.crm.objects.basic_api
+    basic_api.update.return_value = api.SimplePublicObject(id=FAKE_HUBSPOT_ID)
+
+    api.sync_contact_with_hubspot(user.id)
+    assert api.sync_contact_with_hubspot(user.id).id == FAKE_HUBSPOT_ID
+    basic_api.create.assert_called_once()
+    basic_api.update.assert_not_called()
+
+    user.profile.name = "A New Name"
+    user.profile.save()
+    api.sync_contact_with_hubspot(user.id)
+    basic_api.update.assert_called_once()
+    api.sync_contact_with_hubspot(user.id)
+    basic_api.update.assert_called_once()
+
+
+def test_sync_deal_with_hubspot_unchanged(
+    mocker, mock_hubspot_api, hubspot_application, hubspot_application_id
+):
+    """A deal sync should skip the upsert and contact association if they haven't changed since the last sync"""
+    mock_sync_line = mocker.patch(
+        "hubspot_sync.api.sync_line_item_with_hubspot", autospec=True
+    )
+    mock_associate_contact = mocker.patch("hubspot_sync.api.associate_objects_request")
+    basic_api = mock_hubspot_api.return_value.crm.objects.basic_api
+    basic_api.update.return_value = api.SimplePublicObject(id=hubspot_application_id)
+
+    for _ in range(2):
+        assert (
+            api.sync_deal_with_hubspot(hubspot_application.id).id
+            == hubspot_application_id
+        )
+    basic_api.update.assert_called_once()
+    mock_associate_contact.assert_called_once()
+    assert mock_sync_line.call_count == 2
+
+    contact = HubspotObject.objects.get(
+        content_type=ContentType.objects.get_for_model(User),
+        object_id=hubspot_application.user.id,
+    )
+    contact.hubspot_id = "new_contact_id"
+    contact.save()
+    api.sync_deal_with_hubspot(hubspot_application.id)
+    basic_api.update.assert_called_once()
+    assert mock_associate_contact.call_count == 2
+
+
+def test_sync_deal_with_hubspot_tokens(
+    mocker, mock_hubspot_api, hubspot_application, hubspot_application_id
+):
+    """A deal sync should take a rate limit token for each Hubspot API call"""
+    mock_acquire = mocker.patch("hubspot_sync.rate_limit.acquire_hubspot_token")
+    line = hubspot_application.line
+    HubspotObjectFactory.create(
+        content_object=line,
+        content_type=ContentType.objects.get_for_model(line),
+        object_id=line.id,
+    )
+    api.sync_deal_with_hubspot(hubspot_application.id)
+    crm_api = mock_hubspot_api.return_value.crm.objects
+    assert crm_api.basic_api.update.call_count == 2
+    assert crm_api.associations_api.create.call_count == 2
+    assert mock_acquire.call_count == 4
+
+
+def test_get_hubspot_ids_for_objects(mocker, django_assert_num_queries):
+    """get_hubspot_ids_for_objects should load known hubspot ids with one query per content type, cache them and look up the others"""
+    mock_get_hubspot_id = mocker.patch(
+        "hubspot_sync.api.get_hubspot_id_for_object", return_value="remote"
+    )
+    users = UserFactory.create_batch(2)
+    run = BootcampRunFactory.create()
+    hubspot_objects = [
+        HubspotObjectFactory.create(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.id,
+            content_object=obj,
+        )
+        for obj in [users[0], run]
+    ]
+    ContentType.objects.get_for_models(User, BootcampRun)
+
+    expected = {
+        users[0]: hubspot_objects[0].hubspot_id,
+        users[1]: "remote",
+        run: hubspot_objects[1].hubspot_id,
+    }
+    with django_assert_num_queries(2):
+        assert api.get_hubspot_ids_for_objects([*users, run]) == expected
+    mock_get_hubspot_id.assert_called_once_with(users[1])
+    for clear_local in [False, True]:
+        if clear_local:
+            clear_local_hubspot_id_cache()
+        with django_assert_num_queries(0):
+            assert api.get_hubspot_ids_for_objects([users[0], run]) == {
+                users[0]: hubspot_objects[0].hubspot_id,
+                run: hubspot_objects[1].hubspot_id,
+            }
+    assert api.get_hubspot_ids_for_objects([]) == {}
+
+
+def test_make_sync_fingerprint():
+    """The fingerprint should change with the properties and the hubspot id"""
+    fingerprint = api.make_sync_fingerprint("1", {"a": "b", "c": 1})
+    assert fingerprint == api.make_sync_fingerprint("1", {"c": 1, "a": "b"})
+    assert fingerprint != api.make_sync_fingerprint("1", {"a": "b", "c": 2})
+    assert fingerprint != api.make_sync_fingerprint("3", {"a": "b", "c": 1})
+
+
+def test_make_association_fingerprint():
+    """The association fingerprint should change with the hubspot id and associated ids"""
+    fingerprint = api.make_association_fingerprint("1", deal="2")
+    assert fingerprint == api.make_association_fingerprint("1", deal="2")
+    assert fingerprint != api.make_association_fingerprint("3", deal="2")
+    assert fingerprint != api.make_association_fingerprint("1", deal="3")
+    assert fingerprint != api.make_association_fingerprint("1", contact="2")
+
+
 def test_sync_line_item_with_hubspot(
     mock_hubspot_api, hubspot_application, hubspot_application_id
 ):
@@ -195,7 +359,7 @@ def test_sync_contact_hubspot_ids_to_hubspot(mocker, mock_hubspot_api, match_all
     mock_hubspot_api.return_value.crm.objects.basic_api.get_page.side_effect = [
         mocker.Mock(results=contacts, paging=None)
     ]
-    assert api.sync_contact_hubspot_ids_to_db() is match_all
+    assert api.sync_contact_hubspot_ids_to_db() == (matches, 0, match_all)
     assert HubspotObject.objects.filter(content_type__model="user").count() == matches
 
 
@@ -217,10 +381,55 @@ def test_sync_contact_hubspot_ids_alternate(mocker, mock_hubspot_api, multiple_e
     mock_hubspot_api.return_value.crm.objects.basic_api.get_page.side_effect = [
         mocker.Mock(results=contacts, paging=None)
     ]
-    assert api.sync_contact_hubspot_ids_to_db() is True
+    assert api.sync_contact_hubspot_ids_to_db() == (1, 0, True)
     assert HubspotObject.objects.filter(content_type__model="user").count() == 1
 
 
+def test_sync_contact_hubspot_ids_bulk(
+    mocker, mock_hubspot_api, django_assert_max_num_queries
+):
+    """sync_contact_hubspot_ids_to_db should count unmatched contacts and update existing hubspot ids in bulk"""
+    users = UserFactory.create_batch(4)
+    HubspotObjectFactory.create(
+        content_object=users[0], object_id=users[0].id, hubspot_id="old"
+    )
+    contacts = [
+        SimplePublicObjectFactory(properties={"email": user.email}) for user in users
+    ] + [SimplePublicObjectFactory(properties={"email": "unknown@fake.edu"})]
+    mock_hubspot_api.return_value.crm.objects.basic_api.get_page.side_effect = [
+        mocker.Mock(results=contacts[0:3], paging=mocker.Mock()),
+        mocker.Mock(results=contacts[3:], paging=None),
+    ]
+    with django_assert_max_num_queries(6):
+        assert api.sync_contact_hubspot_ids_to_db() == (4, 1, True)
+    assert HubspotObject.objects.get(object_id=users[0].id).hubspot_id == contacts[0].id
+
+
+def test_sync_contact_hubspot_ids_already_mapped(mocker, mock_hubspot_api):
+    """sync_contact_hubspot_ids_to_db should skip hubspot ids which belong to another user and count them as unmatched"""
+    users = UserFactory.create_batch(4)
+    HubspotObjectFactory.create(
+        content_object=users[0], object_id=users[0].id, hubspot_id="taken"
+    )
+    contacts = [
+        SimplePublicObjectFactory(id="taken", properties={"email": users[1].email}),
+        SimplePublicObjectFactory(properties={"email": users[2].email}),
+    ]
+    contacts.append(
+        SimplePublicObjectFactory(
+            id=contacts[1].id, properties={"email": users[3].email}
+        )
+    )
+    mock_hubspot_api.return_value.crm.objects.basic_api.get_page.return_value = (
+        mocker.Mock(results=contacts, paging=None)
+    )
+    assert api.sync_contact_hubspot_ids_to_db() == (1, 2, False)
+    assert dict(HubspotObject.objects.values_list("object_id", "hubspot_id")) == {
+        users[0].id: "taken",
+        users[2].id: contacts[1].id,
+    }
+
+
 @pytest.mark.parametrize("match_all", [True, False])
 def test_sync_product_hubspot_ids_to_hubspot(mocker, mock_hubspot_api, match_all):
     """sync_product_hubspot_ids_to_db should create HubspotObjects and return True if all products matched"""
@@ -233,7 +442,7 @@ def test_sync_product_hubspot_ids_to_hubspot(mocker, mock_hubspot_api, match_all
     mock_hubspot_api.return_value.crm.objects.basic_api.get_page.side_effect = [
         mocker.Mock(results=hs_products, paging=None)
     ]
-    assert api.sync_product_hubspot_ids_to_db() is match_all
+    assert api.sync_product_hubspot_ids_to_db() == (matches, 0, match_all)
     assert (
         HubspotObject.objects.filter(
             content_type=ContentType.objects.get_for_model(BootcampRun)
@@ -264,7 +473,7 @@ def test_sync_product_hubspot_ids_dupe_names(mocker, mock_hubspot_api):
     mock_hubspot_api.return_value.crm.objects.basic_api.get_page.side_effect = [
         mocker.Mock(results=hs_products, paging=None)
     ]
-    assert api.sync_product_hubspot_ids_to_db() is True
+    assert api.sync_product_hubspot_ids_to_db() == (2, 0, True)
     assert (
         HubspotObject.objects.filter(
             content_type=ContentType.objects.get_for_model(BootcampRun)
@@ -327,7 +536,11 @@ def test_sync_deal_hubspot_ids_to_hubspot(
         SimplePublicObjectFactory(properties={"hs_product_id": hsp.hubspot_id})
         for hsp in hs_products[0:line_matches]
     ]  # line_item details
-    assert api.sync_deal_hubspot_ids_to_db() is (match_all_lines and match_all_deals)
+    assert api.sync_deal_hubspot_ids_to_db() == (
+        deal_matches,
+        0,
+        match_all_lines and match_all_deals,
+    )
     assert (
         HubspotObject.objects.filter(
             content_type=ContentType.objects.get_for_model(BootcampApplication)
@@ -337,3 +550,48 @@ def test_sync_deal_hubspot_ids_to_hubspot(
     assert HubspotObject.objects.filter(
         content_type=ContentType.objects.get_for_model(BootcampApplicationLine)
     ).count() == min(deal_matches, line_matches)
+
+
+@pytest.mark.parametrize("hutk", [None, "somefakedata"])
+def test_submit_user_form(mocker, settings, hutk):
+    """submit_user_form should post the email and hubspotutk cookie to the form with a timeout"""
+    mock_post = mocker.patch("hubspot_sync.api.requests.post")
+    mock_post.return_value.status_code = 204
+    settings.HUBSPOT_CONFIG = {}
+    api.submit_user_form("test@test.co", hutk=hutk)
+    mock_post.assert_not_called()
+
+    settings.HUBSPOT_CONFIG = {
+        "HUBSPOT_PORTAL_ID": "123456",
+        "HUBSPOT_CREATE_USER_FORM_ID": "abcdefg",
+    }
+    api.submit_user_form("test@test.co", hutk=hutk)
+    expected_data = {"email": "test@test.co"}
+    if hutk:
+        expected_data["hs_context"] = '{"hutk": "somefakedata"}'
+    mock_post.assert_called_once_with(
+        url="https://forms.hubspot.com/uploads/form/v2/123456/abcdefg?&",
+        data=expected_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        timeout=HUBSPOT_FORM_SUBMISSION_TIMEOUT,
+    )
+
+
+@pytest.mark.parametrize("status, raises", [[400, False], [429, True], [503, True]])
+def test_submit_user_form_error(mocker, settings, status, raises):
+    """submit_user_form should raise errors which are worth retrying and log the others"""
+    settings.HUBSPOT_CONFIG = {
+        "HUBSPOT_PORTAL_ID": "123456",
+        "HUBSPOT_CREATE_USER_FORM_ID": "abcdefg",
+    }
+    response = requests.Response()
+    response.status_code = status
+    mocker.patch("hubspot_sync.api.requests.post", return_value=response)
+    mock_log = mocker.patch("hubspot_sync.api.log.error")
+    if raises:
+        with pytest.raises(requests.exceptions.HTTPError):
+            api.submit_user_form("test@test.co")
+        mock_log.assert_not_called()
+    else:
+        api.submit_user_form("test@test.co")
+        mock_log.assert_called_once()
@@ -0,0 +1,15 @@
+"""
+Django App
+"""
+
+from django.apps import AppConfig
+
+
+class HubspotSyncConfig(AppConfig):
+    """AppConfig for hubspot_sync"""
+
+    name = "hubspot_sync"
+
+    def ready(self):
+        """Application is ready"""
+        import hubspot_sync.signals  # noqa: F401
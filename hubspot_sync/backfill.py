@@ -0,0 +1,212 @@
+"""
+A resumable backfill of Hubspot objects. Each object type is walked by primary key, and the cursor is
+checkpointed in redis after every batch so that a crashed backfill continues where it stopped.
+"""
+
+import time
+from collections import namedtuple
+from datetime import timedelta
+from typing import Callable
+
+from django.contrib.contenttypes.models import ContentType
+from django_redis import get_redis_connection
+from mitol.hubspot_api.models import HubspotObject
+
+from applications.models import BootcampApplication
+from hubspot_sync.api import get_unsynced_objects
+from hubspot_sync.tasks import (
+    batch_create_hubspot_objects_chunked,
+    batch_update_hubspot_objects_chunked,
+    batch_upsert_associations_chunked,
+)
+
+BACKFILL_KEY = "hubspot_sync:backfill:{mode}:{hubspot_type}"
+ASSOCIATIONS = "associations"
+
+BackfillProgress = namedtuple(
+    "BackfillProgress", ["hubspot_type", "synced", "total", "rate", "eta"]
+)
+
+
+def _backfill_key(hubspot_type: str, create: bool) -> str:
+    """
+    Get the redis key of the checkpoint for a backfill
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        create(bool): Whether the backfill creates or updates objects
+
+    Returns:
+        str: The redis key
+    """
+    return BACKFILL_KEY.format(
+        mode="create" if create else "update", hubspot_type=hubspot_type
+    )
+
+
+def get_backfill_checkpoint(hubspot_type: str, create: bool) -> (int, int):
+    """
+    Get the last committed cursor of a backfill
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        create(bool): Whether the backfill creates or updates objects
+
+    Returns:
+        (int, int): The last synced primary key and the number of objects synced so far
+    """
+    checkpoint = get_redis_connection("default").hgetall(
+        _backfill_key(hubspot_type, create)
+    )
+    return int(checkpoint.get(b"cursor", 0)), int(checkpoint.get(b"synced", 0))
+
+
+def save_backfill_checkpoint(hubspot_type: str, create: bool, cursor: int, synced: int):
+    """
+    Commit the cursor of a backfill after a batch was synced
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        create(bool): Whether the backfill creates or updates objects
+        cursor(int): The last synced primary key
+        synced(int): The number of objects synced so far
+    """
+    get_redis_connection("default").hset(
+        _backfill_key(hubspot_type, create),
+        mapping={"cursor": cursor, "synced": synced},
+    )
+
+
+def reset_backfill_checkpoint(hubspot_type: str, create: bool):
+    """
+    Forget the checkpoint of a backfill, so that it starts from the first object
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        create(bool): Whether the backfill creates or updates objects
+    """
+    get_redis_connection("default").delete(_backfill_key(hubspot_type, create))
+
+
+def _run_backfill(  # pylint:disable=too-many-arguments
+    hubspot_type: str,
+    create: bool,
+    rows,
+    cursor_field: str,
+    sync_batch: Callable,
+    batch_size: int,
+    progress: Callable = None,
+) -> BackfillProgress:
+    """
+    Sync rows in batches ordered by a cursor field, committing the cursor after each batch
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        create(bool): Whether the backfill creates or updates objects
+        rows(QuerySet): A values_list queryset whose first value is the cursor field
+        cursor_field(str): The field the rows are ordered by
+        sync_batch(Callable): Syncs a list of rows
+        batch_size(int): The number of rows to sync at a time
+        progress(Callable): Called with a BackfillProgress after each batch
+
+    Returns:
+        BackfillProgress: The progress once all rows were synced
+    """
+    cursor, synced = get_backfill_checkpoint(hubspot_type, create)
+    rows = rows.order_by(cursor_field)
+    total = synced + rows.filter(**{f"{cursor_field}__gt": cursor}).count()
+    synced_at_start = synced
+    start = time.monotonic()
+    status = BackfillProgress(hubspot_type, synced, total, 0.0, timedelta(0))
+    while True:
+        batch = list(rows.filter(**{f"{cursor_field}__gt": cursor})[:batch_size])
+        if not batch:
+            break
+        sync_batch(batch)
+        cursor = batch[-1][0]
+        synced += len(batch)
+        save_backfill_checkpoint(hubspot_type, create, cursor, synced)
+
+        rate = (synced - synced_at_start) / max(time.monotonic() - start, 1e-6)
+        status = BackfillProgress(
+            hubspot_type,
+            synced,
+            total,
+            rate,
+            timedelta(seconds=round(max(total - synced, 0) / rate)),
+        )
+        if progress:
+            progress(status)
+    reset_backfill_checkpoint(hubspot_type, create)
+    return status
+
+
+def backfill_hubspot_objects(  # pylint:disable=too-many-arguments
+    hubspot_type: str,
+    content_type: ContentType,
+    create: bool,
+    batch_size: int,
+    progress: Callable = None,
+) -> BackfillProgress:
+    """
+    Create hubspot objects for all unsynced objects of a model, or update all synced ones,
+    resuming from the checkpoint of an earlier backfill if there is one
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        content_type(ContentType): The content type of the model
+        create(bool): Create if true, update if false
+        batch_size(int): The number of objects to sync at a time
+        progress(Callable): Called with a BackfillProgress after each batch
+
+    Returns:
+        BackfillProgress: The progress once all objects were synced
+    """
+    if create:
+        rows = get_unsynced_objects(content_type).values_list("id")
+        cursor_field = "id"
+
+        def sync_batch(batch):
+            batch_create_hubspot_objects_chunked(
+                hubspot_type, content_type.model, [row[0] for row in batch]
+            )
+
+    else:
+        rows = HubspotObject.objects.filter(content_type=content_type).values_list(
+            "object_id", "hubspot_id"
+        )
+        cursor_field = "object_id"
+
+        def sync_batch(batch):
+            batch_update_hubspot_objects_chunked(
+                hubspot_type, content_type.model, batch
+            )
+
+    return _run_backfill(
+        hubspot_type, create, rows, cursor_field, sync_batch, batch_size, progress
+    )
+
+
+def backfill_hubspot_associations(
+    batch_size: int, progress: Callable = None
+) -> BackfillProgress:
+    """
+    Upsert the deal-contact and line-deal associations of all applications, resuming from the
+    checkpoint of an earlier backfill if there is one
+
+    Args:
+        batch_size(int): The number of applications to sync at a time
+        progress(Callable): Called with a BackfillProgress after each batch
+
+    Returns:
+        BackfillProgress: The progress once all associations were synced
+    """
+    return _run_backfill(
+        ASSOCIATIONS,
+        True,
+        BootcampApplication.objects.values_list("id"),
+        "id",
+        lambda batch: batch_upsert_associations_chunked([row[0] for row in batch]),
+        batch_size,
+        progress,
+    )
@@ -0,0 +1,151 @@
+"""
+Tests for the resumable Hubspot backfill
+"""
+
+# pylint: disable=redefined-outer-name
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from mitol.hubspot_api.api import HubspotObjectType
+from mitol.hubspot_api.factories import HubspotObjectFactory
+
+from applications.factories import BootcampApplicationFactory
+from hubspot_sync.backfill import (
+    ASSOCIATIONS,
+    backfill_hubspot_associations,
+    backfill_hubspot_objects,
+    get_backfill_checkpoint,
+    reset_backfill_checkpoint,
+    save_backfill_checkpoint,
+)
+from klasses.factories import BootcampRunFactory
+from klasses.models import BootcampRun
+from profiles.factories import UserFactory, UserSocialAuthFactory
+
+pytestmark = pytest.mark.django_db
+
+PRODUCTS = HubspotObjectType.PRODUCTS.value
+
+
+@pytest.fixture(autouse=True)
+def clear_checkpoints():
+    """Remove any backfill checkpoints left in redis"""
+    for hubspot_type in [PRODUCTS, HubspotObjectType.CONTACTS.value, ASSOCIATIONS]:
+        for create in [True, False]:
+            reset_backfill_checkpoint(hubspot_type, create)
+    yield
+    for hubspot_type in [PRODUCTS, HubspotObjectType.CONTACTS.value, ASSOCIATIONS]:
+        for create in [True, False]:
+            reset_backfill_checkpoint(hubspot_type, create)
+
+
+def test_backfill_checkpoint():
+    """Checkpoints should be stored per object type and mode"""
+    assert get_backfill_checkpoint(PRODUCTS, True) == (0, 0)
+    save_backfill_checkpoint(PRODUCTS, True, 15, 4)
+    assert get_backfill_checkpoint(PRODUCTS, True) == (15, 4)
+    assert get_backfill_checkpoint(PRODUCTS, False) == (0, 0)
+    reset_backfill_checkpoint(PRODUCTS, True)
+    assert get_backfill_checkpoint(PRODUCTS, True) == (0, 0)
+
+
+def test_backfill_create_resumes(mocker):
+    """A backfill which failed should resume after the last synced batch"""
+    runs = sorted(BootcampRunFactory.create_batch(5), key=lambda run: run.id)
+    HubspotObjectFactory.create(
+        content_object=runs[1],
+        content_type=ContentType.objects.get_for_model(BootcampRun),
+        object_id=runs[1].id,
+    )
+    unsynced_ids = [run.id for run in runs if run != runs[1]]
+    create_mock = mocker.patch(
+        "hubspot_sync.backfill.batch_create_hubspot_objects_chunked",
+        side_effect=[None, ConnectionError, None, None],
+    )
+    content_type = ContentType.objects.get_for_model(BootcampRun)
+
+    with pytest.raises(ConnectionError):
+        backfill_hubspot_objects(PRODUCTS, content_type, True, 2)
+    assert get_backfill_checkpoint(PRODUCTS, True) == (unsynced_ids[1], 2)
+
+    progress_mock = mocker.Mock()
+    progress = backfill_hubspot_objects(
+        PRODUCTS, content_type, True, 2, progress=progress_mock
+    )
+    assert [call.args[2] for call in create_mock.call_args_list] == [
+        unsynced_ids[:2],
+        unsynced_ids[2:],
+        unsynced_ids[2:],
+    ]
+    assert create_mock.call_args.args[:2] == (PRODUCTS, "bootcamprun")
+    assert progress.synced == progress.total == 4
+    assert progress.rate > 0
+    progress_mock.assert_called_once_with(progress)
+    assert get_backfill_checkpoint(PRODUCTS, True) == (0, 0)
+
+
+def test_backfill_create_contacts(mocker):
+    """Only active users with a social auth should be created as contacts"""
+    users = UserFactory.create_batch(3)
+    for user in users[:2]:
+        UserSocialAuthFactory.create(user=user)
+    UserFactory.create(is_active=False)
+    create_mock = mocker.patch(
+        "hubspot_sync.backfill.batch_create_hubspot_objects_chunked"
+    )
+
+    backfill_hubspot_objects(
+        HubspotObjectType.CONTACTS.value,
+        ContentType.objects.get_for_model(User),
+        True,
+        10,
+    )
+    create_mock.assert_called_once_with(
+        HubspotObjectType.CONTACTS.value,
+        "user",
+        sorted(user.id for user in users[:2]),
+    )
+
+
+def test_backfill_update(mocker):
+    """An update backfill should send the hubspot ids of synced objects"""
+    content_type = ContentType.objects.get_for_model(BootcampRun)
+    hubspot_objects = sorted(
+        [
+            HubspotObjectFactory.create(
+                content_object=run, content_type=content_type, object_id=run.id
+            )
+            for run in BootcampRunFactory.create_batch(3)
+        ],
+        key=lambda hubspot_object: hubspot_object.object_id,
+    )
+    update_mock = mocker.patch(
+        "hubspot_sync.backfill.batch_update_hubspot_objects_chunked"
+    )
+
+    progress = backfill_hubspot_objects(PRODUCTS, content_type, False, 2)
+    assert progress.synced == 3
+    assert [call.args[2] for call in update_mock.call_args_list] == [
+        [
+            (hubspot_object.object_id, hubspot_object.hubspot_id)
+            for hubspot_object in hubspot_objects[:2]
+        ],
+        [(hubspot_objects[2].object_id, hubspot_objects[2].hubspot_id)],
+    ]
+
+
+def test_backfill_associations(mocker):
+    """The associations backfill should upsert associations for all applications in batches"""
+    application_ids = sorted(
+        application.id for application in BootcampApplicationFactory.create_batch(3)
+    )
+    associations_mock = mocker.patch(
+        "hubspot_sync.backfill.batch_upsert_associations_chunked"
+    )
+
+    progress = backfill_hubspot_associations(2)
+    assert progress.synced == 3
+    assert [call.args[0] for call in associations_mock.call_args_list] == [
+        application_ids[:2],
+        application_ids[2:],
+    ]
@@ -8,11 +8,14 @@ from types import SimpleNamespace
 import pytest
 import pytz
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.contrib.contenttypes.models import ContentType
 from hubspot.crm.objects import SimplePublicObject
 from mitol.hubspot_api.factories import HubspotObjectFactory
 
 from applications.models import BootcampApplication
+from hubspot_sync.id_cache import HUBSPOT_ID_CACHE_KEY_PREFIX
+from hubspot_sync.rate_limit import reset_hubspot_rate_limit
 from ecommerce.factories import OrderFactory
 from klasses.factories import InstallmentFactory
 from klasses.models import BootcampRun
@@ -34,6 +37,20 @@ FAKE_OBJECT_ID = 1234
 FAKE_HUBSPOT_ID = "1231213123"
 
 
+@pytest.fixture(autouse=True)
+def hubspot_rate_limit(mocker):
+    """Start each test with an empty rate limiter, and don't actually wait for it"""
+    reset_hubspot_rate_limit()
+    yield mocker.patch("hubspot_sync.rate_limit.time.sleep")
+    reset_hubspot_rate_limit()
+
+
+@pytest.fixture(autouse=True)
+def clear_hubspot_id_cache():
+    """Start each test without hubspot ids cached in Redis, since the HubspotObjects of earlier tests are rolled back"""
+    cache.delete_pattern(f"{HUBSPOT_ID_CACHE_KEY_PREFIX}:*")
+
+
 @pytest.fixture
 def mocked_celery(mocker):
     """Mock object that patches certain celery functions"""
@@ -1,3 +1,10 @@
 """Constants for hubspot_sync"""
 
 HUBSPOT_DEAL_PREFIX = "Bootcamp-application-order"
+HUBSPOT_ID_SYNC_CHUNK_SIZE = 1000
+HUBSPOT_BACKFILL_BATCH_SIZE = 1000
+HUBSPOT_ASSOCIATION_BATCH_SIZE = 100
+HUBSPOT_ID_LOCAL_CACHE_MAX_SIZE = 10000
+HUBSPOT_FORMS_URL = "https://forms.hubspot.com/uploads/form/v2"
+# Seconds to wait for a connection to the Hubspot Forms API and for its response
+HUBSPOT_FORM_SUBMISSION_TIMEOUT = (3.05, 10)
@@ -0,0 +1,164 @@
+"""
+Hubspot ids of synced objects, cached in the memory of each process and in redis. Entries are
+removed whenever a HubspotObject is written or deleted, and the short in-memory TTL limits how long
+a process can keep an id which was changed by another process.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from mitol.hubspot_api.models import HubspotObject
+
+from hubspot_sync.constants import HUBSPOT_ID_LOCAL_CACHE_MAX_SIZE
+
+HUBSPOT_ID_CACHE_KEY_PREFIX = "hubspot_sync:hubspot_id"
+
+_local_cache = {}
+_local_cache_lock = threading.Lock()
+
+
+def get_hubspot_id_cache_key(content_type_id, object_id):
+    """
+    Args:
+        content_type_id (int): A ContentType id
+        object_id (int): The id of an object of the content type
+
+    Returns:
+        str: The cache key for the hubspot id of the object
+    """
+    return f"{HUBSPOT_ID_CACHE_KEY_PREFIX}:{content_type_id}:{object_id}"
+
+
+def clear_local_hubspot_id_cache():
+    """Remove every hubspot id cached in the memory of this process"""
+    with _local_cache_lock:
+        _local_cache.clear()
+
+
+def _get_local(content_type_id, object_ids):
+    """Get the unexpired hubspot ids cached in memory, keyed by object id"""
+    now = time.monotonic()
+    found = {}
+    with _local_cache_lock:
+        for object_id in object_ids:
+            entry = _local_cache.get((content_type_id, object_id))
+            if entry is not None and entry[1] > now:
+                found[object_id] = entry[0]
+    return found
+
+
+def _set_local(content_type_id, hubspot_ids):
+    """Cache hubspot ids in memory, keyed by object id"""
+    now = time.monotonic()
+    expires_at = now + settings.HUBSPOT_ID_LOCAL_CACHE_TTL
+    with _local_cache_lock:
+        if len(_local_cache) + len(hubspot_ids) > HUBSPOT_ID_LOCAL_CACHE_MAX_SIZE:
+            for key in [key for key, entry in _local_cache.items() if entry[1] <= now]:
+                del _local_cache[key]
+            if len(_local_cache) + len(hubspot_ids) > HUBSPOT_ID_LOCAL_CACHE_MAX_SIZE:
+                _local_cache.clear()
+        for object_id, hubspot_id in hubspot_ids.items():
+            _local_cache[(content_type_id, object_id)] = (hubspot_id, expires_at)
+
+
+def cache_hubspot_ids(content_type_id, hubspot_ids):
+    """
+    Cache the hubspot ids of objects of one content type
+
+    Args:
+        content_type_id (int): A ContentType id
+        hubspot_ids (dict): Hubspot ids keyed by object id
+    """
+    if not hubspot_ids:
+        return
+    _set_local(content_type_id, hubspot_ids)
+    cache.set_many(
+        {
+            get_hubspot_id_cache_key(content_type_id, object_id): hubspot_id
+            for object_id, hubspot_id in hubspot_ids.items()
+        },
+        timeout=settings.HUBSPOT_ID_CACHE_TTL,
+    )
+
+
+def get_cached_hubspot_ids(content_type_id, object_ids):
+    """
+    Get the hubspot ids of objects of one content type from the caches, loading the missing ones
+    with a single query
+
+    Args:
+        content_type_id (int): A ContentType id
+        object_ids (iterable of int): The ids of objects of the content type
+
+    Returns:
+        dict: Hubspot ids keyed by object id. Objects without a HubspotObject are left out.
+    """
+    object_ids = {int(object_id) for object_id in object_ids}
+    hubspot_ids = _get_local(content_type_id, object_ids)
+    missing_ids = object_ids - hubspot_ids.keys()
+    if missing_ids:
+        keys = {
+            get_hubspot_id_cache_key(content_type_id, object_id): object_id
+            for object_id in missing_ids
+        }
+        cached = {
+            keys[key]: hubspot_id for key, hubspot_id in cache.get_many(keys).items()
+        }
+        _set_local(content_type_id, cached)
+        hubspot_ids.update(cached)
+        missing_ids -= cached.keys()
+    if missing_ids:
+        loaded = dict(
+            HubspotObject.objects.filter(
+                content_type_id=content_type_id, object_id__in=missing_ids
+            ).values_list("object_id", "hubspot_id")
+        )
+        cache_hubspot_ids(content_type_id, loaded)
+        hubspot_ids.update(loaded)
+    return hubspot_ids
+
+
+def get_cached_hubspot_id(content_type_id, object_id):
+    """
+    Get the hubspot id of an object from the caches, loading it if it's missing
+
+    Args:
+        content_type_id (int): A ContentType id
+        object_id (int): The id of an object of the content type
+
+    Returns:
+        str or None: The hubspot id, or None if the object has no HubspotObject
+    """
+    return get_cached_hubspot_ids(content_type_id, [object_id]).get(int(object_id))
+
+
+def _delete_hubspot_ids(content_type_id, object_ids):
+    """Remove the hubspot ids of objects from both caches"""
+    with _local_cache_lock:
+        for object_id in object_ids:
+            _local_cache.pop((content_type_id, object_id), None)
+    cache.delete_many(
+        [
+            get_hubspot_id_cache_key(content_type_id, object_id)
+            for object_id in object_ids
+        ]
+    )
+
+
+def invalidate_hubspot_ids(content_type_id, object_ids):
+    """
+    Remove the cached hubspot ids of some objects. They are removed again once the transaction commits,
+    so ids which other processes load before the commit are not kept either.
+
+    Args:
+        content_type_id (int): A ContentType id
+        object_ids (iterable of int): The ids of objects of the content type
+    """
+    object_ids = [int(object_id) for object_id in object_ids]
+    if not object_ids:
+        return
+    _delete_hubspot_ids(content_type_id, object_ids)
+    transaction.on_commit(lambda: _delete_hubspot_ids(content_type_id, object_ids))
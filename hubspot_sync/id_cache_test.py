@@ -0,0 +1,113 @@
+"""Tests for the hubspot id cache"""
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from mitol.hubspot_api.factories import HubspotObjectFactory
+from mitol.hubspot_api.models import HubspotObject
+import pytest
+
+from hubspot_sync.api import bulk_sync_hubspot_ids_to_db
+from hubspot_sync.id_cache import (
+    cache_hubspot_ids,
+    clear_local_hubspot_id_cache,
+    get_cached_hubspot_id,
+    get_cached_hubspot_ids,
+    get_hubspot_id_cache_key,
+    invalidate_hubspot_ids,
+)
+from profiles.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def user_content_type():
+    """The content type of users"""
+    return ContentType.objects.get_for_model(User)
+
+
+@pytest.fixture
+def hubspot_users(user_content_type):
+    """Users with HubspotObjects"""
+    return [
+        HubspotObjectFactory.create(
+            content_type=user_content_type, object_id=user.id, content_object=user
+        )
+        for user in UserFactory.create_batch(2)
+    ]
+
+
+def test_get_cached_hubspot_ids(
+    django_assert_num_queries, user_content_type, hubspot_users
+):
+    """get_cached_hubspot_ids should load missing ids with one query and serve them from memory or redis afterwards"""
+    object_ids = [hubspot_object.object_id for hubspot_object in hubspot_users]
+    expected = {
+        hubspot_object.object_id: hubspot_object.hubspot_id
+        for hubspot_object in hubspot_users
+    }
+    with django_assert_num_queries(1):
+        assert (
+            get_cached_hubspot_ids(user_content_type.id, [*object_ids, 0]) == expected
+        )
+    with django_assert_num_queries(0):
+        assert get_cached_hubspot_ids(user_content_type.id, object_ids) == expected
+    clear_local_hubspot_id_cache()
+    with django_assert_num_queries(0):
+        assert (
+            get_cached_hubspot_id(user_content_type.id, object_ids[0])
+            == hubspot_users[0].hubspot_id
+        )
+    assert cache.get(get_hubspot_id_cache_key(user_content_type.id, object_ids[1])) == (
+        hubspot_users[1].hubspot_id
+    )
+    with django_assert_num_queries(1):
+        assert get_cached_hubspot_id(user_content_type.id, 0) is None
+
+
+def test_local_cache_ttl(mocker, settings, user_content_type):
+    """Hubspot ids cached in memory should expire after the local TTL"""
+    settings.HUBSPOT_ID_LOCAL_CACHE_TTL = 10
+    mock_monotonic = mocker.patch("hubspot_sync.id_cache.time.monotonic")
+    mock_monotonic.return_value = 100
+    cache_hubspot_ids(user_content_type.id, {1: "abc"})
+    cache.delete(get_hubspot_id_cache_key(user_content_type.id, 1))
+    assert get_cached_hubspot_id(user_content_type.id, 1) == "abc"
+    mock_monotonic.return_value = 111
+    assert get_cached_hubspot_id(user_content_type.id, 1) is None
+
+
+def test_invalidate_hubspot_ids(user_content_type):
+    """invalidate_hubspot_ids should remove ids from memory and redis"""
+    cache_hubspot_ids(user_content_type.id, {1: "abc", 2: "def"})
+    invalidate_hubspot_ids(user_content_type.id, [1])
+    assert get_cached_hubspot_ids(user_content_type.id, [1, 2]) == {2: "def"}
+
+
+def test_hubspot_object_signals(user_content_type, hubspot_users):
+    """Saving or deleting a HubspotObject should remove its cached id"""
+    object_id = hubspot_users[0].object_id
+    hubspot_id = get_cached_hubspot_id(user_content_type.id, object_id)
+    assert hubspot_id == hubspot_users[0].hubspot_id
+    hubspot_users[0].hubspot_id = "new_id"
+    hubspot_users[0].save()
+    assert get_cached_hubspot_id(user_content_type.id, object_id) == "new_id"
+    hubspot_users[0].delete()
+    assert get_cached_hubspot_id(user_content_type.id, object_id) is None
+
+
+def test_bulk_sync_invalidates(user_content_type, hubspot_users):
+    """bulk_sync_hubspot_ids_to_db should remove the cached ids of the objects it writes"""
+    object_id = hubspot_users[0].object_id
+    get_cached_hubspot_id(user_content_type.id, object_id)
+    bulk_sync_hubspot_ids_to_db(user_content_type, [(object_id, "bulk_id")])
+    assert get_cached_hubspot_id(user_content_type.id, object_id) == "bulk_id"
+    assert (
+        HubspotObject.objects.get(
+            content_type=user_content_type, object_id=object_id
+        ).hubspot_id
+        == "bulk_id"
+    )
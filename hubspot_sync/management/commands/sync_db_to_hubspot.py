@@ -11,6 +11,13 @@ from mitol.common.utils import now_in_utc
 from mitol.hubspot_api.api import HubspotObjectType
 
 from applications.models import BootcampApplication, BootcampApplicationLine
+from hubspot_sync.backfill import (
+    ASSOCIATIONS,
+    backfill_hubspot_associations,
+    backfill_hubspot_objects,
+    reset_backfill_checkpoint,
+)
+from hubspot_sync.constants import HUBSPOT_BACKFILL_BATCH_SIZE
 from hubspot_sync.tasks import (
     batch_upsert_hubspot_objects,
     batch_upsert_associations,
@@ -25,16 +32,66 @@ class Command(BaseCommand):
 
     create = None
     object_ids = None
+    backfill = False
+    restart = False
+    batch_size = HUBSPOT_BACKFILL_BATCH_SIZE
     help = (
         "Sync all Users, Deals, Products, and Lines with Hubspot. Hubspot API key must be set and Hubspot settings"
         "must be configured with configure_hubspot_settings"
     )
 
+    def write_backfill_progress(self, progress):
+        """
+        Report the throughput and remaining time of a backfill
+
+        Args:
+            progress (BackfillProgress): The progress of the backfill
+        """
+        self.stdout.write(
+            "  {hubspot_type}: {synced}/{total} synced, {rate:.1f} objects/sec, ETA {eta}".format(
+                **progress._asdict()
+            )
+        )
+
+    def run_backfill(self, hubspot_type, model):
+        """
+        Sync a model in checkpointed batches, resuming an interrupted backfill unless --restart is given
+
+        Args:
+            hubspot_type (str): The hubspot object type, or ASSOCIATIONS
+            model (Model): The model to sync, unused for associations
+        """
+        create = self.create or hubspot_type == ASSOCIATIONS
+        if self.restart:
+            reset_backfill_checkpoint(hubspot_type, create)
+        if hubspot_type == ASSOCIATIONS:
+            progress = backfill_hubspot_associations(
+                self.batch_size, progress=self.write_backfill_progress
+            )
+        else:
+            progress = backfill_hubspot_objects(
+                hubspot_type,
+                ContentType.objects.get_for_model(model),
+                create,
+                self.batch_size,
+                progress=self.write_backfill_progress,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Backfill of {hubspot_type} finished, {synced} objects synced".format(
+                    **progress._asdict()
+                )
+            )
+        )
+
     def sync_contacts(self):
         """
         Sync all users with contacts in hubspot
         """
         sys.stdout.write("Syncing users with hubspot contacts...\n")
+        if self.backfill:
+            self.run_backfill(HubspotObjectType.CONTACTS.value, User)
+            return
         task = batch_upsert_hubspot_objects.delay(
             HubspotObjectType.CONTACTS.value,
             ContentType.objects.get_for_model(User).model,
@@ -56,6 +113,9 @@ class Command(BaseCommand):
         Sync all products with products in hubspot
         """
         sys.stdout.write("  Syncing products with hubspot products...\n")
+        if self.backfill:
+            self.run_backfill(HubspotObjectType.PRODUCTS.value, BootcampRun)
+            return
         task = batch_upsert_hubspot_objects.delay(
             HubspotObjectType.PRODUCTS.value,
             ContentType.objects.get_for_model(BootcampRun).model,
@@ -77,6 +137,9 @@ class Command(BaseCommand):
         Sync all applications with deals in hubspot
         """
         sys.stdout.write("  Syncing applications with hubspot deals...\n")
+        if self.backfill:
+            self.run_backfill(HubspotObjectType.DEALS.value, BootcampApplication)
+            return
         task = batch_upsert_hubspot_objects.delay(
             HubspotObjectType.DEALS.value,
             ContentType.objects.get_for_model(BootcampApplication).model,
@@ -98,6 +161,9 @@ class Command(BaseCommand):
         Sync all applications with line_items in hubspot
         """
         sys.stdout.write("  Syncing application lines with hubspot line_items...\n")
+        if self.backfill:
+            self.run_backfill(HubspotObjectType.LINES.value, BootcampApplicationLine)
+            return
         task = batch_upsert_hubspot_objects.delay(
             HubspotObjectType.LINES.value,
             ContentType.objects.get_for_model(BootcampApplicationLine).model,
@@ -119,6 +185,9 @@ class Command(BaseCommand):
         Sync all deal associations in hubspot
         """
         sys.stdout.write("  Syncing deal associations with hubspot...\n")
+        if self.backfill:
+            self.run_backfill(ASSOCIATIONS, BootcampApplication)
+            return
         task = batch_upsert_associations.delay(application_ids=self.object_ids)
         start = now_in_utc()
         task.get()
@@ -184,6 +253,22 @@ class Command(BaseCommand):
             action="store_true",
             help="Sync all application associations",
         )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Sync in batches ordered by id, resuming from the last checkpoint of an interrupted backfill",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard the checkpoints of earlier backfills and start from the first object",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=HUBSPOT_BACKFILL_BATCH_SIZE,
+            help="Number of objects to sync between backfill checkpoints",
+        )
         parser.add_argument(
             "mode",
             type=str,
@@ -198,6 +283,12 @@ class Command(BaseCommand):
             sys.exit(1)
         self.create = options["mode"].lower() == "create"
         self.object_ids = options["ids"]
+        self.backfill = options["backfill"]
+        self.restart = options["restart"]
+        self.batch_size = options["batch_size"]
+        if self.backfill and self.object_ids:
+            sys.stderr.write("A backfill can't be limited to a list of ids.\n")
+            sys.exit(1)
 
         sys.stdout.write("Syncing with hubspot...\n")
         if not (
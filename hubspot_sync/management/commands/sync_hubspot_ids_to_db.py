@@ -12,6 +12,7 @@ from mitol.hubspot_api.models import HubspotObject
 
 from applications.models import BootcampApplication, BootcampApplicationLine
 from hubspot_sync.api import (
+    HubspotIdSyncResult,
     sync_contact_hubspot_ids_to_db,
     sync_deal_hubspot_ids_to_db,
     sync_product_hubspot_ids_to_db,
@@ -24,6 +25,13 @@ def format_missing(missing: List[int]) -> str:
     return f"\n {','.join([str(id) for id in sorted(missing)])}\n\n"
 
 
+def write_counts(result: HubspotIdSyncResult, object_name: str):
+    """Write the number of matched and unmatched Hubspot objects"""
+    sys.stdout.write(
+        f"{result.matched} Hubspot {object_name} matched, {result.unmatched} unmatched\n"
+    )
+
+
 class Command(BaseCommand):
     """
     Management command to sync hubspot ids to database
@@ -37,6 +45,7 @@ class Command(BaseCommand):
         """
         sys.stdout.write("Syncing user hubspot ids to database...\n")
         result = sync_contact_hubspot_ids_to_db()
+        write_counts(result, "contacts")
         missing = (
             User.objects.filter(is_active=True, email__contains="@")
             .exclude(
@@ -46,7 +55,7 @@ class Command(BaseCommand):
             )
             .values_list("username", flat=True)
         )
-        if not result and missing.count() > 0:
+        if not result.complete and missing.count() > 0:
             sys.stderr.write(
                 f"Some users could not be matched with hubspot ids:\n {','.join(missing)}\n\n"
             )
@@ -59,12 +68,13 @@ class Command(BaseCommand):
         """
         sys.stdout.write("Syncing product hubspot ids to database...\n")
         result = sync_product_hubspot_ids_to_db()
+        write_counts(result, "products")
         missing = BootcampRun.objects.exclude(
             id__in=HubspotObject.objects.filter(
                 content_type=ContentType.objects.get_for_model(BootcampRun)
             ).values_list("object_id", flat=True)
         ).values_list("id", flat=True)
-        if not result and missing.count() > 0:
+        if not result.complete and missing.count() > 0:
             sys.stderr.write(
                 f"Some products could not be matched with hubspot ids:{format_missing(missing)}"
             )
@@ -77,7 +87,8 @@ class Command(BaseCommand):
         """
         sys.stdout.write("Syncing deal hubspot ids to database...\n")
         result = sync_deal_hubspot_ids_to_db()
-        if not result:
+        write_counts(result, "deals")
+        if not result.complete:
             missing = BootcampApplication.objects.exclude(
                 id__in=HubspotObject.objects.filter(
                     content_type=ContentType.objects.get_for_model(BootcampApplication)
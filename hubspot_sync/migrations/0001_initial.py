@@ -0,0 +1,44 @@
+# Generated by Django 4.2.27 on 2026-10-18 03:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("hubspot_api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HubspotSyncFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                ("fingerprint", models.CharField(max_length=64)),
+                (
+                    "hubspot_object",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_fingerprint",
+                        to="hubspot_api.hubspotobject",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
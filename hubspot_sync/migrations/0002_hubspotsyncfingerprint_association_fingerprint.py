@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hubspot_sync", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hubspotsyncfingerprint",
+            name="association_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="hubspotsyncfingerprint",
+            name="fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,21 @@
+"""Models for hubspot_sync"""
+
+from django.db import models
+from mitol.common.models import TimestampedModel
+from mitol.hubspot_api.models import HubspotObject
+
+
+class HubspotSyncFingerprint(TimestampedModel):
+    """
+    Hashes of the last payload and the last associations that were synced for a HubspotObject, so syncs
+    which wouldn't change anything in Hubspot can be skipped
+    """
+
+    hubspot_object = models.OneToOneField(
+        HubspotObject, on_delete=models.CASCADE, related_name="sync_fingerprint"
+    )
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+    association_fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    def __str__(self):
+        return f"Sync fingerprint for {self.hubspot_object.content_type.model} {self.hubspot_object.object_id}"
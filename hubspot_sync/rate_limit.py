@@ -0,0 +1,252 @@
+"""
+A token bucket rate limiter for Hubspot API calls, shared by all workers through redis
+"""
+
+import logging
+import time
+from functools import lru_cache, wraps
+from typing import Callable
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from hubspot.crm.associations import ApiException as AssociationsApiException
+from hubspot.crm.objects import ApiException
+from rest_framework.status import HTTP_429_TOO_MANY_REQUESTS
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "hubspot_sync:rate_limit"
+RATE_LIMIT_STATS_KEY = "hubspot_sync:rate_limit:stats"
+
+HEADER_RATE_LIMIT_MAX = "x-hubspot-ratelimit-max"
+HEADER_RATE_LIMIT_REMAINING = "x-hubspot-ratelimit-remaining"
+HEADER_RATE_LIMIT_INTERVAL = "x-hubspot-ratelimit-interval-milliseconds"
+HEADER_RETRY_AFTER = "retry-after"
+
+# Reserve tokens from the bucket, letting the balance go negative. Returns the number of seconds
+# the caller must wait before its reservation is covered, so each caller sleeps exactly once.
+# KEYS: bucket hash, stats hash
+# ARGV: now, default capacity, default refill rate per second, tokens requested
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(redis.call('HGET', KEYS[1], 'capacity') or ARGV[2])
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate') or ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or capacity)
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or now)
+local blocked_until = tonumber(redis.call('HGET', KEYS[1], 'blocked_until') or 0)
+
+local start = math.max(now, updated)
+if blocked_until > start then
+    start = blocked_until
+end
+tokens = math.min(capacity, tokens + (start - updated) * rate) - tonumber(ARGV[4])
+local wait = start - now
+if tokens < 0 then
+    wait = wait + (-tokens / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(start))
+redis.call('EXPIRE', KEYS[1], 3600)
+
+redis.call('HINCRBY', KEYS[2], 'requests', 1)
+if wait > 0 then
+    redis.call('HINCRBY', KEYS[2], 'waits', 1)
+    redis.call('HINCRBYFLOAT', KEYS[2], 'wait_seconds', tostring(wait))
+end
+return tostring(wait)
+"""
+
+# Adopt the limits Hubspot reports. The balance can only go down, since requests from other workers
+# may be in flight.
+# KEYS: bucket hash
+# ARGV: capacity, refill rate per second, remaining tokens
+UPDATE_SCRIPT = """
+redis.call('HSET', KEYS[1], 'capacity', ARGV[1], 'rate', ARGV[2])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens == nil or tokens > tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'tokens', ARGV[3])
+end
+redis.call('EXPIRE', KEYS[1], 3600)
+"""
+
+
+@lru_cache(maxsize=None)
+def _get_script(source: str):
+    """
+    Register a Lua script once per process, later calls run it by its sha
+
+    Args:
+        source(str): The Lua script
+
+    Returns:
+        Script: The registered script
+    """
+    return get_redis_connection("default").register_script(source)
+
+
+def _headers_to_dict(headers) -> dict:
+    """
+    Lowercase the names of response headers
+
+    Args:
+        headers(dict or HTTPHeaderDict): Response headers, if any
+
+    Returns:
+        dict: headers keyed by lowercase name
+    """
+    return {name.lower(): value for name, value in (headers or {}).items()}
+
+
+def acquire_hubspot_token(tokens: int = 1) -> float:
+    """
+    Take tokens from the shared bucket, sleeping until they are available
+
+    Args:
+        tokens(int): The number of API calls about to be made
+
+    Returns:
+        float: The number of seconds spent waiting
+    """
+    wait = float(
+        _get_script(ACQUIRE_SCRIPT)(
+            keys=[RATE_LIMIT_KEY, RATE_LIMIT_STATS_KEY],
+            args=[
+                time.time(),
+                settings.HUBSPOT_RATE_LIMIT_MAX,
+                settings.HUBSPOT_RATE_LIMIT_MAX / settings.HUBSPOT_RATE_LIMIT_INTERVAL,
+                tokens,
+            ],
+        )
+    )
+    if wait > 0:
+        log.debug("Waiting %.3f seconds for the Hubspot rate limit", wait)
+        time.sleep(wait)
+    return wait
+
+
+def update_hubspot_rate_limit(headers):
+    """
+    Adjust the bucket to the rate limit reported in Hubspot's response headers
+
+    Args:
+        headers(dict or HTTPHeaderDict): Response headers of a Hubspot API call
+    """
+    headers = _headers_to_dict(headers)
+    try:
+        capacity = int(headers[HEADER_RATE_LIMIT_MAX])
+        interval = int(headers[HEADER_RATE_LIMIT_INTERVAL]) / 1000
+        remaining = int(headers[HEADER_RATE_LIMIT_REMAINING])
+    except (KeyError, ValueError):
+        return
+    if capacity <= 0 or interval <= 0:
+        return
+    _get_script(UPDATE_SCRIPT)(
+        keys=[RATE_LIMIT_KEY], args=[capacity, capacity / interval, remaining]
+    )
+
+
+def backoff_hubspot_rate_limit(headers=None):
+    """
+    Empty the bucket and block all workers after Hubspot returned a 429, until the Retry-After
+    time or the rate limit interval has passed
+
+    Args:
+        headers(dict or HTTPHeaderDict): Response headers of the 429 response
+    """
+    headers = _headers_to_dict(headers)
+    try:
+        delay = float(headers[HEADER_RETRY_AFTER])
+    except (KeyError, ValueError):
+        try:
+            delay = int(headers[HEADER_RATE_LIMIT_INTERVAL]) / 1000
+        except (KeyError, ValueError):
+            delay = settings.HUBSPOT_RATE_LIMIT_INTERVAL
+    now = time.time()
+    client = get_redis_connection("default")
+    pipeline = client.pipeline()
+    pipeline.hset(
+        RATE_LIMIT_KEY,
+        mapping={"tokens": 0, "updated": now, "blocked_until": now + delay},
+    )
+    pipeline.expire(RATE_LIMIT_KEY, 3600)
+    pipeline.hincrby(RATE_LIMIT_STATS_KEY, "throttled", 1)
+    pipeline.execute()
+    log.warning("Hubspot rate limit exceeded, backing off for %.3f seconds", delay)
+
+
+def hubspot_rate_limit_stats() -> dict:
+    """
+    Get the counters of the rate limiter
+
+    Returns:
+        dict: The number of requests, the number and total seconds of waits, and the number of 429 responses
+    """
+    stats = get_redis_connection("default").hgetall(RATE_LIMIT_STATS_KEY)
+    return {
+        "requests": int(stats.get(b"requests", 0)),
+        "waits": int(stats.get(b"waits", 0)),
+        "wait_seconds": float(stats.get(b"wait_seconds", 0)),
+        "throttled": int(stats.get(b"throttled", 0)),
+    }
+
+
+def reset_hubspot_rate_limit():
+    """Remove the state and counters of the rate limiter"""
+    get_redis_connection("default").delete(RATE_LIMIT_KEY, RATE_LIMIT_STATS_KEY)
+
+
+def call_hubspot_api(func: Callable, *args, **kwargs):
+    """
+    Call a Hubspot client *_with_http_info method once the rate limit allows it, retrying after
+    429 responses up to MITOL_HUBSPOT_API_RETRIES times
+
+    Args:
+        func(Callable): A *_with_http_info method of the Hubspot API client
+        args: Positional arguments for the method
+        kwargs: Keyword arguments for the method
+
+    Returns:
+        object: The response data
+    """
+    attempt = 0
+    while True:
+        acquire_hubspot_token()
+        try:
+            data, _, headers = func(*args, **kwargs)
+        except (ApiException, AssociationsApiException) as ae:
+            if (
+                ae.status is None
+                or int(ae.status) != HTTP_429_TOO_MANY_REQUESTS
+                or attempt >= settings.MITOL_HUBSPOT_API_RETRIES
+            ):
+                raise
+            backoff_hubspot_rate_limit(ae.headers)
+            attempt += 1
+            continue
+        update_hubspot_rate_limit(headers)
+        return data
+
+
+def rate_limited(func: Callable, tokens: int = 1) -> Callable:
+    """
+    Wrap a function which calls the Hubspot API so that it takes tokens from the shared bucket
+    for each call, and empties the bucket if Hubspot returns a 429
+
+    Args:
+        func(Callable): A function which makes Hubspot API calls
+        tokens(int): The number of API calls the function usually makes
+
+    Returns:
+        Callable: The wrapped function
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        acquire_hubspot_token(tokens)
+        try:
+            return func(*args, **kwargs)
+        except (ApiException, AssociationsApiException) as ae:
+            if ae.status is not None and int(ae.status) == HTTP_429_TOO_MANY_REQUESTS:
+                backoff_hubspot_rate_limit(ae.headers)
+            raise
+
+    return wrapper
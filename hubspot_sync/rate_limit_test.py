@@ -0,0 +1,121 @@
+"""
+Tests for the Hubspot rate limiter
+"""
+
+# pylint: disable=redefined-outer-name
+import pytest
+from hubspot.crm.objects import ApiException
+
+from hubspot_sync.rate_limit import (
+    acquire_hubspot_token,
+    backoff_hubspot_rate_limit,
+    call_hubspot_api,
+    hubspot_rate_limit_stats,
+    rate_limited,
+    update_hubspot_rate_limit,
+)
+
+
+@pytest.fixture
+def mock_time(mocker):
+    """Mock the clock used by the rate limiter"""
+    return mocker.patch("hubspot_sync.rate_limit.time.time", return_value=1000.0)
+
+
+@pytest.fixture(autouse=True)
+def rate_limit_settings(settings):
+    """Use a bucket of 2 tokens refilled every second"""
+    settings.HUBSPOT_RATE_LIMIT_MAX = 2
+    settings.HUBSPOT_RATE_LIMIT_INTERVAL = 1
+    settings.MITOL_HUBSPOT_API_RETRIES = 1
+
+
+def test_acquire_hubspot_token(mock_time, hubspot_rate_limit):
+    """acquire_hubspot_token should only wait once the bucket is empty, and count the waits"""
+    assert acquire_hubspot_token() == 0
+    assert acquire_hubspot_token() == 0
+    assert acquire_hubspot_token() == pytest.approx(0.5)
+    hubspot_rate_limit.assert_called_once_with(pytest.approx(0.5))
+    # The next caller waits behind the previous reservation
+    assert acquire_hubspot_token() == pytest.approx(1.0)
+    mock_time.return_value = 1010.0
+    assert acquire_hubspot_token() == 0
+    assert hubspot_rate_limit_stats() == {
+        "requests": 5,
+        "waits": 2,
+        "wait_seconds": pytest.approx(1.5),
+        "throttled": 0,
+    }
+
+
+def test_update_hubspot_rate_limit(mock_time):
+    """update_hubspot_rate_limit should adopt the limit and remaining calls reported by Hubspot"""
+    update_hubspot_rate_limit(
+        {
+            "X-HubSpot-RateLimit-Max": "10",
+            "X-HubSpot-RateLimit-Interval-Milliseconds": "1000",
+            "X-HubSpot-RateLimit-Remaining": "1",
+        }
+    )
+    assert acquire_hubspot_token() == 0
+    assert acquire_hubspot_token() == pytest.approx(0.1)
+    # Incomplete headers are ignored
+    update_hubspot_rate_limit({"X-HubSpot-RateLimit-Max": "1"})
+    assert acquire_hubspot_token() == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize(
+    "headers, expected_wait",
+    [
+        [{"Retry-After": "3"}, 3],
+        [{"X-HubSpot-RateLimit-Interval-Milliseconds": "5000"}, 5],
+        [None, 1],
+    ],
+)
+def test_backoff_hubspot_rate_limit(mock_time, headers, expected_wait):
+    """backoff_hubspot_rate_limit should block the bucket for the expected time"""
+    backoff_hubspot_rate_limit(headers)
+    assert acquire_hubspot_token() == pytest.approx(expected_wait)
+    assert hubspot_rate_limit_stats()["throttled"] == 1
+
+
+def test_call_hubspot_api(mocker, mock_time):
+    """call_hubspot_api should return the response data and adapt to the response headers"""
+    func = mocker.Mock(
+        return_value=(
+            "data",
+            200,
+            {
+                "X-HubSpot-RateLimit-Max": "100",
+                "X-HubSpot-RateLimit-Interval-Milliseconds": "10000",
+                "X-HubSpot-RateLimit-Remaining": "0",
+            },
+        )
+    )
+    assert call_hubspot_api(func, "deals", body=1) == "data"
+    func.assert_called_once_with("deals", body=1)
+    assert acquire_hubspot_token() == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("status, call_count", [[429, 2], [500, 1]])
+def test_call_hubspot_api_error(mocker, mock_time, status, call_count):
+    """call_hubspot_api should retry after a 429 and raise other errors"""
+    func = mocker.Mock(side_effect=ApiException(status=status))
+    with pytest.raises(ApiException):
+        call_hubspot_api(func)
+    assert func.call_count == call_count
+    assert hubspot_rate_limit_stats()["throttled"] == call_count - 1
+
+
+@pytest.mark.parametrize("status, throttled", [[429, 1], [500, 0]])
+def test_rate_limited(mocker, mock_time, status, throttled):
+    """rate_limited should take tokens for each call and back off after a 429"""
+    func = mocker.Mock(side_effect=["data", ApiException(status=status)])
+    wrapped = rate_limited(func, tokens=2)
+    assert wrapped("deals", body=1) == "data"
+    func.assert_called_once_with("deals", body=1)
+    with pytest.raises(ApiException):
+        wrapped()
+    stats = hubspot_rate_limit_stats()
+    assert stats["requests"] == 2
+    assert stats["throttled"] == throttled
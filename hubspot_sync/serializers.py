@@ -3,21 +3,79 @@ Serializers for hubspot
 """
 
 import logging
+from collections import namedtuple
 from decimal import Decimal
 
+from django.db.models import Prefetch
 from mitol.hubspot_api.api import format_app_id
 from rest_framework import serializers
 
 from applications.api import get_required_submission_type
 from applications.constants import SUBMISSION_TYPE_STATE, AppStates
-from applications.models import BootcampApplication, BootcampApplicationLine
+from applications.models import (
+    BootcampApplication,
+    BootcampApplicationLine,
+    BootcampRunApplicationStep,
+)
 from ecommerce.models import Order
 from hubspot_sync.constants import HUBSPOT_DEAL_PREFIX
+from klasses.api import get_personal_prices
 from klasses.models import BootcampRun
 from main import settings
 
 log = logging.getLogger(__name__)
 
+# Data which is loaded up front for all applications when serializing many deals
+DealPreload = namedtuple("DealPreload", ["orders", "prices"])
+
+
+def get_deal_queryset():
+    """
+    Returns a queryset of applications with everything the deal serializer reads from the application
+    itself, so that serializing many of them takes a constant number of queries
+
+    Returns:
+        QuerySet of BootcampApplication: The applications
+    """
+    return BootcampApplication.objects.select_related(
+        "bootcamp_run__bootcamp"
+    ).prefetch_related(
+        "submissions",
+        Prefetch(
+            "bootcamp_run__application_steps",
+            queryset=BootcampRunApplicationStep.objects.select_related(
+                "application_step"
+            ).order_by("application_step__step_order"),
+        ),
+    )
+
+
+def preload_deal_data(applications):
+    """
+    Load the orders and prices of many applications with one query for orders and at most two for prices
+
+    Args:
+        applications (list of BootcampApplication): The applications which will be serialized
+
+    Returns:
+        DealPreload: Orders as lists of (status, total_price_paid) keyed by (user id, bootcamp run id),
+            and prices keyed by (user id, bootcamp run id)
+    """
+    user_runs = {
+        (application.user_id, application.bootcamp_run_id)
+        for application in applications
+    }
+    orders = {}
+    for user_id, bootcamp_run_id, status, total_price_paid in Order.objects.filter(
+        user_id__in={user_id for user_id, _ in user_runs},
+        line__bootcamp_run_id__in={bootcamp_run_id for _, bootcamp_run_id in user_runs},
+    ).values_list("user_id", "line__bootcamp_run_id", "status", "total_price_paid"):
+        if (user_id, bootcamp_run_id) in user_runs:
+            orders.setdefault((user_id, bootcamp_run_id), []).append(
+                (status, total_price_paid)
+            )
+    return DealPreload(orders=orders, prices=get_personal_prices(user_runs))
+
 
 class UniqueAppIdMixin(serializers.Serializer):
     """Unique App ID field for Hubspot serializers"""
@@ -56,9 +114,49 @@ class HubspotDealSerializer(serializers.ModelSerializer, UniqueAppIdMixin):
         """Get a formatted name for the deal"""
         return f"{HUBSPOT_DEAL_PREFIX}-{instance.id}"
 
+    @property
+    def _preload(self):
+        """The preloaded orders and prices, if many deals are being serialized"""
+        return self.context.get("deal_preload")
+
+    def _get_price(self, instance):
+        """Get the price the user has to pay for the application"""
+        if self._preload:
+            return self._preload.prices[(instance.user_id, instance.bootcamp_run_id)]
+        return instance.bootcamp_run.personal_price(instance.user)
+
+    def _get_orders(self, instance):
+        """Get the status and amount paid of each order for the application's bootcamp run"""
+        if self._preload:
+            return self._preload.orders.get(
+                (instance.user_id, instance.bootcamp_run_id), []
+            )
+        return list(
+            Order.objects.filter(
+                user_id=instance.user_id, line__bootcamp_run_id=instance.bootcamp_run_id
+            ).values_list("status", "total_price_paid")
+        )
+
+    def _get_required_submission_type(self, instance):
+        """Get the submission type of the first unsubmitted step, from prefetched steps if possible"""
+        if not self._preload:
+            return get_required_submission_type(instance)
+        submitted_step_ids = {
+            submission.run_application_step_id
+            for submission in instance.submissions.all()
+        }
+        return next(
+            (
+                run_step.application_step.submission_type
+                for run_step in instance.bootcamp_run.application_steps.all()
+                if run_step.id not in submitted_step_ids
+            ),
+            None,
+        )
+
     def get_amount(self, instance):
         """Get a string of the price"""
-        price = instance.bootcamp_run.personal_price(instance.user)
+        price = self._get_price(instance)
         if price:
             return price.to_eng_string()
         return "0.00"
@@ -71,7 +169,7 @@ class HubspotDealSerializer(serializers.ModelSerializer, UniqueAppIdMixin):
         """Get the application stage"""
         state = instance.state
         if state == AppStates.AWAITING_USER_SUBMISSIONS.value:
-            next_step = get_required_submission_type(instance)
+            next_step = self._get_required_submission_type(instance)
             if next_step:
                 state = SUBMISSION_TYPE_STATE.get(next_step, state)
         return state
@@ -79,20 +177,18 @@ class HubspotDealSerializer(serializers.ModelSerializer, UniqueAppIdMixin):
     def to_representation(self, instance):
         # Populate deal data
         data = super().to_representation(instance)
-        orders = Order.objects.filter(
-            user=instance.user, line__bootcamp_run_id=instance.bootcamp_run.id
-        )
-        if orders.exists():
+        orders = self._get_orders(instance)
+        if orders:
             amount_paid = Decimal(0)
             has_refunds = False
-            for order in orders:
-                if order.status == Order.FULFILLED:
-                    if order.total_price_paid < 0:
+            for status, total_price_paid in orders:
+                if status == Order.FULFILLED:
+                    if total_price_paid < 0:
                         has_refunds = True
-                    amount_paid += order.total_price_paid
+                    amount_paid += total_price_paid
 
             data["total_price_paid"] = amount_paid.to_eng_string()
-            if amount_paid >= instance.bootcamp_run.personal_price(instance.user):
+            if amount_paid >= self._get_price(instance):
                 data["dealstage"] = "shipped"
             elif amount_paid > 0 or has_refunds:
                 data["dealstage"] = "processed"
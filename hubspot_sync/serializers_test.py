@@ -15,6 +15,8 @@ from hubspot_sync.serializers import (
     HubspotDealSerializer,
     HubspotLineSerializer,
     HubspotProductSerializer,
+    get_deal_queryset,
+    preload_deal_data,
 )
 from klasses.factories import (
     BootcampRunFactory,
@@ -141,6 +143,55 @@ def test_deal_serializer_awaiting_submissions(settings, awaiting_submission_app)
     assert data == serialized_data
 
 
+def test_deal_serializer_preloaded(django_assert_num_queries, awaiting_submission_app):
+    """Serializing many deals with preloaded data should match serializing them one by one"""
+    paid_application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_PAYMENT.value
+    )
+    PersonalPriceFactory.create(
+        bootcamp_run=paid_application.bootcamp_run,
+        user=paid_application.user,
+        price=Decimal("50.00"),
+    )
+    for total_price_paid, status in [
+        ("20.00", Order.FULFILLED),
+        ("-5.00", Order.FULFILLED),
+        ("30.00", Order.CREATED),
+    ]:
+        order = OrderFactory.create(
+            application=paid_application,
+            user=paid_application.user,
+            total_price_paid=total_price_paid,
+            status=status,
+        )
+        LineFactory.create(order=order, bootcamp_run=paid_application.bootcamp_run)
+    other_application = BootcampApplicationFactory.create(
+        state=AppStates.AWAITING_RESUME.value
+    )
+    InstallmentFactory.create(bootcamp_run=other_application.bootcamp_run)
+    applications = sorted(
+        [paid_application, awaiting_submission_app.application, other_application],
+        key=lambda application: application.id,
+    )
+    expected = [
+        HubspotDealSerializer(instance=application).data for application in applications
+    ]
+
+    with django_assert_num_queries(6):
+        preloaded_applications = list(
+            get_deal_queryset()
+            .filter(id__in=[application.id for application in applications])
+            .order_by("id")
+        )
+        data = HubspotDealSerializer(
+            preloaded_applications,
+            many=True,
+            context={"deal_preload": preload_deal_data(preloaded_applications)},
+        ).data
+    assert data == expected
+    assert data[applications.index(paid_application)]["dealstage"] == "processed"
+
+
 def test_line_serializer(settings, hubspot_application):
     """Test that the HubspotLineSerializer correctly serializes a"""
     settings.MITOL_HUBSPOT_API_ID_PREFIX = "boot"
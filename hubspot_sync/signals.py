@@ -0,0 +1,19 @@
+"""Signals for hubspot_sync"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from mitol.hubspot_api.models import HubspotObject
+
+from hubspot_sync.id_cache import invalidate_hubspot_ids
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=HubspotObject,
+    dispatch_uid="hubspot_object_id_cache",
+)
+def invalidate_cached_hubspot_id(
+    sender, instance, **kwargs
+):  # pylint:disable=unused-argument
+    """Remove the cached hubspot id of the object whenever its HubspotObject changes"""
+    invalidate_hubspot_ids(instance.content_type_id, [instance.object_id])
@@ -0,0 +1,99 @@
+"""
+A queue of pending Hubspot syncs stored in redis, which coalesces repeated sync requests for the same object
+"""
+
+import time
+from typing import List
+
+from django_redis import get_redis_connection
+
+PENDING_SYNC_KEY = "hubspot_sync:pending:{hubspot_type}"
+
+
+def _pending_sync_key(hubspot_type: str) -> str:
+    """
+    Get the redis key of the pending set for a hubspot object type
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+
+    Returns:
+        str: The redis key
+    """
+    return PENDING_SYNC_KEY.format(hubspot_type=hubspot_type)
+
+
+def enqueue_hubspot_sync(hubspot_type: str, object_id: int):
+    """
+    Add an object to the pending set for its hubspot type. The time of the first request is kept,
+    so later requests for an object which is already pending are no-ops.
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        object_id(int): The id of the object to sync
+    """
+    get_redis_connection("default").zadd(
+        _pending_sync_key(hubspot_type), {object_id: time.time()}, nx=True
+    )
+
+
+def requeue_hubspot_syncs(hubspot_type: str, object_ids: List[int]):
+    """
+    Put objects back in the pending set after they were popped but couldn't be dispatched. Objects
+    which were queued again in the meantime keep their time.
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        object_ids(list of int): The ids of the objects to sync
+    """
+    if not object_ids:
+        return
+    now = time.time()
+    get_redis_connection("default").zadd(
+        _pending_sync_key(hubspot_type),
+        {object_id: now for object_id in object_ids},
+        nx=True,
+    )
+
+
+def pop_pending_hubspot_syncs(hubspot_type: str, window: int, limit: int) -> List[int]:
+    """
+    Remove and return objects which have been pending for at least the given window
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+        window(int): Number of seconds an object must be pending before it is synced
+        limit(int): The maximum number of object ids to return
+
+    Returns:
+        list(int): The object ids to sync
+    """
+    client = get_redis_connection("default")
+    key = _pending_sync_key(hubspot_type)
+    object_ids = client.zrangebyscore(
+        key, "-inf", time.time() - window, start=0, num=limit
+    )
+    if not object_ids:
+        return []
+    pipeline = client.pipeline()
+    for object_id in object_ids:
+        pipeline.zrem(key, object_id)
+    # Another worker may have popped some of these ids in the meantime
+    return [
+        int(object_id)
+        for object_id, removed in zip(object_ids, pipeline.execute())
+        if removed
+    ]
+
+
+def count_pending_hubspot_syncs(hubspot_type: str) -> int:
+    """
+    Count the objects waiting to be synced
+
+    Args:
+        hubspot_type(str): The hubspot object type (deal, contact, etc)
+
+    Returns:
+        int: The number of pending objects
+    """
+    return get_redis_connection("default").zcard(_pending_sync_key(hubspot_type))
@@ -0,0 +1,70 @@
+"""
+Tests for the pending Hubspot sync queue
+"""
+
+# pylint: disable=redefined-outer-name
+import pytest
+from django_redis import get_redis_connection
+
+from hubspot_sync.sync_queue import (
+    count_pending_hubspot_syncs,
+    enqueue_hubspot_sync,
+    pop_pending_hubspot_syncs,
+    requeue_hubspot_syncs,
+)
+
+HUBSPOT_TYPE = "test_deals"
+
+
+@pytest.fixture(autouse=True)
+def clear_queue():
+    """Remove any pending syncs left in redis"""
+    client = get_redis_connection("default")
+    client.delete(f"hubspot_sync:pending:{HUBSPOT_TYPE}")
+    yield
+    client.delete(f"hubspot_sync:pending:{HUBSPOT_TYPE}")
+
+
+def test_enqueue_coalesces(mocker):
+    """Repeated requests for the same object should be kept once, with the time of the first request"""
+    mock_time = mocker.patch("hubspot_sync.sync_queue.time.time", return_value=100)
+    enqueue_hubspot_sync(HUBSPOT_TYPE, 1)
+    mock_time.return_value = 200
+    enqueue_hubspot_sync(HUBSPOT_TYPE, 1)
+    enqueue_hubspot_sync(HUBSPOT_TYPE, 2)
+    assert count_pending_hubspot_syncs(HUBSPOT_TYPE) == 2
+
+    mock_time.return_value = 230
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == [1]
+    assert count_pending_hubspot_syncs(HUBSPOT_TYPE) == 1
+    mock_time.return_value = 260
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == [2]
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == []
+
+
+def test_pop_pending_limit():
+    """pop_pending_hubspot_syncs should return at most the limit of object ids"""
+    for object_id in range(5):
+        enqueue_hubspot_sync(HUBSPOT_TYPE, object_id)
+    assert len(pop_pending_hubspot_syncs(HUBSPOT_TYPE, 0, 3)) == 3
+    assert len(pop_pending_hubspot_syncs(HUBSPOT_TYPE, 0, 3)) == 2
+    assert count_pending_hubspot_syncs(HUBSPOT_TYPE) == 0
+
+
+def test_requeue_hubspot_syncs(mocker):
+    """requeue_hubspot_syncs should put popped objects back without changing objects queued in the meantime"""
+    mock_time = mocker.patch("hubspot_sync.sync_queue.time.time", return_value=100)
+    for object_id in [1, 2]:
+        enqueue_hubspot_sync(HUBSPOT_TYPE, object_id)
+    mock_time.return_value = 200
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == [1, 2]
+    enqueue_hubspot_sync(HUBSPOT_TYPE, 2)
+
+    mock_time.return_value = 230
+    requeue_hubspot_syncs(HUBSPOT_TYPE, [1, 2])
+    requeue_hubspot_syncs(HUBSPOT_TYPE, [])
+    assert count_pending_hubspot_syncs(HUBSPOT_TYPE) == 2
+    mock_time.return_value = 260
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == [2]
+    mock_time.return_value = 290
+    assert pop_pending_hubspot_syncs(HUBSPOT_TYPE, 60, 10) == [1]
@@ -3,8 +3,10 @@
 import logging
 
 from django.conf import settings
+from mitol.hubspot_api.api import HubspotObjectType
 
 from hubspot_sync import tasks
+from hubspot_sync.sync_queue import enqueue_hubspot_sync
 
 log = logging.getLogger(__name__)
 
@@ -20,14 +22,33 @@ def sync_hubspot_user(user):
         tasks.sync_contact_with_hubspot.delay(user.id)
 
 
+def submit_hubspot_user_form(email, hutk=None):
+    """
+    Trigger celery task to submit the Hubspot form for a new user, if the form is configured
+
+    Args:
+        email (str): The user's email address
+        hutk (str): The value of the hubspotutk cookie of the request
+    """
+    if settings.HUBSPOT_CONFIG.get("HUBSPOT_PORTAL_ID") and settings.HUBSPOT_CONFIG.get(
+        "HUBSPOT_CREATE_USER_FORM_ID"
+    ):
+        tasks.submit_hubspot_user_form.delay(email, hutk=hutk)
+
+
 def sync_hubspot_application(application):
     """
-    Trigger celery task to sync a deal to Hubspot
+    Queue a deal to be synced to Hubspot, or trigger a celery task to sync it right away
+    if the sync window is disabled
 
     Args:
         application (BootcampApplication): The BootcampApplication to sync
     """
-    if settings.MITOL_HUBSPOT_API_PRIVATE_TOKEN:
+    if not settings.MITOL_HUBSPOT_API_PRIVATE_TOKEN:
+        return
+    if settings.HUBSPOT_DEAL_SYNC_WINDOW > 0:
+        enqueue_hubspot_sync(HubspotObjectType.DEALS.value, application.id)
+    else:
         tasks.sync_deal_with_hubspot.delay(application.id)
 
 
@@ -7,6 +7,7 @@ import pytest
 from applications.models import BootcampApplication
 from ecommerce.models import Order
 from hubspot_sync.task_helpers import (
+    submit_hubspot_user_form,
     sync_hubspot_application,
     sync_hubspot_application_from_order,
     sync_hubspot_product,
@@ -25,32 +26,47 @@ def mock_hubspot(mocker):
     return mocker.patch("hubspot_sync.task_helpers.tasks", autospec=True)
 
 
+@pytest.fixture
+def mock_enqueue(mocker):
+    """Mock the pending deal sync queue"""
+    return mocker.patch("hubspot_sync.task_helpers.enqueue_hubspot_sync")
+
+
 @pytest.mark.parametrize("hubspot_key", [None, "abc"])
-def test_sync_hubspot_application(settings, mock_hubspot, hubspot_key):
-    """sync_hubspot_application task helper should call tasks if an API key is present"""
+@pytest.mark.parametrize("sync_window", [0, 30])
+def test_sync_hubspot_application(
+    settings, mock_hubspot, mock_enqueue, hubspot_key, sync_window
+):
+    """sync_hubspot_application task helper should queue the deal or call tasks if an API key is present"""
     settings.MITOL_HUBSPOT_API_PRIVATE_TOKEN = hubspot_key
-    application = BootcampApplication()
+    settings.HUBSPOT_DEAL_SYNC_WINDOW = sync_window
+    application = BootcampApplication(id=5)
     sync_hubspot_application(application)
-    if hubspot_key is not None:
+    if hubspot_key is not None and sync_window:
+        mock_enqueue.assert_called_once_with("deals", application.id)
+        mock_hubspot.sync_deal_with_hubspot.delay.assert_not_called()
+    elif hubspot_key is not None:
+        mock_enqueue.assert_not_called()
         mock_hubspot.sync_deal_with_hubspot.delay.assert_called_once_with(
             application.id
         )
     else:
+        mock_enqueue.assert_not_called()
         mock_hubspot.sync_deal_with_hubspot.delay.assert_not_called()
 
 
 @pytest.mark.parametrize("hubspot_key", [None, "abc"])
-def test_sync_hubspot_application_from_order(settings, mock_hubspot, hubspot_key):
-    """sync_hubspot_application_from_order task helper should call tasks if an API key is present"""
+def test_sync_hubspot_application_from_order(
+    settings, mock_hubspot, mock_enqueue, hubspot_key
+):
+    """sync_hubspot_application_from_order task helper should queue the deal if an API key is present"""
     settings.MITOL_HUBSPOT_API_PRIVATE_TOKEN = hubspot_key
-    order = Order(application=BootcampApplication())
+    order = Order(application=BootcampApplication(id=5))
     sync_hubspot_application_from_order(order)
     if hubspot_key is not None:
-        mock_hubspot.sync_deal_with_hubspot.delay.assert_called_once_with(
-            order.application.id
-        )
+        mock_enqueue.assert_called_once_with("deals", order.application.id)
     else:
-        mock_hubspot.sync_deal_with_hubspot.delay.assert_not_called()
+        mock_enqueue.assert_not_called()
 
 
 def test_sync_hubspot_application_from_order_no_application(settings, mocker):
@@ -87,3 +103,21 @@ def test_sync_hubspot_product(settings, mock_hubspot, hubspot_key):
         )
     else:
         mock_hubspot.sync_product_with_hubspot.delay.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "portal_id, form_id", [[None, "abc"], ["123", None], ["123", "abc"]]
+)
+def test_submit_hubspot_user_form(settings, mock_hubspot, portal_id, form_id):
+    """submit_hubspot_user_form helper should call the task if the form is configured"""
+    settings.HUBSPOT_CONFIG = {
+        "HUBSPOT_PORTAL_ID": portal_id,
+        "HUBSPOT_CREATE_USER_FORM_ID": form_id,
+    }
+    submit_hubspot_user_form("test@test.co", hutk="cookie")
+    if portal_id and form_id:
+        mock_hubspot.submit_hubspot_user_form.delay.assert_called_once_with(
+            "test@test.co", hutk="cookie"
+        )
+    else:
+        mock_hubspot.submit_hubspot_user_form.delay.assert_not_called()
@@ -3,11 +3,12 @@ Hubspot tasks
 """
 
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor
 from math import ceil
 from typing import List, Tuple
 
 import celery
+import requests
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
@@ -20,9 +21,15 @@ from mitol.hubspot_api.decorators import raise_429
 from mitol.hubspot_api.exceptions import TooManyRequestsException
 from mitol.hubspot_api.models import HubspotObject
 
-from applications.models import BootcampApplication
+from applications.models import BootcampApplication, BootcampApplicationLine
 from hubspot_sync import api
-from hubspot_sync.api import get_hubspot_id_for_object
+from hubspot_sync.constants import HUBSPOT_ASSOCIATION_BATCH_SIZE
+from hubspot_sync.id_cache import get_cached_hubspot_ids
+from hubspot_sync.rate_limit import call_hubspot_api
+from hubspot_sync.sync_queue import (
+    pop_pending_hubspot_syncs,
+    requeue_hubspot_syncs,
+)
 from main.celery import app
 
 log = logging.getLogger(__name__)
@@ -92,7 +99,6 @@ def sync_failed_contacts(chunk: list[int]) -> list[int]:
     for user_id in chunk:
         try:
             api.sync_contact_with_hubspot(user_id)
-            time.sleep(settings.HUBSPOT_TASK_DELAY / 1000)
         except ApiException:
             failed_ids.append(user_id)
     return failed_ids
@@ -123,6 +129,24 @@ def handle_failed_batch_chunk(chunk: list[int], hubspot_type: str) -> list[int]:
     return failed
 
 
+@app.task(
+    acks_late=True,
+    autoretry_for=(requests.exceptions.RequestException,),
+    max_retries=5,
+    retry_backoff=30,
+    retry_jitter=True,
+)
+def submit_hubspot_user_form(email: str, hutk: str = None):
+    """
+    Submit the Hubspot form which creates a contact for a new user
+
+    Args:
+        email(str): The user's email address
+        hutk(str): The value of the hubspotutk cookie when the user registered
+    """
+    api.submit_user_form(email, hutk=hutk)
+
+
 @app.task(
     acks_late=True,
     autoretry_for=(BlockingIOError, TooManyRequestsException),
@@ -189,6 +213,79 @@ def sync_deal_with_hubspot(application_id: int) -> str:
     return api.sync_deal_with_hubspot(application_id).id
 
 
+@app.task
+@single_task(60, raise_block=False, cache_name="default")
+def sync_pending_deals_with_hubspot() -> List[int]:
+    """
+    Sync deals which have been queued for at least HUBSPOT_DEAL_SYNC_WINDOW seconds. Deals which
+    already exist in Hubspot are batch updated along with their line items, new deals are synced
+    individually so that their line items and associations are created.
+
+    Returns:
+        list(int): The BootcampApplication ids which were synced
+    """
+    deal_content_type = ContentType.objects.get_for_model(BootcampApplication)
+    line_content_type = ContentType.objects.get_for_model(BootcampApplicationLine)
+    synced_ids = []
+    while True:
+        application_ids = pop_pending_hubspot_syncs(
+            HubspotObjectType.DEALS.value,
+            settings.HUBSPOT_DEAL_SYNC_WINDOW,
+            settings.HUBSPOT_DEAL_SYNC_BATCH_SIZE,
+        )
+        if not application_ids:
+            break
+        deals_to_update = []
+        lines_to_update = []
+        dispatched_ids = set()
+        try:
+            deal_hubspot_ids = get_cached_hubspot_ids(
+                deal_content_type.id, application_ids
+            )
+            line_ids = dict(
+                BootcampApplicationLine.objects.filter(
+                    application_id__in=application_ids
+                ).values_list("application_id", "id")
+            )
+            line_hubspot_ids = get_cached_hubspot_ids(
+                line_content_type.id, line_ids.values()
+            )
+            for application_id in application_ids:
+                line_id = line_ids.get(application_id)
+                if application_id in deal_hubspot_ids and line_id in line_hubspot_ids:
+                    deals_to_update.append(
+                        (application_id, deal_hubspot_ids[application_id])
+                    )
+                    lines_to_update.append((line_id, line_hubspot_ids[line_id]))
+                else:
+                    sync_deal_with_hubspot.delay(application_id)
+                    dispatched_ids.add(application_id)
+            if deals_to_update:
+                batch_update_hubspot_objects_chunked.delay(
+                    HubspotObjectType.DEALS.value,
+                    "bootcampapplication",
+                    deals_to_update,
+                )
+                batch_update_hubspot_objects_chunked.delay(
+                    HubspotObjectType.LINES.value,
+                    "bootcampapplicationline",
+                    lines_to_update,
+                )
+        except Exception:
+            # Queue the deals which weren't dispatched again, so they are synced by a later run
+            requeue_hubspot_syncs(
+                HubspotObjectType.DEALS.value,
+                [
+                    application_id
+                    for application_id in application_ids
+                    if application_id not in dispatched_ids
+                ],
+            )
+            raise
+        synced_ids.extend(application_ids)
+    return synced_ids
+
+
 @app.task(
     acks_late=True,
     autoretry_for=(TooManyRequestsException,),
@@ -216,17 +313,17 @@ def batch_create_hubspot_objects_chunked(
     chunked_ids = batched_chunks(hubspot_type, object_ids)
     errored_chunks = []
     last_error_status = None
+    content_type = ContentType.objects.get(model=ct_model_name)
     for chunk in chunked_ids:
         try:
-            response = HubspotApi().crm.objects.batch_api.create(
+            messages = api.make_sync_messages(ct_model_name, chunk)
+            response = call_hubspot_api(
+                HubspotApi().crm.objects.batch_api.create_with_http_info,
                 hubspot_type,
-                BatchInputSimplePublicObjectInput(
-                    inputs=[
-                        api.MODEL_FUNCTION_MAPPING[ct_model_name](obj_id)
-                        for obj_id in chunk
-                    ]
-                ),
+                BatchInputSimplePublicObjectInput(inputs=messages),
             )
+            messages_by_id = dict(zip([int(obj_id) for obj_id in chunk], messages))
+            fingerprints = {}
             for result in response.results:
                 if ct_model_name == "user":
                     object_id = (
@@ -239,17 +336,21 @@ def batch_create_hubspot_objects_chunked(
                 else:
                     object_id = result.properties["unique_app_id"].split("-")[-1]
                 HubspotObject.objects.update_or_create(
-                    content_type=ContentType.objects.get(model=ct_model_name),
+                    content_type=content_type,
                     hubspot_id=result.id,
                     object_id=object_id,
                 )
                 created_ids.append(result.id)
+                if int(object_id) in messages_by_id:
+                    fingerprints[int(object_id)] = api.make_sync_fingerprint(
+                        result.id, messages_by_id[int(object_id)].properties
+                    )
+            api.save_sync_fingerprints(content_type, fingerprints)
         except ApiException as ae:
             last_error_status = ae.status
             still_failed = handle_failed_batch_chunk(chunk, hubspot_type)
             if still_failed:
                 errored_chunks.append(still_failed)
-        time.sleep(settings.HUBSPOT_TASK_DELAY / 1000)
     if errored_chunks:
         raise ApiException(
             status=last_error_status,
@@ -281,25 +382,43 @@ def batch_update_hubspot_objects_chunked(
           list(str): list of processed hubspot ids
     """
     updated_ids = []
+    content_type = ContentType.objects.get(model=ct_model_name)
+    messages = dict(
+        zip(
+            [obj_id[0] for obj_id in object_ids],
+            api.make_sync_messages(ct_model_name, [obj_id[0] for obj_id in object_ids]),
+        )
+    )
+    fingerprints = {
+        object_id: api.make_sync_fingerprint(hubspot_id, messages[object_id].properties)
+        for object_id, hubspot_id in object_ids
+    }
+    # Skip objects whose properties haven't changed since they were last synced
+    last_fingerprints = api.get_sync_fingerprints(content_type, fingerprints.keys())
+    object_ids = [
+        obj_id
+        for obj_id in object_ids
+        if last_fingerprints.get(obj_id[0]) != fingerprints[obj_id[0]]
+    ]
     # Chunk again, by max allowed for object type (10 for contacts, 100 for all else)
-    chunked_ids = batched_chunks(hubspot_type, object_ids)
+    chunked_ids = batched_chunks(hubspot_type, object_ids) if object_ids else []
     errored_chunks = []
     last_error_status = None
     for chunk in chunked_ids:
         try:
             inputs = [
-                {
-                    "id": obj_id[1],
-                    "properties": api.MODEL_FUNCTION_MAPPING[ct_model_name](
-                        obj_id[0]
-                    ).properties,
-                }
+                {"id": obj_id[1], "properties": messages[obj_id[0]].properties}
                 for obj_id in chunk
             ]
-            response = HubspotApi().crm.objects.batch_api.update(
-                hubspot_type, BatchInputSimplePublicObjectInput(inputs=inputs)
+            response = call_hubspot_api(
+                HubspotApi().crm.objects.batch_api.update_with_http_info,
+                hubspot_type,
+                BatchInputSimplePublicObjectInput(inputs=inputs),
             )
             updated_ids.extend([result.id for result in response.results])
+            api.save_sync_fingerprints(
+                content_type, {obj_id[0]: fingerprints[obj_id[0]] for obj_id in chunk}
+            )
         except ApiException as ae:
             last_error_status = ae.status
             still_failed = handle_failed_batch_chunk(
@@ -307,7 +426,6 @@ def batch_update_hubspot_objects_chunked(
             )
             if still_failed:
                 errored_chunks.append(still_failed)
-        time.sleep(settings.HUBSPOT_TASK_DELAY / 1000)
     if errored_chunks:
         raise ApiException(
             status=last_error_status,
@@ -337,22 +455,16 @@ def batch_upsert_hubspot_objects(  # pylint:disable=too-many-arguments
     """
     content_type = ContentType.objects.get_by_natural_key(app_label, model_name)
     if not object_ids:
-        synced_object_ids = HubspotObject.objects.filter(
-            content_type=content_type
-        ).values_list("object_id", "hubspot_id")
-        unsynced_objects = content_type.model_class().objects.exclude(
-            id__in=[id[0] for id in synced_object_ids]
-        )
-        if model_name == "user":
-            unsynced_objects = unsynced_objects.filter(
-                is_active=True, email__contains="@"
-            ).exclude(social_auth__isnull=True)
-        unsynced_object_ids = unsynced_objects.values_list("id", flat=True)
-        object_ids = unsynced_object_ids if create else synced_object_ids
+        if create:
+            object_ids = api.get_unsynced_objects(content_type).values_list(
+                "id", flat=True
+            )
+        else:
+            object_ids = HubspotObject.objects.filter(
+                content_type=content_type
+            ).values_list("object_id", "hubspot_id")
     elif not create:
-        object_ids = HubspotObject.objects.filter(
-            content_type=content_type, object_id__in=object_ids
-        ).values_list("object_id", "hubspot_id")
+        object_ids = list(get_cached_hubspot_ids(content_type.id, object_ids).items())
     # Limit number of chunks to avoid rate limit
     chunk_size = max_concurrent_chunk_size(len(object_ids))
     chunk_func = (
@@ -377,57 +489,113 @@ def batch_upsert_hubspot_objects(  # pylint:disable=too-many-arguments
 @raise_429
 def batch_upsert_associations_chunked(application_ids: List[int]):
     """
-    Upsert batches of deal-contact and line-deal associations
+    Upsert batches of deal-contact and line-deal associations. The hubspot ids are loaded with one query,
+    and the batches of both association types are sent concurrently within the shared rate limit.
+    The association fingerprints of successful batches are saved, so single syncs don't repeat them.
 
     Args:
         application_ids(list): List of BootcampApplication IDs
     """
-    contact_associations_batch = []
-    line_associations_batch = []
-    hubspot_client = HubspotApi()
-    deal_count = len(application_ids)
-    for idx, application_id in enumerate(application_ids):
-        deal = BootcampApplication.objects.get(id=application_id)
-        contact_id = get_hubspot_id_for_object(deal.user)
-        deal_id = get_hubspot_id_for_object(deal)
-        line_id = get_hubspot_id_for_object(deal.line)
-        if contact_id and deal_id:
-            contact_associations_batch.append(
-                PublicAssociation(
-                    _from=deal_id,
-                    to=contact_id,
-                    type=HubspotAssociationType.DEAL_CONTACT.value,
+    applications = list(
+        BootcampApplication.objects.filter(id__in=application_ids)
+        .select_related("user", "line")
+        .order_by("id")
+    )
+    lines = [
+        application.line
+        for application in applications
+        if getattr(application, "line", None) is not None
+    ]
+    hubspot_ids = api.get_hubspot_ids_for_objects(
+        [*applications, *[application.user for application in applications], *lines]
+    )
+    # Each association is kept with the object and fingerprint to save once its batch succeeds
+    contact_associations = []
+    line_associations = []
+    for application in applications:
+        deal_id = hubspot_ids[application]
+        if not deal_id:
+            continue
+        contact_id = hubspot_ids[application.user]
+        if contact_id:
+            contact_associations.append(
+                (
+                    PublicAssociation(
+                        _from=deal_id,
+                        to=contact_id,
+                        type=HubspotAssociationType.DEAL_CONTACT.value,
+                    ),
+                    application.id,
+                    api.make_association_fingerprint(deal_id, contact=contact_id),
                 )
             )
-        if line_id and deal_id:
-            line_associations_batch.append(
-                PublicAssociation(
-                    _from=line_id,
-                    to=deal_id,
-                    type=HubspotAssociationType.LINE_DEAL.value,
+        line = getattr(application, "line", None)
+        if line is not None and hubspot_ids[line]:
+            line_associations.append(
+                (
+                    PublicAssociation(
+                        _from=hubspot_ids[line],
+                        to=deal_id,
+                        type=HubspotAssociationType.LINE_DEAL.value,
+                    ),
+                    line.id,
+                    api.make_association_fingerprint(hubspot_ids[line], deal=deal_id),
                 )
             )
-        if (
-            len(contact_associations_batch) == 100
-            or len(line_associations_batch) == 100
-            or idx == deal_count - 1
-        ):
-            hubspot_client.crm.associations.batch_api.create(
+
+    content_types = ContentType.objects.get_for_models(
+        BootcampApplication, BootcampApplicationLine
+    )
+    batch_api = HubspotApi().crm.associations.batch_api
+    association_batches = [
+        (from_type, to_type, content_type, batch)
+        for from_type, to_type, content_type, associations in [
+            (
                 HubspotObjectType.LINES.value,
                 HubspotObjectType.DEALS.value,
-                batch_input_public_association=BatchInputPublicAssociation(
-                    inputs=line_associations_batch
-                ),
-            )
-            line_associations_batch = []
-            hubspot_client.crm.associations.batch_api.create(
+                content_types[BootcampApplicationLine],
+                line_associations,
+            ),
+            (
                 HubspotObjectType.DEALS.value,
                 HubspotObjectType.CONTACTS.value,
+                content_types[BootcampApplication],
+                contact_associations,
+            ),
+        ]
+        for batch in chunks(associations, chunk_size=HUBSPOT_ASSOCIATION_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(
+        max_workers=settings.HUBSPOT_ASSOCIATION_WORKERS,
+        thread_name_prefix="hubspot-associations",
+    ) as executor:
+        futures = [
+            executor.submit(
+                call_hubspot_api,
+                batch_api.create_with_http_info,
+                from_type,
+                to_type,
                 batch_input_public_association=BatchInputPublicAssociation(
-                    inputs=contact_associations_batch
+                    inputs=[association for association, _, _ in batch]
                 ),
             )
-            contact_associations_batch = []
+            for from_type, to_type, _, batch in association_batches
+        ]
+    # Raise the first error once all batches were attempted and the successful ones were recorded
+    errors = []
+    for future, (_, _, content_type, batch) in zip(futures, association_batches):
+        try:
+            future.result()
+        except Exception as exc:  # pylint:disable=broad-except
+            errors.append(exc)
+            continue
+        api.save_sync_fingerprints(
+            content_type,
+            {object_id: fingerprint for _, object_id, fingerprint in batch},
+            field="association_fingerprint",
+        )
+    if errors:
+        raise errors[0]
     return application_ids
 
 
@@ -4,6 +4,8 @@ Tests for hubspot_sync tasks
 
 # pylint: disable=redefined-outer-name
 import pytest
+import requests
+from celery.exceptions import Retry
 from django.contrib.contenttypes.models import ContentType
 from hubspot.crm.associations import BatchInputPublicAssociation, PublicAssociation
 from hubspot.crm.objects import ApiException, BatchInputSimplePublicObjectInput
@@ -14,7 +16,7 @@ from mitol.hubspot_api.models import HubspotObject
 
 from applications.factories import BootcampApplicationFactory
 from hubspot_sync import tasks
-from hubspot_sync.api import make_contact_sync_message
+from hubspot_sync.api import make_contact_sync_message, sync_deal_with_hubspot
 from hubspot_sync.tasks import (
     batch_upsert_associations,
     batch_upsert_associations_chunked,
@@ -172,20 +174,22 @@ def test_batch_update_hubspot_objects_chunked(mocker, id_count):
         )
     )
     mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
-    mock_hubspot_api.return_value.crm.objects.batch_api.update.return_value = (
+    mock_hubspot_api.return_value.crm.objects.batch_api.update_with_http_info.return_value = (
         mocker.Mock(
             results=[SimplePublicObjectFactory(id=mock_id[1]) for mock_id in mock_ids]
-        )
+        ),
+        200,
+        {},
     )
     expected_batches = 1 if id_count == 5 else 2
     tasks.batch_update_hubspot_objects_chunked(
         HubspotObjectType.CONTACTS.value, "user", mock_ids
     )
     assert (
-        mock_hubspot_api.return_value.crm.objects.batch_api.update.call_count
+        mock_hubspot_api.return_value.crm.objects.batch_api.update_with_http_info.call_count
         == expected_batches
     )
-    mock_hubspot_api.return_value.crm.objects.batch_api.update.assert_any_call(
+    mock_hubspot_api.return_value.crm.objects.batch_api.update_with_http_info.assert_any_call(
         HubspotObjectType.CONTACTS.value,
         BatchInputSimplePublicObjectInput(
             inputs=[
@@ -199,14 +203,60 @@ def test_batch_update_hubspot_objects_chunked(mocker, id_count):
     )
 
 
+def test_batch_update_hubspot_objects_chunked_unchanged(mocker):
+    """batch_update_hubspot_objects_chunked should skip objects which haven't changed since the last sync"""
+    users = UserFactory.create_batch(3)
+    object_ids = [
+        (
+            user.id,
+            HubspotObjectFactory.create(
+                content_object=user,
+                content_type=ContentType.objects.get_for_model(user),
+                object_id=user.id,
+            ).hubspot_id,
+        )
+        for user in users
+    ]
+    mock_update = mocker.patch(
+        "hubspot_sync.tasks.HubspotApi"
+    ).return_value.crm.objects.batch_api.update_with_http_info
+    mock_update.return_value = (
+        mocker.Mock(results=[SimplePublicObjectFactory(id=object_ids[0][1])]),
+        200,
+        {},
+    )
+
+    tasks.batch_update_hubspot_objects_chunked(
+        HubspotObjectType.CONTACTS.value, "user", object_ids
+    )
+    assert mock_update.call_count == 1
+    assert (
+        tasks.batch_update_hubspot_objects_chunked(
+            HubspotObjectType.CONTACTS.value, "user", object_ids
+        )
+        == []
+    )
+    assert mock_update.call_count == 1
+
+    users[1].profile.name = "A New Name"
+    users[1].profile.save()
+    tasks.batch_update_hubspot_objects_chunked(
+        HubspotObjectType.CONTACTS.value, "user", object_ids
+    )
+    assert mock_update.call_count == 2
+    assert [item["id"] for item in mock_update.call_args.args[1].inputs] == [
+        object_ids[1][1]
+    ]
+
+
 @pytest.mark.parametrize(
     "status, expected_error", [[429, TooManyRequestsException], [500, ApiException]]
 )
 def test_batch_update_hubspot_objects_chunked_error(mocker, status, expected_error):
     """batch_update_hubspot_objects_chunked should raise expected exception"""
     mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
-    mock_hubspot_api.return_value.crm.objects.batch_api.update.side_effect = (
-        ApiException(status=status)
+    mock_hubspot_api.return_value.crm.objects.batch_api.update_with_http_info.side_effect = ApiException(
+        status=status
     )
     mock_sync_contacts = mocker.patch(
         "hubspot_sync.tasks.api.sync_contact_with_hubspot",
@@ -229,20 +279,27 @@ def test_batch_create_hubspot_objects_chunked(mocker, id_count):
     contacts = UserFactory.create_batch(id_count)
     mock_ids = sorted([contact.id for contact in contacts])
     mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
-    mock_hubspot_api.return_value.crm.objects.batch_api.update.return_value = (
+    mock_hubspot_api.return_value.crm.objects.batch_api.create_with_http_info.return_value = (
         mocker.Mock(
-            results=[SimplePublicObjectFactory(id=mock_id) for mock_id in mock_ids]
-        )
+            results=[
+                SimplePublicObjectFactory(
+                    id=f"10001{contact.id}", properties={"email": contact.email}
+                )
+                for contact in contacts
+            ]
+        ),
+        200,
+        {},
     )
     expected_batches = 1 if id_count == 5 else 2
     tasks.batch_create_hubspot_objects_chunked(
         HubspotObjectType.CONTACTS.value, "user", mock_ids
     )
     assert (
-        mock_hubspot_api.return_value.crm.objects.batch_api.create.call_count
+        mock_hubspot_api.return_value.crm.objects.batch_api.create_with_http_info.call_count
         == expected_batches
     )
-    mock_hubspot_api.return_value.crm.objects.batch_api.create.assert_any_call(
+    mock_hubspot_api.return_value.crm.objects.batch_api.create_with_http_info.assert_any_call(
         HubspotObjectType.CONTACTS.value,
         BatchInputSimplePublicObjectInput(
             inputs=[
@@ -259,8 +316,8 @@ def test_batch_create_hubspot_objects_chunked(mocker, id_count):
 def test_batch_create_hubspot_objects_chunked_error(mocker, status, expected_error):
     """batch_create_hubspot_objects_chunked raise expected exception"""
     mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
-    mock_hubspot_api.return_value.crm.objects.batch_api.create.side_effect = (
-        ApiException(status=status)
+    mock_hubspot_api.return_value.crm.objects.batch_api.create_with_http_info.side_effect = ApiException(
+        status=status
     )
     mock_sync_contact = mocker.patch(
         "hubspot_sync.tasks.api.sync_contact_with_hubspot",
@@ -306,6 +363,11 @@ def test_batch_upsert_associations_chunked(settings, mocker):
     batch_upsert_associations_chunked should make expected API calls
     """
     mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
+    mock_hubspot_api.return_value.crm.associations.batch_api.create_with_http_info.return_value = (
+        None,
+        200,
+        {},
+    )
     applications = BootcampApplicationFactory.create_batch(5)
     expected_line_associations = [
         PublicAssociation(
@@ -338,14 +400,14 @@ def test_batch_upsert_associations_chunked(settings, mocker):
         for app in applications
     ]
     batch_upsert_associations_chunked.delay([app.id for app in applications])
-    mock_hubspot_api.return_value.crm.associations.batch_api.create.assert_any_call(
+    mock_hubspot_api.return_value.crm.associations.batch_api.create_with_http_info.assert_any_call(
         HubspotObjectType.LINES.value,
         HubspotObjectType.DEALS.value,
         batch_input_public_association=BatchInputPublicAssociation(
             inputs=expected_line_associations
         ),
     )
-    mock_hubspot_api.return_value.crm.associations.batch_api.create.assert_any_call(
+    mock_hubspot_api.return_value.crm.associations.batch_api.create_with_http_info.assert_any_call(
         HubspotObjectType.DEALS.value,
         HubspotObjectType.CONTACTS.value,
         batch_input_public_association=BatchInputPublicAssociation(
@@ -354,6 +416,86 @@ def test_batch_upsert_associations_chunked(settings, mocker):
     )
 
 
+def test_batch_sync_then_single_sync_skipped(mocker):
+    """A single deal sync should be skipped after a batch sync of the same deal and its associations"""
+    mock_hubspot_api = mocker.patch("hubspot_sync.tasks.HubspotApi")
+    batch_api = mock_hubspot_api.return_value.crm.objects.batch_api
+    mock_hubspot_api.return_value.crm.associations.batch_api.create_with_http_info.return_value = (
+        None,
+        200,
+        {},
+    )
+    application = BootcampApplicationFactory.create()
+    hubspot_ids = {
+        obj: HubspotObjectFactory.create(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.id,
+            content_object=obj,
+        ).hubspot_id
+        for obj in [
+            application,
+            application.user,
+            application.line,
+            application.bootcamp_run,
+        ]
+    }
+    for hubspot_type, ct_model_name, obj in [
+        (HubspotObjectType.DEALS.value, "bootcampapplication", application),
+        (HubspotObjectType.LINES.value, "bootcampapplicationline", application.line),
+    ]:
+        batch_api.update_with_http_info.return_value = (
+            mocker.Mock(results=[SimplePublicObjectFactory(id=hubspot_ids[obj])]),
+            200,
+            {},
+        )
+        tasks.batch_update_hubspot_objects_chunked(
+            hubspot_type, ct_model_name, [(obj.id, hubspot_ids[obj])]
+        )
+    batch_upsert_associations_chunked([application.id])
+
+    mock_upsert = mocker.patch("hubspot_sync.api.upsert_object_request")
+    mock_associate = mocker.patch("hubspot_sync.api.associate_objects_request")
+    assert sync_deal_with_hubspot(application.id).id == hubspot_ids[application]
+    mock_upsert.assert_not_called()
+    mock_associate.assert_not_called()
+
+
+def test_batch_upsert_associations_chunked_batches(settings, mocker):
+    """
+    batch_upsert_associations_chunked should flush each association type in its own batches and
+    only look up objects without a HubspotObject in Hubspot
+    """
+    settings.HUBSPOT_ASSOCIATION_WORKERS = 2
+    mocker.patch("hubspot_sync.tasks.HUBSPOT_ASSOCIATION_BATCH_SIZE", 2)
+    mock_create = mocker.patch(
+        "hubspot_sync.tasks.HubspotApi"
+    ).return_value.crm.associations.batch_api.create_with_http_info
+    mock_create.return_value = (None, 200, {})
+    mock_get_hubspot_id = mocker.patch(
+        "hubspot_sync.api.get_hubspot_id_for_object", return_value=None
+    )
+    applications = BootcampApplicationFactory.create_batch(3)
+    for app in applications:
+        for obj in [app, app.line] + ([app.user] if app != applications[0] else []):
+            HubspotObjectFactory.create(
+                content_type=ContentType.objects.get_for_model(obj),
+                object_id=obj.id,
+                content_object=obj,
+            )
+
+    batch_upsert_associations_chunked([app.id for app in applications])
+    mock_get_hubspot_id.assert_called_once_with(applications[0].user)
+    batch_sizes = sorted(
+        (call.args[1], len(call.kwargs["batch_input_public_association"].inputs))
+        for call in mock_create.call_args_list
+    )
+    assert batch_sizes == [
+        (HubspotObjectType.CONTACTS.value, 2),
+        (HubspotObjectType.DEALS.value, 1),
+        (HubspotObjectType.DEALS.value, 2),
+    ]
+
+
 @pytest.mark.parametrize("mode", ["update", "create"])
 def test_sync_failed_contacts(mocker, mode):
     """sync_failed_contacts should try to sync each contact and return a list of failed contact ids"""
@@ -397,3 +539,100 @@ def test_handle_failed_batch_chunk(mocker, for_contacts, has_errors):
             f"{expected_sync_result}",
             hubspot_type,
         )
+
+
+def test_sync_pending_deals_with_hubspot(settings, mocker):
+    """sync_pending_deals_with_hubspot should batch update synced deals and individually sync new ones"""
+    settings.HUBSPOT_DEAL_SYNC_BATCH_SIZE = 2
+    synced_app, new_app, line_only_app = BootcampApplicationFactory.create_batch(3)
+    for obj in [synced_app, synced_app.line, line_only_app.line]:
+        HubspotObjectFactory.create(
+            content_object=obj,
+            object_id=obj.id,
+            hubspot_id=f"hs-{obj._meta.model_name}-{obj.id}",
+        )
+    mock_pop = mocker.patch(
+        "hubspot_sync.tasks.pop_pending_hubspot_syncs",
+        side_effect=[[synced_app.id, new_app.id], [line_only_app.id], []],
+    )
+    mock_update = mocker.patch(
+        "hubspot_sync.tasks.batch_update_hubspot_objects_chunked.delay"
+    )
+    mock_sync_deal = mocker.patch("hubspot_sync.tasks.sync_deal_with_hubspot.delay")
+    assert tasks.sync_pending_deals_with_hubspot() == [
+        synced_app.id,
+        new_app.id,
+        line_only_app.id,
+    ]
+    mock_pop.assert_any_call(
+        HubspotObjectType.DEALS.value, settings.HUBSPOT_DEAL_SYNC_WINDOW, 2
+    )
+    assert mock_update.call_count == 2
+    mock_update.assert_any_call(
+        HubspotObjectType.DEALS.value,
+        "bootcampapplication",
+        [(synced_app.id, f"hs-bootcampapplication-{synced_app.id}")],
+    )
+    mock_update.assert_any_call(
+        HubspotObjectType.LINES.value,
+        "bootcampapplicationline",
+        [(synced_app.line.id, f"hs-bootcampapplicationline-{synced_app.line.id}")],
+    )
+    assert mock_sync_deal.call_count == 2
+    mock_sync_deal.assert_any_call(new_app.id)
+    mock_sync_deal.assert_any_call(line_only_app.id)
+
+
+def test_sync_pending_deals_with_hubspot_dispatch_error(mocker):
+    """sync_pending_deals_with_hubspot should queue deals again if they couldn't be dispatched"""
+    synced_app, new_app, other_new_app = BootcampApplicationFactory.create_batch(3)
+    for obj in [synced_app, synced_app.line]:
+        HubspotObjectFactory.create(
+            content_object=obj,
+            object_id=obj.id,
+            hubspot_id=f"hs-{obj._meta.model_name}-{obj.id}",
+        )
+    mocker.patch(
+        "hubspot_sync.tasks.pop_pending_hubspot_syncs",
+        return_value=[synced_app.id, new_app.id, other_new_app.id],
+    )
+    mock_requeue = mocker.patch("hubspot_sync.tasks.requeue_hubspot_syncs")
+    mocker.patch(
+        "hubspot_sync.tasks.sync_deal_with_hubspot.delay",
+        side_effect=[None, ConnectionError],
+    )
+    with pytest.raises(ConnectionError):
+        tasks.sync_pending_deals_with_hubspot()
+    mock_requeue.assert_called_once_with(
+        HubspotObjectType.DEALS.value, [synced_app.id, other_new_app.id]
+    )
+
+
+def test_sync_pending_deals_with_hubspot_lookup_error(mocker):
+    """sync_pending_deals_with_hubspot should queue all deals again if their Hubspot ids can't be looked up"""
+    application_ids = [
+        application.id for application in BootcampApplicationFactory.create_batch(2)
+    ]
+    mocker.patch(
+        "hubspot_sync.tasks.pop_pending_hubspot_syncs", return_value=application_ids
+    )
+    mocker.patch(
+        "hubspot_sync.tasks.get_cached_hubspot_ids", side_effect=ConnectionError
+    )
+    mock_requeue = mocker.patch("hubspot_sync.tasks.requeue_hubspot_syncs")
+    mock_sync_deal = mocker.patch("hubspot_sync.tasks.sync_deal_with_hubspot.delay")
+    with pytest.raises(ConnectionError):
+        tasks.sync_pending_deals_with_hubspot()
+    mock_requeue.assert_called_once_with(HubspotObjectType.DEALS.value, application_ids)
+    mock_sync_deal.assert_not_called()
+
+
+def test_submit_hubspot_user_form(mocker):
+    """submit_hubspot_user_form should submit the form, and be retried after connection errors"""
+    mock_submit = mocker.patch("hubspot_sync.tasks.api.submit_user_form")
+    tasks.submit_hubspot_user_form.delay("test@test.co", hutk="cookie")
+    mock_submit.assert_called_once_with("test@test.co", hutk="cookie")
+
+    mock_submit.side_effect = requests.exceptions.ConnectTimeout
+    with pytest.raises(Retry):
+        tasks.submit_hubspot_user_form.delay("test@test.co", hutk="cookie")
@@ -3,6 +3,8 @@ API functionality for bootcamps
 """
 
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 
 import pytz
@@ -12,12 +14,96 @@ from django.db.models import Sum
 from applications.constants import AppStates
 from ecommerce.models import Line, Order
 from klasses.constants import DATE_RANGE_MONTH_FMT, ENROLL_CHANGE_STATUS_DEFERRED
-from klasses.models import BootcampRun, BootcampRunEnrollment
+from klasses.models import (
+    BootcampRun,
+    BootcampRunEnrollment,
+    Installment,
+    PersonalPrice,
+)
 from main import features
 from novoed import tasks as novoed_tasks
 
 log = logging.getLogger(__name__)
 
+# Prices resolved during the current request, keyed by (user id, bootcamp run id)
+_personal_price_memo = ContextVar("personal_price_memo", default=None)
+
+
+@contextmanager
+def personal_price_memo():
+    """
+    Remember the prices resolved by get_personal_prices until the block exits. If a memo is
+    already active it is reused.
+    """
+    if _personal_price_memo.get() is not None:
+        yield
+        return
+    token = _personal_price_memo.set({})
+    try:
+        yield
+    finally:
+        _personal_price_memo.reset(token)
+
+
+def clear_personal_price_memo():
+    """Forget the remembered prices, if a memo is active"""
+    memo = _personal_price_memo.get()
+    if memo is not None:
+        memo.clear()
+
+
+def _get_id(obj):
+    """Returns the id of a model object, or the argument itself if it is already an id"""
+    return getattr(obj, "id", obj)
+
+
+def get_personal_prices(user_runs):
+    """
+    Resolve the prices that users have to pay for bootcamp runs, which is their personal price
+    if they have one or else the full price of the run. Prices which aren't remembered by the
+    active memo are fetched with one query for personal prices and one for the full prices.
+
+    Args:
+        user_runs (iterable of tuple): Pairs of users and bootcamp runs, or of their ids
+
+    Returns:
+        dict: The prices keyed by (user id, bootcamp run id). The price is None for a run without installments.
+    """
+    keys = {(_get_id(user), _get_id(bootcamp_run)) for user, bootcamp_run in user_runs}
+    memo = _personal_price_memo.get()
+    if memo is None:
+        memo = {}
+    prices = {key: memo[key] for key in keys if key in memo}
+    missing = keys - prices.keys()
+    if not missing:
+        return prices
+
+    for user_id, bootcamp_run_id, price in PersonalPrice.objects.filter(
+        user_id__in={user_id for user_id, _ in missing},
+        bootcamp_run_id__in={bootcamp_run_id for _, bootcamp_run_id in missing},
+    ).values_list("user_id", "bootcamp_run_id", "price"):
+        if (user_id, bootcamp_run_id) in missing:
+            prices[(user_id, bootcamp_run_id)] = price
+
+    without_personal_price = missing - prices.keys()
+    if without_personal_price:
+        run_prices = dict(
+            Installment.objects.filter(
+                bootcamp_run_id__in={
+                    bootcamp_run_id for _, bootcamp_run_id in without_personal_price
+                }
+            )
+            .order_by()
+            .values("bootcamp_run_id")
+            .annotate(price=Sum("amount"))
+            .values_list("bootcamp_run_id", "price")
+        )
+        for key in without_personal_price:
+            prices[key] = run_prices.get(key[1])
+
+    memo.update({key: prices[key] for key in missing})
+    return prices
+
 
 def deactivate_run_enrollment(
     *, run_enrollment=None, user=None, bootcamp_run=None, change_status=None
@@ -67,8 +153,8 @@ def adjust_app_state_for_new_price(user, bootcamp_run, new_price=None):
     Args:
         user (User): The user whose application may be affected
         bootcamp_run (BootcampRun): The bootcamp run of the application that may be affected
-        new_price (Optional[Any[int, Decimal]]): The new total price of the bootcamp run (if None, the bootcamp run's
-            normal price will be used)
+        new_price (Optional[Any[int, Decimal]]): The new total price of the bootcamp run (if None, the user's
+            personal price or else the bootcamp run's normal price will be used)
 
     Returns:
         Optional[BootcampApplication]: The bootcamp application for the user/run referred to by the personal price
@@ -78,7 +164,9 @@ def adjust_app_state_for_new_price(user, bootcamp_run, new_price=None):
         order__user=user, bootcamp_run=bootcamp_run, order__status=Order.FULFILLED
     ).aggregate(aggregate_total_paid=Sum("price"))
     total_paid = total_paid_qset["aggregate_total_paid"] or 0
-    new_price = new_price if new_price is not None else bootcamp_run.price
+    new_price = (
+        new_price if new_price is not None else bootcamp_run.personal_price(user)
+    )
     needs_payment = total_paid < new_price
     application = user.bootcamp_applications.filter(
         bootcamp_run=bootcamp_run,
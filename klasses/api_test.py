@@ -26,6 +26,8 @@ from klasses.api import (
     deactivate_run_enrollment,
     defer_enrollment,
     fetch_bootcamp_run,
+    get_personal_prices,
+    personal_price_memo,
 )
 from klasses.constants import (
     ENROLL_CHANGE_STATUS_DEFERRED,
@@ -40,6 +42,7 @@ from klasses.factories import (
 )
 from klasses.models import BootcampRun, BootcampRunEnrollment
 from main import features
+from profiles.factories import UserFactory
 
 RUN_PRICE = 1000
 
@@ -226,6 +229,53 @@ def test_adjust_app_state_for_zero_price():
     assert returned_app.state == AppStates.COMPLETE.value
 
 
+@pytest.mark.django_db
+def test_get_personal_prices(django_assert_num_queries):
+    """get_personal_prices should resolve personal prices, or else full prices, in one query each"""
+    runs = BootcampRunFactory.create_batch(3)
+    for run in runs[:2]:
+        InstallmentFactory.create(bootcamp_run=run, amount=RUN_PRICE)
+    users = UserFactory.create_batch(2)
+    personal_price = PersonalPriceFactory.create(
+        user=users[0], bootcamp_run=runs[0], price=123
+    )
+    # A personal price for another pair of the same users and runs shouldn't be used
+    PersonalPriceFactory.create(user=users[1], bootcamp_run=runs[1], price=456)
+
+    with django_assert_num_queries(2):
+        prices = get_personal_prices(
+            [
+                (users[0], runs[0]),
+                (users[0], runs[1]),
+                (users[0].id, runs[2].id),
+            ]
+        )
+    assert prices == {
+        (users[0].id, runs[0].id): personal_price.price,
+        (users[0].id, runs[1].id): RUN_PRICE,
+        (users[0].id, runs[2].id): None,
+    }
+
+
+@pytest.mark.django_db
+def test_personal_price_memo(django_assert_num_queries):
+    """Prices resolved inside a personal price memo should be remembered until a price changes"""
+    run = BootcampRunFactory.create()
+    InstallmentFactory.create(bootcamp_run=run, amount=RUN_PRICE)
+    user = UserFactory.create()
+
+    with personal_price_memo():
+        assert run.personal_price(user) == RUN_PRICE
+        with django_assert_num_queries(0), personal_price_memo():
+            assert run.personal_price(user) == RUN_PRICE
+            assert get_personal_prices([(user, run)]) == {(user.id, run.id): RUN_PRICE}
+        PersonalPriceFactory.create(user=user, bootcamp_run=run, price=123)
+        assert run.personal_price(user) == 123
+
+    with django_assert_num_queries(1):
+        assert run.personal_price(user) == 123
+
+
 @pytest.mark.django_db
 def test_fetch_bootcamp_run():
     """fetch_bootcamp_run should fetch a bootcamp run with a field value that matches the given property"""
@@ -0,0 +1,14 @@
+"""Middleware classes for bootcamps"""
+
+from klasses.api import personal_price_memo
+
+
+class PersonalPriceMemoMiddleware:
+    """Remember the personal prices resolved while handling a request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with personal_price_memo():
+            return self.get_response(request)
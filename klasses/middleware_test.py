@@ -0,0 +1,17 @@
+"""Tests for klasses.middleware"""
+
+# pylint: disable=protected-access
+from klasses import api
+from klasses.middleware import PersonalPriceMemoMiddleware
+
+
+def test_personal_price_memo_middleware(rf, mocker):
+    """A personal price memo should be active while the request is handled"""
+    memos = []
+    get_response = mocker.Mock(
+        side_effect=lambda request: memos.append(api._personal_price_memo.get())
+    )
+    middleware = PersonalPriceMemoMiddleware(get_response)
+    middleware(rf.get("/"))
+    assert memos == [{}]
+    assert api._personal_price_memo.get() is None
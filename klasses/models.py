@@ -1,10 +1,8 @@
 """Models for bootcamps"""
 
-import datetime
 import uuid
-from functools import partial
+from functools import cached_property, partial
 
-import pytz
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
@@ -53,11 +51,89 @@ class Bootcamp(models.Model):
         return "Bootcamp {title}".format(title=self.title)
 
 
+class InstallmentSchedule:
+    """
+    The installments of a bootcamp run ordered by deadline, with the cumulative amount due by each deadline
+    """
+
+    def __init__(self, installments):
+        """
+        Args:
+            installments (iterable of Installment): All installments of one bootcamp run
+        """
+        self.installments = sorted(
+            installments, key=lambda installment: installment.deadline
+        )
+        self.amounts_due = []
+        total = None
+        for installment in self.installments:
+            total = installment.amount if total is None else total + installment.amount
+            self.amounts_due.append(total)
+
+    @property
+    def price(self):
+        """The sum of all installments, or None if there are none"""
+        return self.amounts_due[-1] if self.amounts_due else None
+
+    @property
+    def payment_deadline(self):
+        """The deadline of the last installment, or None if there are none"""
+        return self.installments[-1].deadline if self.installments else None
+
+    def _next_index(self, now=None):
+        """Returns the index of the first installment which isn't past its deadline, or None"""
+        now = now or now_in_utc()
+        return next(
+            (
+                index
+                for index, installment in enumerate(self.installments)
+                if installment.deadline >= now
+            ),
+            None,
+        )
+
+    def next_installment(self, now=None):
+        """
+        Args:
+            now (datetime.datetime): The time to compare deadlines to. Defaults to the current time.
+
+        Returns:
+            Installment: The first installment which isn't past its deadline, or None
+        """
+        index = self._next_index(now)
+        return None if index is None else self.installments[index]
+
+    def total_due_by_next_deadline(self, now=None):
+        """
+        Args:
+            now (datetime.datetime): The time to compare deadlines to. Defaults to the current time.
+
+        Returns:
+            Decimal: The amount due by the next deadline, or the full price if all deadlines have passed
+        """
+        index = self._next_index(now)
+        return self.price if index is None else self.amounts_due[index]
+
+
+class BootcampRunQuerySet(models.QuerySet):
+    """Custom QuerySet for BootcampRun"""
+
+    def with_installment_schedules(self):
+        """Prefetches the installments of the runs so that their installment schedules need no further queries"""
+        return self.prefetch_related(
+            models.Prefetch(
+                "installment_set", queryset=Installment.objects.order_by("deadline")
+            )
+        )
+
+
 class BootcampRun(models.Model):
     """
     A class within a bootcamp
     """
 
+    objects = BootcampRunQuerySet.as_manager()
+
     bootcamp = models.ForeignKey(Bootcamp, on_delete=models.CASCADE)
     title = models.TextField(blank=True)
     source = models.CharField(
@@ -82,12 +158,24 @@ class BootcampRun(models.Model):
         """Gets the associated BootcampRunPage"""
         return getattr(self, "bootcamprunpage", None)
 
+    @cached_property
+    def installment_schedule(self):
+        """
+        Get the schedule of installments, which is loaded once and uses prefetched installments if there are any
+        """
+        return InstallmentSchedule(self.installment_set.all())
+
+    def clear_installment_schedule(self):
+        """Forget the loaded installments, so that the schedule is loaded again the next time it is used"""
+        self.__dict__.pop("installment_schedule", None)
+        getattr(self, "_prefetched_objects_cache", {}).pop("installment_set", None)
+
     @property
     def price(self):
         """
         Get price, the sum of all installments
         """
-        return self.installment_set.aggregate(price=models.Sum("amount"))["price"]
+        return self.installment_schedule.price
 
     @property
     def formatted_date_range(self):
@@ -141,28 +229,25 @@ class BootcampRun(models.Model):
         """
         Get the overall payment deadline
         """
-        return self.installment_set.aggregate(payment_deadline=models.Max("deadline"))[
-            "payment_deadline"
-        ]
+        return self.installment_schedule.payment_deadline
 
     @property
     def next_installment(self):
         """
         Get the next installment
         """
-        return self.installment_set.filter(
-            deadline__gte=datetime.datetime.now(tz=pytz.UTC)
-        ).first()
+        return self.installment_schedule.next_installment()
 
     @property
     def next_payment_deadline_days(self):
         """
         Returns the number of days until the next payment is due
         """
-        next_installment = self.next_installment
+        now = now_in_utc()
+        next_installment = self.installment_schedule.next_installment(now)
         if next_installment is None:
             return
-        due_in = next_installment.deadline - datetime.datetime.now(tz=pytz.UTC)
+        due_in = next_installment.deadline - now
         return due_in.days
 
     @property
@@ -170,12 +255,7 @@ class BootcampRun(models.Model):
         """
         Returns the total amount due by the next deadline
         """
-        next_installment = self.next_installment
-        if next_installment is None:
-            return self.price
-        return self.installment_set.filter(
-            deadline__lte=next_installment.deadline
-        ).aggregate(price=models.Sum("amount"))["price"]
+        return self.installment_schedule.total_due_by_next_deadline()
 
     @property
     def integration_id(self):
@@ -198,9 +278,8 @@ class BootcampRun(models.Model):
         Returns:
             bool: True if the payment dealdline is set and is in the future
         """
-        return (
-            self.payment_deadline is not None and now_in_utc() < self.payment_deadline
-        )
+        payment_deadline = self.payment_deadline
+        return payment_deadline is not None and now_in_utc() < payment_deadline
 
     def personal_price(self, user):
         """
@@ -212,10 +291,9 @@ class BootcampRun(models.Model):
         Returns:
             Decimal: the price for the bootcamp run
         """
-        personal_price = self.personal_prices.filter(user=user).first()
-        if personal_price is not None:
-            return personal_price.price
-        return self.price
+        from klasses.api import get_personal_prices
+
+        return get_personal_prices([(user, self)])[(user.id, self.id)]
 
     def __str__(self):
         return self.display_title
@@ -15,6 +15,7 @@ from klasses.factories import (
     PersonalPriceFactory,
     BootcampRunCertificateFactory,
 )
+from klasses.models import BootcampRun
 from main.test_utils import format_as_iso8601
 from profiles.factories import ProfileFactory
 
@@ -149,6 +150,72 @@ def test_bootcamp_run_is_payable(future_start_date, expected_result):
     assert bootcamp_run.is_payable is expected_result
 
 
+def test_installment_schedule(django_assert_num_queries):
+    """The installment schedule should compute cumulative amounts and the next deadline from one query"""
+    now = now_in_utc()
+    bootcamp_run = BootcampRunFactory.create()
+    installments = [
+        InstallmentFactory.create(
+            bootcamp_run=bootcamp_run, deadline=now + timedelta(weeks=weeks), amount=100
+        )
+        for weeks in [2, -1, 1]
+    ]
+    bootcamp_run = BootcampRun.objects.get(id=bootcamp_run.id)
+    with django_assert_num_queries(1):
+        schedule = bootcamp_run.installment_schedule
+        assert schedule.installments == [
+            installments[1],
+            installments[2],
+            installments[0],
+        ]
+        assert schedule.amounts_due == [100, 200, 300]
+        assert bootcamp_run.price == 300
+        assert bootcamp_run.payment_deadline == installments[0].deadline
+        assert bootcamp_run.next_installment == installments[2]
+        assert bootcamp_run.next_payment_deadline_days == 6
+        assert bootcamp_run.total_due_by_next_deadline == 200
+        assert bootcamp_run.is_payable is True
+    assert schedule.next_installment(now + timedelta(weeks=3)) is None
+    assert schedule.total_due_by_next_deadline(now + timedelta(weeks=3)) == 300
+
+
+def test_installment_schedule_empty():
+    """A run without installments should have no price or deadlines"""
+    bootcamp_run = BootcampRunFactory.create()
+    assert bootcamp_run.price is None
+    assert bootcamp_run.payment_deadline is None
+    assert bootcamp_run.next_installment is None
+    assert bootcamp_run.total_due_by_next_deadline is None
+    assert bootcamp_run.is_payable is False
+
+
+def test_with_installment_schedules(django_assert_num_queries):
+    """with_installment_schedules should load the installments of all runs in one query"""
+    for bootcamp_run in BootcampRunFactory.create_batch(3):
+        InstallmentFactory.create_batch(2, bootcamp_run=bootcamp_run)
+    with django_assert_num_queries(2):
+        bootcamp_runs = list(BootcampRun.objects.with_installment_schedules())
+        assert [
+            len(run.installment_schedule.installments) for run in bootcamp_runs
+        ] == [
+            2,
+            2,
+            2,
+        ]
+        assert all(run.is_payable is not None for run in bootcamp_runs)
+
+
+def test_installment_change_clears_schedule():
+    """Saving or deleting an installment should clear the cached schedule of its run"""
+    installment = InstallmentFactory.create(amount=100)
+    bootcamp_run = installment.bootcamp_run
+    assert bootcamp_run.price == 100
+    InstallmentFactory.create(bootcamp_run=bootcamp_run, amount=50)
+    assert bootcamp_run.price == 150
+    installment.delete()
+    assert bootcamp_run.price == 50
+
+
 def test_next_installment():
     """
     It should return the installment with the closest date to now in the future
@@ -30,7 +30,9 @@ class BootcampRunSerializer(serializers.ModelSerializer):
     """Serializer for BootcampRun model"""
 
     bootcamp = BootcampSerializer()
-    installments = InstallmentSerializer(many=True, source="installment_set")
+    installments = InstallmentSerializer(
+        many=True, source="installment_schedule.installments"
+    )
 
     def to_representation(self, instance):
         page_fields = {}
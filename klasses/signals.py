@@ -4,9 +4,10 @@ from django.db.transaction import on_commit
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from applications.tasks import update_application_ledgers
 from hubspot_sync.task_helpers import sync_hubspot_product
-from klasses.api import adjust_app_state_for_new_price
-from klasses.models import BootcampRun, PersonalPrice
+from klasses.api import adjust_app_state_for_new_price, clear_personal_price_memo
+from klasses.models import BootcampRun, Installment, PersonalPrice
 
 
 @receiver(post_save, sender=BootcampRun, dispatch_uid="bootcamp__run_post_save")
@@ -22,6 +23,8 @@ def personal_price_post_save(
     sender, instance, created, **kwargs
 ):  # pylint:disable=unused-argument
     """Handles the 'post_save' signal from the PersonalPrice model"""
+    clear_personal_price_memo()
+    _update_ledgers(bootcamp_run_id=instance.bootcamp_run_id, user_id=instance.user_id)
     on_commit(
         lambda: adjust_app_state_for_new_price(
             user=instance.user,
@@ -36,8 +39,27 @@ def personal_price_post_delete(
     sender, instance, **kwargs
 ):  # pylint:disable=unused-argument
     """Handles the 'post_save' signal from the PersonalPrice model"""
+    clear_personal_price_memo()
+    _update_ledgers(bootcamp_run_id=instance.bootcamp_run_id, user_id=instance.user_id)
     on_commit(
         lambda: adjust_app_state_for_new_price(
             user=instance.user, bootcamp_run=instance.bootcamp_run
         )
     )
+
+
+@receiver(post_save, sender=Installment, dispatch_uid="installment_post_save")
+@receiver(post_delete, sender=Installment, dispatch_uid="installment_post_delete")
+def installment_changed(sender, instance, **kwargs):  # pylint:disable=unused-argument
+    """Update the payment ledgers for a bootcamp run when its price changes"""
+    if Installment.bootcamp_run.is_cached(instance):
+        instance.bootcamp_run.clear_installment_schedule()
+    clear_personal_price_memo()
+    _update_ledgers(bootcamp_run_id=instance.bootcamp_run_id)
+
+
+def _update_ledgers(*, bootcamp_run_id, user_id=None):
+    """Recalculate the existing payment ledgers of a run's applications in a task, once the change is committed"""
+    on_commit(
+        lambda: update_application_ledgers.delay(bootcamp_run_id, user_id=user_id)
+    )
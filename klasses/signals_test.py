@@ -2,7 +2,11 @@
 
 import pytest
 
-from klasses.factories import BootcampRunFactory, PersonalPriceFactory
+from klasses.factories import (
+    BootcampRunFactory,
+    InstallmentFactory,
+    PersonalPriceFactory,
+)
 from klasses.signals import personal_price_post_save, personal_price_post_delete
 
 pytestmark = pytest.mark.django_db
@@ -23,10 +27,11 @@ def test_personal_price_save_signal(mocker):
     """An API method to update a bootcamp application should be called after a personal price is created/saved"""
     mock_on_commit = mocker.patch("klasses.signals.on_commit")
     personal_price = PersonalPriceFactory.create()
-    # This signal is called twice when the record is created (as opposed to just being saved)
-    assert mock_on_commit.call_count == 2
-    personal_price.save()
+    # Creating the record also saves a bootcamp run. Saving a personal price queues a ledger update
+    # and an application state update.
     assert mock_on_commit.call_count == 3
+    personal_price.save()
+    assert mock_on_commit.call_count == 5
     # Test the function call from the signal handler
     patched_adjust_app = mocker.patch("klasses.signals.adjust_app_state_for_new_price")
     personal_price_post_save(mocker.Mock(), personal_price, False)
@@ -45,7 +50,7 @@ def test_personal_price_delete_signal(mocker):
     personal_price = PersonalPriceFactory.create()
     prev_call_count = mock_on_commit.call_count
     personal_price.delete()
-    assert mock_on_commit.call_count == prev_call_count + 1
+    assert mock_on_commit.call_count == prev_call_count + 2
     # Test the function call from the signal handler
     patched_adjust_app = mocker.patch("klasses.signals.adjust_app_state_for_new_price")
     personal_price_post_delete(mocker.Mock(), personal_price)
@@ -54,3 +59,15 @@ def test_personal_price_delete_signal(mocker):
     patched_adjust_app.assert_called_once_with(
         user=personal_price.user, bootcamp_run=personal_price.bootcamp_run
     )
+
+
+def test_installment_ledger_update(mocker, django_capture_on_commit_callbacks):
+    """Changing an installment should update the run's payment ledgers in a task after the commit"""
+    mock_update = mocker.patch("klasses.signals.update_application_ledgers.delay")
+    run = BootcampRunFactory.create()
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        InstallmentFactory.create(bootcamp_run=run)
+    mock_update.assert_not_called()
+    for callback in callbacks:
+        callback()
+    mock_update.assert_called_once_with(run.id, user_id=None)
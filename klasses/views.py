@@ -21,7 +21,9 @@ class BootcampViewSet(ListModelMixin, GenericViewSet):
         has_enrollments = BootcampRunEnrollment.objects.filter(
             user=user, active=True
         ).exists()
-        queryset = BootcampRun.objects.select_related("bootcamp")
+        queryset = BootcampRun.objects.select_related(
+            "bootcamp"
+        ).with_installment_schedules()
         if not user.profile.can_skip_application_steps and not has_enrollments:
             queryset = queryset.filter(allows_skipped_steps=False)
 
@@ -19,30 +19,60 @@ messages = messages_for_recipients([
 send_messages(messages)
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from email.utils import formataddr
+from functools import lru_cache
 import logging
 import re
-from collections import namedtuple
+from collections import deque, namedtuple
 from urllib.parse import urlparse
 
 from anymail.message import AnymailMessage
-from bs4 import BeautifulSoup
 from django.conf import settings
 from django.core import mail
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.template.loader import render_to_string
+from lxml import etree, html as lxml_html
 import premailer
+import requests
 from wagtail.models import Site
 from wagtail.models.sites import get_site_for_hostname
 
 from cms.utils import get_resource_page_urls
+from mail.v2.constants import STYLESHEET_CACHE_SIZE, STYLESHEET_REQUEST_TIMEOUT
 from mail.v2.exceptions import MultiEmailValidationError
 
 log = logging.getLogger()
 
 
 EmailMetadata = namedtuple("EmailMetadata", ["tags", "user_variables"])
+RenderedEmail = namedtuple("RenderedEmail", ["subject", "text_body", "html_body"])
+
+TEXT_TAGS = ("p", "h1", "h2", "h3", "h4", "h5", "h6", "span", "a")
+
+
+@lru_cache(maxsize=STYLESHEET_CACHE_SIZE)
+def _fetch_stylesheet(url):
+    """
+    Download an external stylesheet once per process, every email links the same web fonts
+
+    Args:
+        url (str): The stylesheet url
+
+    Returns:
+        str: The stylesheet contents
+    """
+    response = requests.get(url, timeout=STYLESHEET_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+class CachingPremailer(premailer.Premailer):
+    """Premailer which reuses downloaded stylesheets between messages"""
+
+    def _load_external_url(self, url):
+        return _fetch_stylesheet(url)
 
 
 class UserMessageProps:
@@ -138,45 +168,74 @@ def context_for_user(*, user=None, extra_context=None):
     return context
 
 
-def render_email_templates(template_name, context):
+def _single_string(element):
     """
-    Renders the email templates for the email
+    Get the text of an element which only contains one piece of text, possibly nested in other elements
 
     Args:
-        template_name (str): name of the template, this should match a directory in mail/templates
-        context (dict): context data for the email
+        element (lxml.etree._Element): The element
 
     Returns:
-        (str, str, str): tuple of the templates for subject, text_body, html_body
+        str or None: The text, or None if the element contains more than one node
     """
-    subject_text = render_to_string(
-        "{}/subject.txt".format(template_name), context
-    ).rstrip()
+    if len(element) == 0:
+        return element.text
+    if len(element) == 1 and not element.text and not element[0].tail:
+        return _single_string(element[0])
+    return None
 
-    context.update({"subject": subject_text})
-    html_text = render_to_string("{}/body.html".format(template_name), context)
 
-    # inline css styles
-    html_text = premailer.transform(html_text)
+def _replace_with_text(element, text):
+    """
+    Replace an element with text, keeping the text which follows it
+
+    Args:
+        element (lxml.etree._Element): The element to replace
+        text (str): The replacement text
+    """
+    text = text + (element.tail or "")
+    previous = element.getprevious()
+    if previous is not None:
+        previous.tail = (previous.tail or "") + text
+    else:
+        parent = element.getparent()
+        parent.text = (parent.text or "") + text
+    element.getparent().remove(element)
+
 
-    # pynliner internally uses bs4, which we can now modify the inlined version into a plaintext version
-    # this avoids parsing the body twice in bs4
-    soup = BeautifulSoup(html_text, "html5lib")
+def html_to_text(html_text):
+    """
+    Convert the html body of an email into its plain text fallback
+
+    Args:
+        html_text (str): The html body with inlined css
+
+    Returns:
+        str: The plain text body
+    """
+    root = lxml_html.document_fromstring(html_text)
+    etree.strip_elements(root, etree.Comment, with_tail=False)
 
     # remove newlines within text tags
-    for text in soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "span", "a"]):
-        if text.string:
-            text.string = text.string.replace("\n", " ")
+    for element in list(root.iter(*TEXT_TAGS)):
+        text = _single_string(element)
+        if text:
+            for child in element:
+                element.remove(child)
+            element.text = text.replace("\n", " ")
 
     # anchor tags get the value of their href added
-    for link in soup.find_all("a"):
-        link.replace_with("{} ({})".format(link.string, link.attrs["href"]))
+    for link in list(root.iter("a")):
+        if link.getparent() is not None:
+            _replace_with_text(
+                link, "{} ({})".format(_single_string(link), link.attrib["href"])
+            )
 
     # clear any surviving style and title tags, so their contents don't get printed
-    for style in soup.find_all(["style", "title"]):
-        style.clear()  # clear contents, just removing the tag isn't enough
+    for element in list(root.iter("style", "title")):
+        element.clear(keep_tail=True)
 
-    fallback_text = soup.get_text().strip()
+    fallback_text = "".join(root.itertext()).strip()
     # truncate more than 3 consecutive newlines
     fallback_text = re.sub(r"\n\s*\n", "\n\n\n", fallback_text)
     # ltrim the left side of all lines
@@ -184,9 +243,94 @@ def render_email_templates(template_name, context):
         r"^([ ]+)([\s\\X])", r"\2", fallback_text, flags=re.MULTILINE
     )
     # trim each line
-    fallback_text = "\n".join([line.strip() for line in fallback_text.splitlines()])
+    return "\n".join([line.strip() for line in fallback_text.splitlines()])
+
+
+def render_template_strings(template_name, context):
+    """
+    Renders the subject and the html body templates of the email
+
+    Args:
+        template_name (str): name of the template, this should match a directory in mail/templates
+        context (dict): context data for the email
+
+    Returns:
+        (str, str): the subject and the html body before css is inlined
+    """
+    subject_text = render_to_string(
+        "{}/subject.txt".format(template_name), context
+    ).rstrip()
+
+    context.update({"subject": subject_text})
+    html_text = render_to_string("{}/body.html".format(template_name), context)
+    return subject_text, html_text
 
-    return subject_text, fallback_text, html_text
+
+def inline_email_html(subject_text, html_text):
+    """
+    Inlines the css of a rendered email and derives its plain text body. This doesn't touch the database,
+    so it can run in worker threads.
+
+    Args:
+        subject_text (str): The rendered subject
+        html_text (str): The rendered html body
+
+    Returns:
+        RenderedEmail: the subject, text body and html body
+    """
+    # premailer.transform doesn't pretty print, unlike the Premailer.transform method
+    html_text = CachingPremailer(html_text).transform(pretty_print=False)
+    return RenderedEmail(subject_text, html_to_text(html_text), html_text)
+
+
+def render_email_templates(template_name, context):
+    """
+    Renders the email templates for the email
+
+    Args:
+        template_name (str): name of the template, this should match a directory in mail/templates
+        context (dict): context data for the email
+
+    Returns:
+        RenderedEmail: tuple of the templates for subject, text_body, html_body
+    """
+    return inline_email_html(*render_template_strings(template_name, context))
+
+
+def render_many_email_templates(template_name, contexts, max_workers=None):
+    """
+    Renders the email templates for many contexts. The templates are rendered in this thread,
+    inlining the css and building the text body is done by a pool of worker threads.
+
+    Args:
+        template_name (str): name of the template, this should match a directory in mail/templates
+        contexts (list of dict): context data for each email
+        max_workers (int or None): The number of worker threads, defaults to settings.MAIL_RENDER_WORKERS
+
+    Yields:
+        RenderedEmail: the rendered emails, in the order of the contexts
+    """
+    max_workers = min(max_workers or settings.MAIL_RENDER_WORKERS, len(contexts))
+    if max_workers <= 1:
+        for context in contexts:
+            yield render_email_templates(template_name, context)
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="mail-render"
+    ) as executor:
+        for context in contexts:
+            pending.append(
+                executor.submit(
+                    inline_email_html, *render_template_strings(template_name, context)
+                )
+            )
+            # keep a bounded number of messages in flight
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
 def messages_for_recipients(recipients_and_contexts, template_name):
@@ -200,13 +344,18 @@ def messages_for_recipients(recipients_and_contexts, template_name):
     Yields:
         django.core.mail.EmailMultiAlternatives: email message with rendered content
     """
+    recipients_and_contexts = list(recipients_and_contexts)
+    rendered_emails = render_many_email_templates(
+        template_name, [context for _, context in recipients_and_contexts]
+    )
     with mail.get_connection(settings.NOTIFICATION_EMAIL_BACKEND) as connection:
-        for recipient, context in recipients_and_contexts:
-            yield build_message(
+        for (recipient, _), rendered_email in zip(
+            recipients_and_contexts, rendered_emails
+        ):
+            yield message_from_rendered_email(
                 connection=connection,
-                template_name=template_name,
                 recipient=recipient,
-                context=context,
+                rendered_email=rendered_email,
             )
 
 
@@ -262,13 +411,23 @@ def build_user_specific_messages(template_name, user_message_props_iter):
     Yields:
         django.core.mail.EmailMultiAlternatives: email message with rendered content
     """
+    user_message_props_list = list(user_message_props_iter)
+    base_context = get_base_context()
+    rendered_emails = render_many_email_templates(
+        template_name,
+        [
+            {**base_context, **user_message_props.context}
+            for user_message_props in user_message_props_list
+        ],
+    )
     with mail.get_connection(settings.NOTIFICATION_EMAIL_BACKEND) as connection:
-        for user_message_props in user_message_props_iter:
-            yield build_message(
+        for user_message_props, rendered_email in zip(
+            user_message_props_list, rendered_emails
+        ):
+            yield message_from_rendered_email(
                 connection=connection,
-                template_name=template_name,
                 recipient=user_message_props.recipient,
-                context={**get_base_context(), **user_message_props.context},
+                rendered_email=rendered_email,
                 metadata=user_message_props.metadata,
             )
 
@@ -287,7 +446,28 @@ def build_message(connection, template_name, recipient, context, metadata=None):
     Returns:
         django.core.mail.EmailMultiAlternatives: email message with rendered content
     """
-    subject, text_body, html_body = render_email_templates(template_name, context or {})
+    return message_from_rendered_email(
+        connection=connection,
+        recipient=recipient,
+        rendered_email=render_email_templates(template_name, context or {}),
+        metadata=metadata,
+    )
+
+
+def message_from_rendered_email(connection, recipient, rendered_email, metadata=None):
+    """
+    Creates a message object from an email which is already rendered
+
+    Args:
+        connection: An instance of the email backend class (return value of django.core.mail.get_connection)
+        recipient (str): Recipient email address
+        rendered_email (RenderedEmail): The subject, text body and html body of the email
+        metadata (EmailMetadata or None): An object containing extra data to attach to the message
+
+    Returns:
+        django.core.mail.EmailMultiAlternatives: email message with rendered content
+    """
+    subject, text_body, html_body = rendered_email
     msg = AnymailMessage(
         subject=subject,
         body=text_body,
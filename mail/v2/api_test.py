@@ -4,8 +4,11 @@ from email.utils import formataddr
 import pytest
 from mitol.common.pytest_utils import any_instance_of
 
+from mail.v2 import api
 from mail.v2.api import (
     context_for_user,
+    html_to_text,
+    render_many_email_templates,
     safe_format_recipients,
     render_email_templates,
     send_messages,
@@ -15,6 +18,7 @@ from mail.v2.api import (
     build_message,
     UserMessageProps,
     EmailMetadata,
+    RenderedEmail,
 )
 from profiles.factories import UserFactory
 
@@ -81,6 +85,58 @@ def test_render_email_templates(user):
     )
 
 
+def test_html_to_text():
+    """html_to_text should build the plain text body from the html body"""
+    assert html_to_text(
+        "<html><head><title>Title</title><style>p { color: red; }</style></head>"
+        "<body><!-- comment --><h1>Hello\nthere</h1>\n"
+        '<p>Visit <a href="http://example.com">our\nsite</a> today</p>\n'
+        "<p><span><strong>nested\ntext</strong></span></p>"
+        "</body></html>"
+    ) == ("Hello there\nVisit our site (http://example.com) today\nnested text")
+
+
+@pytest.mark.parametrize("max_workers", [None, 1, 3])
+def test_render_many_email_templates(settings, max_workers):
+    """render_many_email_templates should render the emails in the order of the contexts"""
+    settings.MAIL_RENDER_WORKERS = 2
+    users = UserFactory.create_batch(7)
+    contexts = [
+        context_for_user(user=user, extra_context={"url": "http://example.com"})
+        for user in users
+    ]
+
+    rendered_emails = list(
+        render_many_email_templates("sample", contexts, max_workers=max_workers)
+    )
+    assert [rendered_email.subject for rendered_email in rendered_emails] == [
+        "Welcome {}".format(user.profile.name) for user in users
+    ]
+    assert rendered_emails[0] == render_email_templates("sample", contexts[0])
+
+
+def test_external_stylesheet_cached(mocker):
+    """External stylesheets should be downloaded once per process"""
+    api._fetch_stylesheet.cache_clear()  # pylint: disable=protected-access
+    mock_get = mocker.patch("mail.v2.api.requests.get")
+    mock_get.return_value.text = "p { color: red; }"
+    html_text = (
+        "<html><head>"
+        '<link rel="stylesheet" type="text/css" href="https://example.com/style.css">'
+        "</head><body><p>text</p></body></html>"
+    )
+
+    for _ in range(2):
+        assert api.inline_email_html("subject", html_text) == RenderedEmail(
+            "subject",
+            "text",
+            '<html><head></head><body><p style="color:red">text</p></body></html>',
+        )
+    mock_get.assert_called_once_with("https://example.com/style.css", timeout=10)
+    mock_get.return_value.raise_for_status.assert_called_once_with()
+    api._fetch_stylesheet.cache_clear()  # pylint: disable=protected-access
+
+
 def test_messages_for_recipients():
     """Tests that messages_for_recipients works as expected"""
 
@@ -144,8 +200,18 @@ def test_build_user_specific_messages(mocker):
     Tests that build_user_specific_messages loops through an iterable of user message properties
     and builds a message object from each one
     """
-    patched_build_message = mocker.patch("mail.v2.api.build_message")
-    mocker.patch("mail.v2.api.get_base_context", return_value={"base": "context"})
+    rendered_emails = [
+        RenderedEmail(f"subject {index}", "text", "<p>html</p>") for index in range(3)
+    ]
+    patched_render_many = mocker.patch(
+        "mail.v2.api.render_many_email_templates", return_value=iter(rendered_emails)
+    )
+    patched_message_from_rendered_email = mocker.patch(
+        "mail.v2.api.message_from_rendered_email"
+    )
+    patched_base_context = mocker.patch(
+        "mail.v2.api.get_base_context", return_value={"base": "context"}
+    )
     mocker.patch("mail.v2.api.mail.get_connection")
     template_name = "sample"
     user_message_props_iter = [
@@ -162,12 +228,21 @@ def test_build_user_specific_messages(mocker):
         build_user_specific_messages(template_name, user_message_props_iter)
     )
     assert len(messages) == len(user_message_props_iter)
-    for user_message_props in user_message_props_iter:
-        patched_build_message.assert_any_call(
+    patched_base_context.assert_called_once()
+    patched_render_many.assert_called_once_with(
+        template_name,
+        [
+            {"base": "context", **user_message_props.context}
+            for user_message_props in user_message_props_iter
+        ],
+    )
+    for user_message_props, rendered_email in zip(
+        user_message_props_iter, rendered_emails
+    ):
+        patched_message_from_rendered_email.assert_any_call(
             connection=any_instance_of(mocker.Mock),
-            template_name=template_name,
             recipient=user_message_props.recipient,
-            context={"base": "context", **user_message_props.context},
+            rendered_email=rendered_email,
             metadata=user_message_props.metadata,
         )
 
@@ -20,3 +20,6 @@ MAILGUN_OPENED = "opened"
 MAILGUN_CLICKED = "clicked"
 MAILGUN_EVENTS = [MAILGUN_DELIVERED, MAILGUN_FAILED, MAILGUN_OPENED, MAILGUN_CLICKED]
 MAILGUN_EVENT_CHOICES = [(event, event) for event in MAILGUN_EVENTS]
+
+STYLESHEET_CACHE_SIZE = 64
+STYLESHEET_REQUEST_TIMEOUT = 10
@@ -1,8 +1,15 @@
 """Abstract models for use in other applications"""
 
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from functools import partial
+
 from django.contrib.auth.models import User
 from django.db import transaction
 from django.db.models import (
+    DecimalField,
     ForeignKey,
     Model,
     SET_NULL,
@@ -11,6 +18,39 @@ from django.db.models import (
 from mitol.common.models import TimestampedModel
 
 
+_audit_buffer = ContextVar("audit_buffer", default=None)
+
+
+def _write_audits(audits):
+    """
+    Insert audit objects with one query for each audit class
+
+    Args:
+        audits (list of AuditModel): Unsaved audit objects
+    """
+    audits_by_class = defaultdict(list)
+    for audit in audits:
+        audits_by_class[audit.__class__].append(audit)
+    for audit_class, class_audits in audits_by_class.items():
+        audit_class.objects.bulk_create(class_audits)
+
+
+@contextmanager
+def buffered_audits():
+    """
+    Collect the audit objects created by save_and_log inside this block and insert them together when
+    the transaction commits. Audits of changes which were rolled back are not written.
+    """
+    with transaction.atomic():
+        audits = []
+        token = _audit_buffer.set(audits)
+        try:
+            yield
+        finally:
+            _audit_buffer.reset(token)
+        transaction.on_commit(partial(_write_audits, audits))
+
+
 class AuditModel(TimestampedModel):
     """An abstract base class for audit models"""
 
@@ -53,28 +93,141 @@ class AuditableModel(Model):
         """
         raise NotImplementedError
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The loaded values are only turned into a snapshot if the object is saved and logged
+        instance._loaded_values = (  # pylint: disable=protected-access
+            field_names,
+            values,
+        )
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._set_audit_snapshot()
+
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        super().save(*args, **kwargs)
+        # The saved values may differ from the loaded ones, save_and_log takes a new snapshot
+        self._loaded_values = None
+        self._audit_snapshot = None
+
+    def _normalize_field_values(self):
+        """
+        Convert the field values to the types and precision they have when loaded from the database, so
+        that a saved object serializes the same way as a refreshed one
+        """
+        for field in self._meta.concrete_fields:
+            value = self.__dict__.get(field.attname)
+            if value is None:
+                continue
+            value = field.to_python(value)
+            if isinstance(field, DecimalField):
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+            self.__dict__[field.attname] = value
+
+    def _set_audit_snapshot(self):
+        """Take a snapshot of the current values of the loaded concrete fields"""
+        self._loaded_values = None
+        self._audit_snapshot = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def _get_audit_snapshot(self):
+        """
+        Returns:
+            dict or None: The values of the concrete fields when the object was last loaded or saved, keyed by
+                attribute name, or None if there aren't any
+        """
+        loaded_values = getattr(self, "_loaded_values", None)
+        if loaded_values is not None:
+            self._loaded_values = None
+            self._audit_snapshot = dict(zip(*loaded_values))
+        return getattr(self, "_audit_snapshot", None)
+
+    def _get_saved_object(self):
+        """
+        Build a copy of this object as it was when it was last loaded or saved, without a query if possible
+
+        Returns:
+            AuditableModel or None: The saved object, or None if it is not in the database yet
+        """
+        snapshot = self._get_audit_snapshot()
+        if snapshot is None or len(snapshot) != len(self._meta.concrete_fields):
+            if self.pk is None:
+                return None
+            return self.__class__.objects.filter(pk=self.pk).first()
+
+        saved_obj = self.__class__.from_db(
+            self._state.db, list(snapshot), list(snapshot.values())
+        )
+        # Reuse related objects which are already loaded if they haven't changed
+        for name, related_obj in self._state.fields_cache.items():
+            field = self._meta.get_field(name)
+            if field.concrete and snapshot.get(field.attname) == getattr(
+                self, field.attname
+            ):
+                saved_obj._state.fields_cache[name] = related_obj
+        return saved_obj
+
+    def _make_audit(self, acting_user, before_obj):
+        """
+        Create an unsaved audit object for a change to this object
+
+        Args:
+            acting_user (django.contrib.auth.models.User or None): The user who made the change
+            before_obj (AuditableModel or None): The object before the change
+
+        Returns:
+            AuditModel: The audit object
+        """
+        audit_class = self.get_audit_class()
+        return audit_class(
+            acting_user=acting_user,
+            data_before=before_obj.to_dict() if before_obj is not None else None,
+            data_after=self.to_dict(),
+            **{audit_class.get_related_field_name(): self},
+        )
+
     @transaction.atomic
     def save_and_log(self, acting_user, *args, **kwargs):
         """
-        Saves the object and creates an audit object.
+        Saves the object and creates an audit object. The data before the change comes from the values
+        loaded from the database, and the data after the change from the saved object. Inside
+        buffered_audits() the audit object is inserted when the transaction commits.
 
         Args:
             acting_user (django.contrib.auth.models.User or None):
                 The user who made the change to the model. May be None if inapplicable.
         """
-        before_obj = self.__class__.objects.filter(id=self.id).first()
+        before_obj = self._get_saved_object()
         self.save(*args, **kwargs)
-        self.refresh_from_db()
-        before_dict = None
-        if before_obj is not None:
-            before_dict = before_obj.to_dict()
+        self._normalize_field_values()
+        self._set_audit_snapshot()
+        audit = self._make_audit(acting_user, before_obj)
+        audits = _audit_buffer.get()
+        if audits is None:
+            audit.save()
+        else:
+            transaction.on_commit(partial(audits.append, audit))
 
-        audit_kwargs = dict(
-            acting_user=acting_user, data_before=before_dict, data_after=self.to_dict()
-        )
-        audit_class = self.get_audit_class()
-        audit_kwargs[audit_class.get_related_field_name()] = self
-        audit_class.objects.create(**audit_kwargs)
+    @classmethod
+    def bulk_save_and_log(cls, objects, acting_user):
+        """
+        Saves the objects and inserts all of their audit objects together when the transaction commits.
+        The data before each change comes from the values the object was loaded with.
+
+        Args:
+            objects (iterable of AuditableModel): The objects to save
+            acting_user (django.contrib.auth.models.User or None):
+                The user who made the changes. May be None if inapplicable.
+        """
+        with buffered_audits():
+            for obj in objects:
+                obj.save_and_log(acting_user)
 
 
 class ValidateOnSaveMixin(Model):
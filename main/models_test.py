@@ -1,10 +1,13 @@
 """Tests for Bootcamp models"""
 
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
+from main.models import buffered_audits
 from main.utils import serialize_model_object
 from ecommerce.factories import LineFactory, OrderFactory
-from ecommerce.models import OrderAudit
+from ecommerce.models import Order, OrderAudit
 from profiles.factories import UserFactory
 
 
@@ -44,6 +47,93 @@ class ModelsTests(TestCase):
             else:
                 assert value == original_after_json[field]
 
+    def test_save_and_log_without_reload(self):
+        """
+        save_and_log() should take the data before the change from the loaded object instead of querying it
+        """
+        order = Order.objects.get(id=OrderFactory.create(total_price_paid=5).id)
+        data_before = order.to_dict()
+        order.status = Order.FULFILLED
+        with CaptureQueriesContext(connection) as context:
+            order.save_and_log(None)
+        assert not [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('SELECT "ecommerce_order"')
+        ]
+
+        audit = OrderAudit.objects.get()
+        assert audit.data_before == data_before
+        order.refresh_from_db()
+        assert audit.data_after == order.to_dict()
+        assert audit.data_after["total_price_paid"] == "5.00"
+
+    def test_save_and_log_snapshot(self):
+        """
+        The snapshot of the loaded values should only be built when it is used, and should not change
+        when the object is modified
+        """
+        order = Order.objects.get(id=OrderFactory.create(status=Order.CREATED).id)
+        assert "_audit_snapshot" not in order.__dict__
+        order.status = Order.FULFILLED
+        order.save_and_log(None)
+        order.status = Order.FAILED
+        with CaptureQueriesContext(connection) as context:
+            order.save_and_log(None)
+        assert not [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('SELECT "ecommerce_order"')
+        ]
+        assert [
+            (audit.data_before["status"], audit.data_after["status"])
+            for audit in OrderAudit.objects.order_by("id")
+        ] == [(Order.CREATED, Order.FULFILLED), (Order.FULFILLED, Order.FAILED)]
+
+    def test_bulk_save_and_log(self):
+        """
+        bulk_save_and_log() should take the data before the changes from the loaded objects, and insert
+        all audit objects with one query once the transaction commits
+        """
+        order_ids = [
+            order.id for order in OrderFactory.create_batch(3, status=Order.CREATED)
+        ]
+        orders = list(Order.objects.filter(id__in=order_ids).order_by("id"))
+        for order in orders:
+            order.status = Order.FULFILLED
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as context:
+                Order.bulk_save_and_log(orders, None)
+            assert OrderAudit.objects.count() == 0
+        assert not [
+            query["sql"]
+            for query in context.captured_queries
+            if "ecommerce_orderaudit" in query["sql"]
+            or query["sql"].startswith('SELECT "ecommerce_order"')
+        ]
+        audits = OrderAudit.objects.order_by("order_id")
+        assert [audit.order for audit in audits] == orders
+        assert [audit.data_before["status"] for audit in audits] == [Order.CREATED] * 3
+        assert [audit.data_after["status"] for audit in audits] == [Order.FULFILLED] * 3
+
+    def test_buffered_audits_rollback(self):
+        """
+        Audits for changes which are rolled back should not be written
+        """
+        orders = OrderFactory.create_batch(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffered_audits():
+                orders[0].save_and_log(None)
+                try:
+                    with transaction.atomic():
+                        orders[1].save_and_log(None)
+                        raise ValueError
+                except ValueError:
+                    pass
+        assert list(OrderAudit.objects.values_list("order", flat=True)) == [
+            orders[0].id
+        ]
+
     def test_to_dict(self):
         """
         assert output of to_dict
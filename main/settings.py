@@ -192,6 +192,7 @@ MIDDLEWARE = (
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "klasses.middleware.PersonalPriceMemoMiddleware",
     "hijack.middleware.HijackUserMiddleware",
     "main.hijack_support_middleware.HijackSupportMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -547,6 +548,12 @@ MAILGUN_BCC_TO_EMAIL = get_string(
     description="Email which gets BCC'd on outgoing email",
 )
 
+MAIL_RENDER_WORKERS = get_int(
+    name="MAIL_RENDER_WORKERS",
+    default=2,
+    description="Number of threads which inline the CSS of emails rendered for many recipients",
+)
+
 MAILGUN_SENDER_DOMAIN = get_string(
     name="MAILGUN_SENDER_DOMAIN",
     default=None,
@@ -817,6 +824,18 @@ CACHES = {
     }
 }
 
+CHECKOUT_DATA_CACHE_TTL = get_int(
+    name="CHECKOUT_DATA_CACHE_TTL",
+    default=3600,
+    description="Number of seconds the checkout data of an application is cached for",
+)
+
+REVIEW_SUBMISSION_FACETS_CACHE_TTL = get_int(
+    name="REVIEW_SUBMISSION_FACETS_CACHE_TTL",
+    default=300,
+    description="Number of seconds the facet counts of the submission review queue are cached for",
+)
+
 
 # Cybersource
 CYBERSOURCE_ACCESS_KEY = get_string(
@@ -879,6 +898,21 @@ CYBERSOURCE_EXPORT_SERVICE_SANCTIONS_LISTS = get_string(
     default=None,
     description="Additional sanctions lists to validate for exports. Refer to Cybersource docs.",
 )
+CYBERSOURCE_EXPORT_RESCREENING_CONCURRENCY = get_int(
+    name="CYBERSOURCE_EXPORT_RESCREENING_CONCURRENCY",
+    default=4,
+    description="Max number of concurrent exports verification requests when existing users are re-screened",
+)
+CYBERSOURCE_EXPORT_SUCCESS_CACHE_TTL = get_int(
+    name="CYBERSOURCE_EXPORT_SUCCESS_CACHE_TTL",
+    default=3600,
+    description="Number of seconds an accepted exports verification is reused for the same name and address, 0 disables it",
+)
+CYBERSOURCE_EXPORT_DENIED_CACHE_TTL = get_int(
+    name="CYBERSOURCE_EXPORT_DENIED_CACHE_TTL",
+    default=3600,
+    description="Number of seconds a denied exports verification is reused for the same name and address, 0 disables it",
+)
 
 
 # Feature flags
@@ -947,15 +981,54 @@ HUBSPOT_MAX_CONCURRENT_TASKS = get_int(
     default=4,
     description="Max number of concurrent Hubspot tasks to run",
 )
+HUBSPOT_ASSOCIATION_WORKERS = get_int(
+    name="HUBSPOT_ASSOCIATION_WORKERS",
+    default=4,
+    description="Number of threads in each task which send batches of Hubspot associations",
+)
 HUBSPOT_PIPELINE_ID = get_string(
     name="HUBSPOT_PIPELINE_ID",
     default=None,
     description="Hubspot ecommerce pipeline id",
 )
-HUBSPOT_TASK_DELAY = get_int(
-    name="HUBSPOT_TASK_DELAY",
-    default=1000,
-    description="Number of milliseconds to wait between consecutive Hubspot calls",
+HUBSPOT_RATE_LIMIT_MAX = get_int(
+    name="HUBSPOT_RATE_LIMIT_MAX",
+    default=100,
+    description="Max number of Hubspot API calls per rate limit interval, until Hubspot reports its own limit",
+)
+HUBSPOT_RATE_LIMIT_INTERVAL = get_int(
+    name="HUBSPOT_RATE_LIMIT_INTERVAL",
+    default=10,
+    description="Length in seconds of the Hubspot rate limit interval, until Hubspot reports its own interval",
+)
+HUBSPOT_DEAL_SYNC_WINDOW = get_int(
+    name="HUBSPOT_DEAL_SYNC_WINDOW",
+    default=30,
+    description="Number of seconds to collect repeated sync requests for a deal before syncing it once, 0 syncs every change immediately",
+)
+HUBSPOT_DEAL_SYNC_BATCH_SIZE = get_int(
+    name="HUBSPOT_DEAL_SYNC_BATCH_SIZE",
+    default=100,
+    description="Max number of pending deals to sync in one batch",
+)
+HUBSPOT_DEAL_SYNC_FREQUENCY = get_int(
+    name="HUBSPOT_DEAL_SYNC_FREQUENCY",
+    default=30,
+    description="Number of seconds between runs of the task which syncs pending deals",
+)
+CELERY_BEAT_SCHEDULE["sync-pending-hubspot-deals"] = {
+    "task": "hubspot_sync.tasks.sync_pending_deals_with_hubspot",
+    "schedule": HUBSPOT_DEAL_SYNC_FREQUENCY,
+}
+HUBSPOT_ID_CACHE_TTL = get_int(
+    name="HUBSPOT_ID_CACHE_TTL",
+    default=60 * 60 * 24,
+    description="Number of seconds to keep the Hubspot ids of synced objects in redis",
+)
+HUBSPOT_ID_LOCAL_CACHE_TTL = get_int(
+    name="HUBSPOT_ID_LOCAL_CACHE_TTL",
+    default=60,
+    description="Number of seconds to keep the Hubspot ids of synced objects in the memory of each process",
 )
 RECAPTCHA_SITE_KEY = get_string(
     name="RECAPTCHA_SITE_KEY", default="", description="The ReCaptcha site key"
@@ -997,6 +1070,11 @@ NOVOED_API_BASE_URL = get_string(
 NOVOED_BASE_URL = get_string(
     name="NOVOED_BASE_URL", default=None, description="The base URL of the NovoEd"
 )
+NOVOED_ENROLLMENT_CONCURRENCY = get_int(
+    name="NOVOED_ENROLLMENT_CONCURRENCY",
+    default=8,
+    description="Max number of concurrent NovoEd requests when a group of users is enrolled",
+)
 
 # Relative URL to be used by Djoser for the link in the password reset email
 # (see: http://djoser.readthedocs.io/en/stable/settings.html#password-reset-confirm-url)
@@ -259,6 +259,8 @@ def test_jsonfield(settings):
         "id": receipt.id,
         "updated_on": format_as_iso8601(receipt.updated_on),
         "order": receipt.order.id,
+        "transaction_uuid": None,
+        "processed_on": None,
     }
 
 
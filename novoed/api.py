@@ -1,5 +1,7 @@
 """API functionality for integrating with NovoEd"""
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urljoin
 import logging
 import operator
@@ -7,11 +9,16 @@ import operator
 import requests
 from django.conf import settings
 from djangosaml2idp.processors import BaseProcessor
+from requests.adapters import HTTPAdapter
 from rest_framework import status
 from mitol.common.utils import now_in_utc
+from urllib3.util.retry import Retry
 
 from klasses.models import BootcampRunEnrollment
 from novoed.constants import (
+    NOVOED_CONNECTION_POOL_SIZE,
+    NOVOED_REQUEST_RETRIES,
+    NOVOED_REQUEST_TIMEOUT,
     REGISTER_USER_URL_STUB,
     UNENROLL_USER_URL_STUB,
     SAML_ID_STAGING_PREFIX,
@@ -21,13 +28,64 @@ from profiles.api import get_first_and_last_names
 log = logging.getLogger(__name__)
 
 
-def enroll_in_novoed_course(user, novoed_course_stub):
+@lru_cache(maxsize=1)
+def get_novoed_session():
     """
-    Enrolls a user in a course on NovoEd
+    Returns the session shared by all NovoEd requests of this process, so that connections are reused.
+    Connection errors, rate limits and server errors are retried with backoff. Enrollment requests are
+    safe to repeat, since NovoEd responds to an existing enrollment with a 207.
+
+    Returns:
+        requests.Session: A session with a pooled adapter which retries requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=max(
+            NOVOED_CONNECTION_POOL_SIZE, settings.NOVOED_ENROLLMENT_CONCURRENCY
+        ),
+        max_retries=Retry(
+            total=NOVOED_REQUEST_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status.HTTP_502_BAD_GATEWAY,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                status.HTTP_504_GATEWAY_TIMEOUT,
+            ],
+            allowed_methods=None,
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _post_to_novoed(url, body):
+    """
+    Make a POST request to the NovoEd API with the shared session
+
+    Args:
+        url (str): The url of the API endpoint
+        body (dict): The JSON request body
+
+    Returns:
+        requests.Response: The response
+    """
+    return get_novoed_session().post(url, json=body, timeout=NOVOED_REQUEST_TIMEOUT)
+
+
+def _request_novoed_enrollment(user, novoed_course_stub, first_name, last_name):
+    """
+    Request the enrollment of a user in a course on NovoEd, without touching the database
 
     Args:
         user (django.contrib.auth.models.User):
         novoed_course_stub (str): The stub of the course in NovoEd (can be found in the NovoEd course's URL)
+        first_name (str): The user's first name
+        last_name (str): The user's last name
 
     Returns:
         (bool, bool): A flag indicating whether or not the enrollment succeeded, paired with a flag indicating
@@ -36,7 +94,6 @@ def enroll_in_novoed_course(user, novoed_course_stub):
     Raises:
         HTTPError: Raised if the HTTP response indicates an error
     """
-    first_name, last_name = get_first_and_last_names(user)
     new_user_req_body = {
         "api_key": settings.NOVOED_API_KEY,
         "api_secret": settings.NOVOED_API_SECRET,
@@ -49,7 +106,7 @@ def enroll_in_novoed_course(user, novoed_course_stub):
     new_user_url = urljoin(
         settings.NOVOED_API_BASE_URL, f"{novoed_course_stub}/{REGISTER_USER_URL_STUB}"
     )
-    resp = requests.post(new_user_url, json=new_user_req_body)
+    resp = _post_to_novoed(new_user_url, new_user_req_body)
     created, existed = False, False
     if resp.status_code == status.HTTP_200_OK:
         created = True
@@ -63,17 +120,102 @@ def enroll_in_novoed_course(user, novoed_course_stub):
         )
     else:
         resp.raise_for_status()
-    # Update the 'novoed_sync_date' value for the enrollment that matches this user/run, as long as we got a response
-    # that indicated the enrollment exists in NovoEd, and the existing sync date is None
+    return created, existed
+
+
+def _update_novoed_sync_dates(user_ids, novoed_course_stub):
+    """
+    Update the 'novoed_sync_date' value for the enrollments that match these users/run, as long as
+    the existing sync date is None
+
+    Args:
+        user_ids (list of int): Users whose enrollments exist in NovoEd
+        novoed_course_stub (str): The stub of the course in NovoEd
+    """
+    if not user_ids:
+        return
+    BootcampRunEnrollment.objects.filter(
+        user_id__in=user_ids,
+        bootcamp_run__novoed_course_stub=novoed_course_stub,
+        novoed_sync_date=None,
+    ).update(novoed_sync_date=now_in_utc())
+
+
+def enroll_in_novoed_course(user, novoed_course_stub):
+    """
+    Enrolls a user in a course on NovoEd
+
+    Args:
+        user (django.contrib.auth.models.User):
+        novoed_course_stub (str): The stub of the course in NovoEd (can be found in the NovoEd course's URL)
+
+    Returns:
+        (bool, bool): A flag indicating whether or not the enrollment succeeded, paired with a flag indicating
+            whether or not the enrollment already existed
+
+    Raises:
+        HTTPError: Raised if the HTTP response indicates an error
+    """
+    first_name, last_name = get_first_and_last_names(user)
+    created, existed = _request_novoed_enrollment(
+        user, novoed_course_stub, first_name, last_name
+    )
+    # Update the sync date as long as we got a response that indicated the enrollment exists in NovoEd
     if created or existed:
-        BootcampRunEnrollment.objects.filter(
-            user=user,
-            bootcamp_run__novoed_course_stub=novoed_course_stub,
-            novoed_sync_date=None,
-        ).update(novoed_sync_date=now_in_utc())
+        _update_novoed_sync_dates([user.id], novoed_course_stub)
     return created, existed
 
 
+def bulk_enroll_in_novoed_course(users, novoed_course_stub):
+    """
+    Enrolls a group of users in a course on NovoEd with a bounded number of concurrent requests,
+    then updates the sync dates of all enrollments which exist in NovoEd with one query
+
+    Args:
+        users (iterable of django.contrib.auth.models.User): The users, with their profile and legal address loaded
+        novoed_course_stub (str): The stub of the course in NovoEd (can be found in the NovoEd course's URL)
+
+    Returns:
+        dict: A dict containing information about the number of users created, the number that already existed,
+            and the number that failed
+    """
+    users = list(users)
+    # names are read here, since the threads only talk to NovoEd and never to the database
+    names = [get_first_and_last_names(user) for user in users]
+
+    def enroll(user, name):
+        try:
+            return _request_novoed_enrollment(user, novoed_course_stub, *name)
+        except:  # noqa: E722
+            log.exception(
+                "User enrollment in NovoEd failed (%s, %s)",
+                user.email,
+                novoed_course_stub,
+            )
+            return None
+
+    with ThreadPoolExecutor(
+        max_workers=settings.NOVOED_ENROLLMENT_CONCURRENCY
+    ) as executor:
+        outcomes = list(executor.map(enroll, users, names))
+
+    results = {"created": 0, "existed": 0, "failed": 0}
+    synced_user_ids = []
+    for user, outcome in zip(users, outcomes):
+        if outcome is None:
+            results["failed"] += 1
+            continue
+        created, existed = outcome
+        if created:
+            results["created"] += 1
+        elif existed:
+            results["existed"] += 1
+        if created or existed:
+            synced_user_ids.append(user.id)
+    _update_novoed_sync_dates(synced_user_ids, novoed_course_stub)
+    return results
+
+
 def unenroll_from_novoed_course(user, novoed_course_stub):
     """
     Enrolls a user from a course on NovoEd
@@ -93,7 +235,7 @@ def unenroll_from_novoed_course(user, novoed_course_stub):
     unenroll_user_url = urljoin(
         settings.NOVOED_API_BASE_URL, f"{novoed_course_stub}/{UNENROLL_USER_URL_STUB}"
     )
-    resp = requests.post(unenroll_user_url, json=unenroll_user_req_body)
+    resp = _post_to_novoed(unenroll_user_url, unenroll_user_req_body)
     resp.raise_for_status()
 
 
@@ -9,8 +9,18 @@ from mitol.common.utils import now_in_utc
 
 from klasses.factories import BootcampRunEnrollmentFactory
 from profiles.factories import UserFactory
-from novoed.api import enroll_in_novoed_course, unenroll_from_novoed_course
-from novoed.constants import REGISTER_USER_URL_STUB, UNENROLL_USER_URL_STUB
+from novoed.api import (
+    bulk_enroll_in_novoed_course,
+    enroll_in_novoed_course,
+    get_novoed_session,
+    unenroll_from_novoed_course,
+)
+from novoed.constants import (
+    NOVOED_REQUEST_RETRIES,
+    NOVOED_REQUEST_TIMEOUT,
+    REGISTER_USER_URL_STUB,
+    UNENROLL_USER_URL_STUB,
+)
 from main.test_utils import MockResponse
 
 
@@ -38,8 +48,8 @@ def novoed_user():
 
 @pytest.fixture
 def patched_post(mocker):
-    """Patches the post function from the requests library"""
-    return mocker.patch("novoed.api.requests.post")
+    """Patches the post function of the NovoEd session"""
+    return mocker.patch("novoed.api.get_novoed_session").return_value.post
 
 
 @pytest.mark.django_db
@@ -80,6 +90,7 @@ def test_enroll_in_novoed_course(
             "email": novoed_user.email,
             "external_id": str(novoed_user.id),
         },
+        timeout=NOVOED_REQUEST_TIMEOUT,
     )
     assert result == (exp_created, exp_existing)
     enrollment.refresh_from_db()
@@ -115,6 +126,56 @@ def test_enroll_in_novoed_course_exc(patched_post, novoed_user):
         enroll_in_novoed_course(novoed_user, FAKE_COURSE_STUB)
 
 
+def test_get_novoed_session():
+    """get_novoed_session should return one session which pools connections and retries requests"""
+    get_novoed_session.cache_clear()
+    session = get_novoed_session()
+    assert get_novoed_session() is session
+    retries = session.get_adapter(FAKE_BASE_URL).max_retries
+    assert retries.total == NOVOED_REQUEST_RETRIES
+    assert retries.is_retry("POST", status.HTTP_503_SERVICE_UNAVAILABLE)
+    assert not retries.is_retry("POST", status.HTTP_400_BAD_REQUEST)
+    get_novoed_session.cache_clear()
+
+
+@pytest.mark.django_db
+def test_bulk_enroll_in_novoed_course(
+    settings, django_assert_num_queries, patched_post
+):
+    """
+    bulk_enroll_in_novoed_course should enroll users concurrently, count the results and update the
+    sync dates with one query
+    """
+    settings.NOVOED_ENROLLMENT_CONCURRENCY = 2
+    enrollments = BootcampRunEnrollmentFactory.create_batch(
+        4, bootcamp_run__novoed_course_stub=FAKE_COURSE_STUB, novoed_sync_date=None
+    )
+    users = [enrollment.user for enrollment in enrollments]
+    statuses = {
+        users[0].email: status.HTTP_200_OK,
+        users[1].email: status.HTTP_207_MULTI_STATUS,
+        users[2].email: status.HTTP_204_NO_CONTENT,
+        users[3].email: status.HTTP_400_BAD_REQUEST,
+    }
+    patched_post.side_effect = lambda url, json, timeout: MockResponse(
+        content=None, status_code=statuses[json["email"]]
+    )
+
+    with django_assert_num_queries(1):
+        results = bulk_enroll_in_novoed_course(users, FAKE_COURSE_STUB)
+
+    assert results == {"created": 1, "existed": 1, "failed": 1}
+    assert patched_post.call_count == len(users)
+    for enrollment in enrollments:
+        enrollment.refresh_from_db()
+    assert [enrollment.novoed_sync_date is not None for enrollment in enrollments] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
 @pytest.mark.django_db
 def test_unenroll_from_novoed_course(patched_post, novoed_user):
     """unenroll_from_novoed_course should make a request to unenroll a user from a NovoEd course"""
@@ -129,6 +190,7 @@ def test_unenroll_from_novoed_course(patched_post, novoed_user):
             "api_secret": FAKE_API_SECRET,
             "email": novoed_user.email,
         },
+        timeout=NOVOED_REQUEST_TIMEOUT,
     )
 
 
@@ -3,3 +3,9 @@
 REGISTER_USER_URL_STUB = "register_new_learner"
 UNENROLL_USER_URL_STUB = "unregister_learner"
 SAML_ID_STAGING_PREFIX = "stg-"
+
+# Seconds to wait for a connection to NovoEd and for its response
+NOVOED_REQUEST_TIMEOUT = (3.05, 30)
+# Number of times a request is retried after a connection error, a rate limit or a server error
+NOVOED_REQUEST_RETRIES = 3
+NOVOED_CONNECTION_POOL_SIZE = 10
@@ -23,22 +23,7 @@ def enroll_users_in_novoed_course(*, user_ids, novoed_course_stub):
     users = User.objects.select_related("profile", "legal_address").filter(
         id__in=user_ids
     )
-    results = {"created": 0, "existed": 0, "failed": 0}
-    for user in users:
-        try:
-            created, existed = api.enroll_in_novoed_course(user, novoed_course_stub)
-            if created:
-                results["created"] += 1
-            elif existed:
-                results["existed"] += 1
-        except:  # noqa: E722
-            results["failed"] += 1
-            log.exception(
-                "User enrollment in NovoEd failed (%s, %s)",
-                user.email,
-                novoed_course_stub,
-            )
-    return results
+    return api.bulk_enroll_in_novoed_course(users, novoed_course_stub)
 
 
 @app.task
@@ -17,17 +17,24 @@ def patched_novoed_api(mocker):
 
 
 def test_enroll_users_in_novoed_course(patched_novoed_api):
-    """enroll_users_in_novoed_course should call the API function to enroll each user indicated by the given IDs"""
+    """enroll_users_in_novoed_course should call the API function to enroll the users indicated by the given IDs"""
     users = UserFactory.create_batch(2)
     user_ids = [user.id for user in users]
-    enroll_users_in_novoed_course.delay(
+    patched_novoed_api.bulk_enroll_in_novoed_course.return_value = {
+        "created": 2,
+        "existed": 0,
+        "failed": 0,
+    }
+    result = enroll_users_in_novoed_course.delay(
         user_ids=user_ids, novoed_course_stub=FAKE_COURSE_STUB
     )
-    assert patched_novoed_api.enroll_in_novoed_course.call_count == len(users)
-    for user in users:
-        patched_novoed_api.enroll_in_novoed_course.assert_any_call(
-            user, FAKE_COURSE_STUB
-        )
+    assert result.get() == {"created": 2, "existed": 0, "failed": 0}
+    patched_novoed_api.bulk_enroll_in_novoed_course.assert_called_once()
+    enrolled_users, course_stub = (
+        patched_novoed_api.bulk_enroll_in_novoed_course.call_args.args
+    )
+    assert sorted(enrolled_users, key=lambda user: user.id) == users
+    assert course_stub == FAKE_COURSE_STUB
 
 
 def test_unenroll_user_from_novoed_course(patched_novoed_api):